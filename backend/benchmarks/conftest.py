@@ -0,0 +1,155 @@
+"""
+Endpoint benchmarks with query-count and latency gates.
+
+Run from ``backend/`` (the regular ``pytest`` run only collects ``tickets``)::
+
+    pytest benchmarks                       # compare against baselines.json
+    pytest benchmarks --update-baselines    # re-measure and rewrite it
+
+The session seeds one dataset into the SQLite test database (see ``seed``),
+then every benchmark drives an endpoint through the full middleware and
+authentication stack ``--benchmark-rounds`` times after a short warm-up. A
+benchmark fails when its query count differs from the baseline (an N+1 or a
+lost ``select_related`` shows up here first; an improvement must be recorded
+with ``--update-baselines``) or when its median latency exceeds the baseline
+by more than ``--benchmark-tolerance`` (a fraction; raise it on slower
+machines than the one the baselines were recorded on).
+"""
+import json
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tickets.models import Ticket
+from tickets.seeding import Seeder
+
+BASELINES = Path(__file__).with_name("baselines.json")
+WARMUP_ROUNDS = 2
+
+USERS = 50
+STAFF = 5
+TICKETS = 20000
+SEARCH_TERM = "چاپگر"  # one of tickets.seeding.WORDS
+
+RESULTS = {}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption("--update-baselines", action="store_true", help="Rewrite benchmarks/baselines.json.")
+    group.addoption("--benchmark-rounds", type=int, default=20, help="Measured requests per benchmark.")
+    group.addoption(
+        "--benchmark-tolerance", type=float, default=1.0,
+        help="Allowed median latency growth over the baseline, as a fraction (1.0 = twice as slow).",
+    )
+
+
+def seed():
+    """The same dataset every run, generated by tickets.seeding."""
+    seeder = Seeder(seed=2024)
+    user_ids, staff_ids = seeder.create_users(USERS, STAFF, prefix="bench")
+    seeder.create_tickets(TICKETS, user_ids, staff_ids)
+    # The first seeded users own the most tickets.
+    owner = user_ids[0]
+    return {
+        "staff": staff_ids[0],
+        "user": owner,
+        "ticket": Ticket.objects.filter(user=owner, status=Ticket.STATUS_OPEN).values_list("pk", flat=True)[0],
+        "search": SEARCH_TERM,
+    }
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        return seed()
+
+
+@pytest.fixture(scope="session")
+def dataset(django_db_setup):
+    return django_db_setup
+
+
+@pytest.fixture(autouse=True)
+def isolate(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def client_for(db, dataset):
+    def make(role):
+        client = APIClient()
+        token = AccessToken.for_user(User.objects.get(pk=dataset[role]))
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    return make
+
+
+@pytest.fixture
+def bench(request):
+    config = request.config
+    rounds = config.getoption("--benchmark-rounds")
+
+    def run(name, send, setup=None, expected_status=200):
+        """Time `send()` and gate it against the baseline stored for `name`."""
+        latencies, queries = [], 0
+        for round_ in range(WARMUP_ROUNDS + rounds):
+            if setup is not None:
+                setup()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = send()
+                elapsed = time.perf_counter() - started
+            assert response.status_code == expected_status, response.content[:500]
+            if round_ >= WARMUP_ROUNDS:
+                latencies.append(elapsed)
+                queries = max(queries, len(captured))
+        result = {"queries": queries, "median_ms": round(statistics.median(latencies) * 1000, 2)}
+        RESULTS[name] = result
+        if config.getoption("--update-baselines"):
+            return result
+        baseline = load_baselines().get(name)
+        assert baseline is not None, f"No baseline for {name!r}; run pytest benchmarks --update-baselines"
+        assert result["queries"] == baseline["queries"], (
+            f"{name}: {result['queries']} queries, baseline {baseline['queries']}"
+        )
+        limit = baseline["median_ms"] * (1 + config.getoption("--benchmark-tolerance"))
+        assert result["median_ms"] <= limit, (
+            f"{name}: median {result['median_ms']} ms, baseline {baseline['median_ms']} ms (limit {limit:.2f} ms)"
+        )
+        return result
+
+    return run
+
+
+def load_baselines():
+    return json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if RESULTS and session.config.getoption("--update-baselines"):
+        baselines = {**load_baselines(), **RESULTS}
+        BASELINES.write_text(json.dumps(dict(sorted(baselines.items())), indent=2, ensure_ascii=False) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not RESULTS:
+        return
+    baselines = load_baselines()
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(f"{'benchmark':<32}{'queries':>9}{'median ms':>11}{'baseline ms':>13}")
+    for name, result in sorted(RESULTS.items()):
+        baseline = baselines.get(name, {}).get("median_ms", "-")
+        terminalreporter.write_line(f"{name:<32}{result['queries']:>9}{result['median_ms']:>11}{baseline:>13}")
@@ -0,0 +1,173 @@
+"""
+Compare the WSGI and ASGI serving paths of the ticket API.
+
+Starts gunicorn twice against the current settings/database, once with sync
+workers on ``config.wsgi`` and once with uvicorn workers on ``config.asgi``,
+drives both with the same number of concurrent keep-alive clients and
+prints requests/sec and latency percentiles per endpoint::
+
+    cd backend
+    python benchmarks/serving.py --username admin --password secret \\
+        --concurrency 64 --duration 20 --workers 2
+
+Both runs use the same worker count and the same concurrency, so the
+comparison is requests served per process. Seed the database first
+(``manage.py seed_tickets``; its users log in with ``--password``, default
+``password``); the list and detail endpoints are measured against existing
+tickets.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+SERVERS = {
+    "wsgi": ["--worker-class", "sync", "config.wsgi:application"],
+    "asgi": ["--worker-class", "uvicorn.workers.UvicornWorker", "config.asgi:application"],
+}
+
+
+def start_server(kind, port, workers):
+    command = [
+        sys.executable, "-m", "gunicorn",
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+        "--log-level", "warning",
+        *SERVERS[kind],
+    ]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=os.environ.copy())
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/api/tickets/")
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{kind} server did not start on port {port}")
+
+
+def obtain_token(port, username, password):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    body = json.dumps({"username": username, "password": password})
+    connection.request("POST", "/api/auth/token/", body, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    if response.status != 200:
+        raise RuntimeError(f"Login failed: {payload}")
+    return payload["access"]
+
+
+def first_ticket_id(port, token):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    connection.request("GET", "/api/tickets/?limit=1", headers={"Authorization": f"Bearer {token}"})
+    results = json.loads(connection.getresponse().read())["results"]
+    if not results:
+        raise RuntimeError("No tickets to benchmark; seed the database first")
+    return results[0]["id"]
+
+
+def load(port, path, token, concurrency, duration):
+    """Run `concurrency` clients against `path` for `duration` seconds."""
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        nonlocal errors
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local, failed = [], 0
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    return summarize(latencies, errors, elapsed)
+
+
+def summarize(latencies, errors, elapsed):
+    if not latencies:
+        return {"requests": 0, "errors": errors, "rps": 0.0, "p50_ms": None, "p99_ms": None}
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=int, default=20, help="Seconds per endpoint.")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    results = {}
+    for offset, kind in enumerate(SERVERS):
+        port = args.port + offset
+        process = start_server(kind, port, args.workers)
+        try:
+            token = obtain_token(port, args.username, args.password)
+            paths = {
+                "list": "/api/tickets/?limit=20",
+                "retrieve": f"/api/tickets/{first_ticket_id(port, token)}/",
+            }
+            for name, path in paths.items():
+                load(port, path, token, min(args.concurrency, 4), 2)  # warm up
+                results[f"{kind} {name}"] = load(port, path, token, args.concurrency, args.duration)
+        finally:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'run':<16}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for run, row in results.items():
+        print(
+            f"{run:<16}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10}"
+            f"{row['p50_ms'] or '-':>10}{row['p99_ms'] or '-':>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import io
+
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from tickets import cache as ticket_cache
+
+ROLES = ["staff", "user"]
+
+
+def png(name):
+    file = io.BytesIO()
+    Image.new("RGB", (640, 480), color="green").save(file, "PNG")
+    return SimpleUploadedFile(name, file.getvalue(), content_type="image/png")
+
+
+@pytest.mark.parametrize("role", ROLES)
+class TestReads:
+    def test_list(self, bench, client_for, role):
+        client = client_for(role)
+        bench(f"list {role}", lambda: client.get(reverse("ticket-list"), {"limit": 20}))
+
+    def test_list_filtered(self, bench, client_for, role):
+        client = client_for(role)
+        params = {"status": "open", "priority": "high", "ordering": "-updated_at", "limit": 20}
+        bench(f"list-filtered {role}", lambda: client.get(reverse("ticket-list"), params))
+
+    def test_list_keyset(self, bench, client_for, role):
+        client = client_for(role)
+        params = {"pagination": "cursor", "limit": 20}
+        bench(f"list-keyset {role}", lambda: client.get(reverse("ticket-list"), params))
+
+    def test_search(self, bench, client_for, dataset, role):
+        client = client_for(role)
+        params = {"search": dataset["search"], "limit": 20}
+        bench(f"search {role}", lambda: client.get(reverse("ticket-list"), params))
+
+    def test_retrieve(self, bench, client_for, dataset, role):
+        client = client_for(role)
+        url = reverse("ticket-detail", args=[dataset["ticket"]])
+        bench(f"retrieve {role}", lambda: client.get(url))
+
+    def test_retrieve_uncached(self, bench, client_for, dataset, role, django_capture_on_commit_callbacks):
+        client = client_for(role)
+        url = reverse("ticket-detail", args=[dataset["ticket"]])
+
+        def setup():
+            # Only the rendered detail is dropped; the authenticated user stays cached.
+            with django_capture_on_commit_callbacks(execute=True):
+                ticket_cache.invalidate_ticket(dataset["ticket"])
+
+        bench(f"retrieve-uncached {role}", lambda: client.get(url), setup=setup)
+
+    def test_stats(self, bench, client_for, role):
+        client = client_for(role)
+        bench(f"stats {role}", lambda: client.get(reverse("ticket-stats")))
+
+
+@pytest.mark.parametrize("role", ROLES)
+class TestWrites:
+    def test_create_with_images(self, bench, client_for, role):
+        client = client_for(role)
+
+        def send():
+            data = {
+                "title": "کندی سرور",
+                "description": "صفحه گزارش باز نمی‌شود",
+                "priority": "high",
+                "images": [png("one.png"), png("two.png")],
+            }
+            return client.post(reverse("ticket-list"), data, format="multipart")
+
+        bench(f"create-with-images {role}", send, expected_status=201)
+
+    def test_respond(self, bench, client_for, dataset, role):
+        client = client_for(role)
+        url = reverse("ticket-respond", args=[dataset["ticket"]])
+        bench(f"respond {role}", lambda: client.post(url, {"message": "بررسی شد"}), expected_status=201)
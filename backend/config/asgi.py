@@ -0,0 +1,10 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django_application = get_asgi_application()
+
+from tickets.uploads import UploadLimitMiddleware  # noqa: E402  (needs the app registry)
+
+# Bound upload bodies before Django's ASGI handler spools them (see tickets.uploads).
+application = UploadLimitMiddleware(django_application)
@@ -25,6 +25,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole stack (see tickets.metrics).
+    "tickets.metrics.MetricsMiddleware",
+    # Opt-in sampling profiles of single requests (see tickets.profiling).
+    "tickets.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -93,7 +97,8 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # Caches the token's user instead of selecting it per request (see tickets.authentication).
+        "tickets.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -101,12 +106,18 @@ REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
+    # JSONRenderer that reports its render time to tickets.metrics.
+    "DEFAULT_RENDERER_CLASSES": [
+        "tickets.metrics.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Token buckets in the database, shared by all workers (see tickets.throttling).
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "tickets.throttling.AnonRateThrottle",
+        "tickets.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/hour",
@@ -128,21 +139,91 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
 
+# Ticket detail payloads and authenticated users are cached (see tickets.cache,
+# tickets.authentication). Both rely on atomic incr/add and on every worker seeing
+# every invalidation, so they are only enabled with a shared Redis (REDIS_URL);
+# without one both are off and every request reads the database.
+REDIS_URL = os.environ.get("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+_shared_cache_timeout = "300" if REDIS_URL else "0"
+
+# Ticket numbers reserved per sequence round trip on PostgreSQL (see tickets.numbering).
+TICKET_NUMBER_BLOCK_SIZE = int(os.environ.get("TICKET_NUMBER_BLOCK_SIZE", "20"))
+
+# Rendered ticket detail payloads (see tickets.cache); 0 disables the cache.
+TICKET_DETAIL_CACHE_TIMEOUT = int(os.environ.get("TICKET_DETAIL_CACHE_TIMEOUT", _shared_cache_timeout))
+
+# Upload limits enforced while the multipart body streams in (see tickets.uploads).
+TICKET_IMAGE_MAX_COUNT = 5
+TICKET_IMAGE_MAX_SIZE = 2 * 1024 * 1024
+TICKET_IMAGE_MAX_TOTAL_SIZE = 8 * 1024 * 1024
+
+# Background thumbnail/WebP generation for uploaded images (see tickets.images).
+TICKET_IMAGE_WORKERS = int(os.environ.get("TICKET_IMAGE_WORKERS", "2"))
+TICKET_IMAGE_PROCESSING_SYNC = os.environ.get("TICKET_IMAGE_PROCESSING_SYNC", "false").lower() == "true"
+
+# Default first-response SLA for `?overdue=true` when no `sla_hours` is given (see tickets.sla).
+TICKET_SLA_HOURS = float(os.environ.get("TICKET_SLA_HOURS", "24"))
+
+# Upper bound (seconds) on how long an authenticated user is served from the cache
+# (see tickets.authentication); user saves and deletes invalidate it in the shared
+# CACHES. 0 disables the cache.
+TICKET_AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("TICKET_AUTH_USER_CACHE_TIMEOUT", _shared_cache_timeout))
+
+# Delta sync (see tickets.changes): cursors only advance past changes older than the
+# settle time, and change rows (and cursors) expire after the retention period.
+TICKET_CHANGES_SETTLE_SECONDS = int(os.environ.get("TICKET_CHANGES_SETTLE_SECONDS", "5"))
+TICKET_CHANGES_RETENTION_DAYS = int(os.environ.get("TICKET_CHANGES_RETENTION_DAYS", "30"))
+
+# Server-Sent Events of ticket changes (see tickets.events / tickets.streams). On
+# PostgreSQL events go through LISTEN/NOTIFY so they reach every worker; the
+# in-process broker only serves the subscribers of the worker that wrote.
+TICKET_EVENTS_BROKER = os.environ.get(
+    "TICKET_EVENTS_BROKER",
+    "tickets.events.PostgresBroker"
+    if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql"
+    else "tickets.events.InProcessBroker",
+)
+TICKET_EVENTS_MAX_AGE = int(os.environ.get("TICKET_EVENTS_MAX_AGE", "300"))
+
+# Per-route request metrics (see tickets.metrics): each worker snapshots its histograms
+# /metrics requires "Authorization: Bearer <TICKET_METRICS_TOKEN>"; outside DEBUG it is closed until one is set.
+# Set TICKET_METRICS_TOKEN to require "Authorization: Bearer <token>" on /metrics.
+TICKET_METRICS_DIR = os.environ.get("TICKET_METRICS_DIR", "/dev/shm/ticket-metrics")
+TICKET_METRICS_FLUSH_SECONDS = float(os.environ.get("TICKET_METRICS_FLUSH_SECONDS", "5"))
+TICKET_METRICS_TOKEN = os.environ.get("TICKET_METRICS_TOKEN", "")
+
+# Request profiles (see tickets.profiling): staff send "X-Profile: 1", or a random
+# TICKET_PROFILE_SAMPLE_RATE fraction of requests is profiled; newest files kept.
+TICKET_PROFILE_DIR = BASE_DIR / "logs" / "profiles"
+TICKET_PROFILE_SAMPLE_RATE = float(os.environ.get("TICKET_PROFILE_SAMPLE_RATE", "0"))
+TICKET_PROFILE_INTERVAL = float(os.environ.get("TICKET_PROFILE_INTERVAL", "0.005"))
+TICKET_PROFILE_MAX_FILES = int(os.environ.get("TICKET_PROFILE_MAX_FILES", "100"))
+
 CORS_ALLOWED_ORIGINS = os.environ.get(
     "CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000"
 ).split(",")
 
+# Handlers queue records for a background thread per process and write JSON
+# lines (see tickets.logging_handlers); log with %s arguments, not f-strings.
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
-        "verbose": {
-            "format": "{levelname} {asctime} {module} {process:d} {thread:d} {message}",
-            "style": "{",
-        },
-        "simple": {
-            "format": "{levelname} {asctime} {module} {message}",
-            "style": "{",
+        "json": {
+            "()": "tickets.logging_handlers.JsonFormatter",
         },
     },
     "filters": {
@@ -156,24 +237,24 @@ LOGGING = {
     "handlers": {
         "console": {
             "level": "INFO",
-            "class": "logging.StreamHandler",
-            "formatter": "simple",
+            "()": "tickets.logging_handlers.queued_stream",
+            "formatter": "json",
         },
         "file": {
             "level": "INFO",
-            "class": "logging.handlers.RotatingFileHandler",
+            "()": "tickets.logging_handlers.queued_rotating_file",
             "filename": BASE_DIR / "logs" / "django.log",
             "maxBytes": 10 * 1024 * 1024,
             "backupCount": 5,
-            "formatter": "verbose",
+            "formatter": "json",
         },
         "security_file": {
             "level": "WARNING",
-            "class": "logging.handlers.RotatingFileHandler",
+            "()": "tickets.logging_handlers.queued_rotating_file",
             "filename": BASE_DIR / "logs" / "security.log",
             "maxBytes": 10 * 1024 * 1024,
             "backupCount": 5,
-            "formatter": "verbose",
+            "formatter": "json",
         },
     },
     "loggers": {
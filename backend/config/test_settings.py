@@ -6,3 +6,15 @@ DATABASES = {
         "NAME": ":memory:",
     }
 }
+
+# One process: an in-memory cache behaves like the shared Redis, so test the caches
+# settings.py only enables with REDIS_URL.
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+TICKET_DETAIL_CACHE_TIMEOUT = 300
+TICKET_AUTH_USER_CACHE_TIMEOUT = 300
+
+# The PostgreSQL default of settings.py does not apply to the SQLite test database.
+TICKET_EVENTS_BROKER = "tickets.events.InProcessBroker"
+
+# Keep per-route metrics in memory; tests that need snapshots point this at tmp_path.
+TICKET_METRICS_DIR = None
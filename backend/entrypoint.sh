@@ -2,6 +2,8 @@
 set -e
 
 mkdir -p /app/logs
+# Metric snapshots of the previous run's workers (see tickets.metrics).
+rm -rf "${TICKET_METRICS_DIR:-/dev/shm/ticket-metrics}"
 
 python manage.py migrate --noinput
 
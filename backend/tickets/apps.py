@@ -1,7 +1,29 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(sender, using, **kwargs):
+    from django.db import connections
+    from .search import install_sqlite_fts
+
+    connection = connections[using]
+    if connection.vendor == "sqlite":
+        install_sqlite_fts(connection)
+        # Without table statistics SQLite may drive a search from another index
+        # and probe the FTS table once per row (see SQLiteSearchBackend).
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA optimize")
 
 
 class TicketsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tickets"
     verbose_name = "تیکت‌ها"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .metrics import install_query_timer
+
+        post_migrate.connect(ensure_search_index, sender=self)
+        connection_created.connect(install_query_timer)
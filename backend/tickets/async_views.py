@@ -0,0 +1,71 @@
+"""
+Async dispatch for DRF viewsets.
+
+DRF views are synchronous. ``AsyncViewSetMixin`` lets a viewset serve the
+actions listed in ``async_actions`` from ``async def a<action>`` methods:
+authentication, permissions, throttling and content negotiation still run
+through DRF's ``initial()`` (in a worker thread), then the action itself
+runs on the event loop and awaits Django's async ORM. Under ASGI a slow
+client or query therefore holds a coroutine instead of a worker. Other
+actions, and requests for a non-JSON renderer such as the browsable API, go
+through the regular synchronous view. Under WSGI the same code runs, one
+event loop per request.
+"""
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+
+
+class AsyncViewSetMixin:
+    async_actions = ()
+    async_formats = ("json",)
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        if not set(actions.values()) & set(cls.async_actions):
+            return sync_view
+
+        async def view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in cls.async_actions:
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, action in actions.items():
+                setattr(self, method, getattr(self, action))
+            self.request = request
+            return await self.adispatch(request, *args, **kwargs)
+
+        # Carries over cls/initkwargs/actions (for routers and schema
+        # generation) and csrf_exempt from the DRF view.
+        return update_wrapper(view, sync_view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """`APIView.dispatch`, awaiting the async handler for the action."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.accepted_renderer.format in self.async_formats:
+                response = await getattr(self, f"a{self.action}")(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(getattr(self, self.action))(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """`GenericAPIView.get_object` with the lookup awaited."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
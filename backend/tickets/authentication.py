@@ -0,0 +1,69 @@
+"""
+JWT authentication that does not look the user up on every request.
+
+``JWTAuthentication`` decodes the token and then selects the user row for
+every API call. ``CachedJWTAuthentication`` keeps the resolved user in the
+cache under ``auth-user:<id>`` until the token expires, bounded by
+``TICKET_AUTH_USER_CACHE_TIMEOUT``; the ``is_active`` and revoked-password
+checks still run against the cached user on every request.
+
+Saving or deleting a user (password, ``is_staff`` and ``is_active`` changes
+included) drops the entry through a signal in ``tickets.signals``, once the
+transaction commits: dropped earlier, a concurrent request could cache the
+old row again. ``QuerySet.update()`` on users bypasses the signal, so
+callers must call ``invalidate_user``. The invalidation only reaches every
+worker through a cache they share, so settings.py only enables the cache
+(a non-zero timeout) with Redis; otherwise every request selects the user.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def _user_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def invalidate_user(user_id, using="default"):
+    transaction.on_commit(lambda: cache.delete(_user_key(user_id)), using=using)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+        if getattr(settings, "TICKET_AUTH_USER_CACHE_TIMEOUT", 300) <= 0:
+            return super().get_user(validated_token)
+
+        key = _user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            timeout = self.get_cache_timeout(validated_token)
+            if timeout > 0:
+                cache.set(key, user, timeout)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
+
+    def get_cache_timeout(self, validated_token):
+        """Seconds until the token expires, capped by TICKET_AUTH_USER_CACHE_TIMEOUT."""
+        remaining = int(validated_token.get("exp", 0) - time.time())
+        return min(remaining, getattr(settings, "TICKET_AUTH_USER_CACHE_TIMEOUT", 300))
@@ -0,0 +1,127 @@
+"""
+Content-addressed storage for ticket images.
+
+Uploads are stored once under ``blobs/<aa>/<bb>/<sha256>.<ext>`` and tracked
+by an ``ImageBlob`` row with a reference count. Attaching the same bytes to
+another ticket only bumps the count; deleting a ``TicketImage`` drops it, and
+``collect_image_blobs`` removes blobs (with their variants) that have stayed
+unreferenced for a grace period. A blob URL never changes content, so it can
+be cached as immutable.
+
+The file is written inside the uploading transaction; when that rolls back
+the row goes with it but the file stays behind, so the same command also
+sweeps blob files that no row has claimed for the grace period.
+"""
+import hashlib
+import os
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .images import VARIANTS, variant_path
+from .models import ImageBlob
+from .storage import get_blob_storage
+
+EXTENSION_ALIASES = {".jpeg": ".jpg", ".jpe": ".jpg"}
+
+GC_GRACE = timedelta(hours=1)
+GC_BATCH_SIZE = 500
+
+
+def file_digest(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_name(digest, filename):
+    ext = os.path.splitext(filename or "")[1].lower()
+    ext = EXTENSION_ALIASES.get(ext, ext)
+    return f"blobs/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+ACQUIRE_SQL = """
+    INSERT INTO tickets_imageblob (sha256, file, size, ref_count, unreferenced_at, created_at)
+    VALUES (%s, %s, %s, 1, NULL, %s)
+    ON CONFLICT (sha256) DO UPDATE
+    SET ref_count = tickets_imageblob.ref_count + 1, unreferenced_at = NULL
+    RETURNING file, size, ref_count
+"""
+
+
+def acquire_blob(file, digest=None):
+    """Store `file` unless its content is already known; return the blob with one more reference."""
+    digest = digest or file_digest(file)
+    storage = get_blob_storage()
+    # One statement inserts the row or counts the reference; on conflict it
+    # takes the row lock that orders us against collect_unreferenced().
+    with connection.cursor() as cursor:
+        cursor.execute(ACQUIRE_SQL, [
+            digest, blob_name(digest, file.name), file.size,
+            connection.ops.adapt_datetimefield_value(timezone.now()),
+        ])
+        name, size, ref_count = cursor.fetchone()
+    # A no-op when the content is already stored (see BlobStorage.save).
+    storage.save(name, file)
+    blob = ImageBlob(sha256=digest, file=name, size=size, ref_count=ref_count)
+    blob._state.adding = False
+    return blob
+
+
+def release_blob(blob_id):
+    ImageBlob.objects.filter(pk=blob_id, ref_count__gt=0).update(
+        ref_count=F("ref_count") - 1,
+        unreferenced_at=Case(
+            When(ref_count=1, then=Value(timezone.now())),
+            default=F("unreferenced_at"),
+        ),
+    )
+
+
+def delete_files(name, storage):
+    """Delete a stored image and every variant derived from it."""
+    for path in [name, *(variant_path(name, variant) for variant in VARIANTS)]:
+        storage.delete(path)
+
+
+def collect_unreferenced(grace=GC_GRACE, batch_size=GC_BATCH_SIZE):
+    """Delete blobs unreferenced for longer than `grace`, `batch_size` at a time; return the count."""
+    cutoff = timezone.now() - grace
+    storage = get_blob_storage()
+    collected = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                ImageBlob.objects.select_for_update(skip_locked=True)
+                .filter(ref_count=0, unreferenced_at__lt=cutoff)
+                .order_by("unreferenced_at")[:batch_size]
+            )
+            if not batch:
+                return collected
+            ImageBlob.objects.filter(pk__in=[blob.pk for blob in batch]).delete()
+            for blob in batch:
+                delete_files(blob.file.name, storage)
+        collected += len(batch)
+
+
+def collect_orphan_files(grace=GC_GRACE):
+    """Delete blob files older than `grace` that no ``ImageBlob`` row refers to; return the count."""
+    cutoff = timezone.now() - grace
+    storage = get_blob_storage()
+    if not storage.exists("blobs"):
+        return 0
+    collected = 0
+    for first in storage.listdir("blobs")[0]:
+        for second in storage.listdir(f"blobs/{first}")[0]:
+            directory = f"blobs/{first}/{second}"
+            files = storage.listdir(directory)[1]
+            names = {os.path.splitext(name)[0]: f"{directory}/{name}" for name in files}
+            known = set(ImageBlob.objects.filter(pk__in=names).values_list("pk", flat=True))
+            for digest, name in names.items():
+                if digest not in known and storage.get_modified_time(name) < cutoff:
+                    delete_files(name, storage)
+                    collected += 1
+    return collected
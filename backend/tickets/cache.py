@@ -0,0 +1,86 @@
+"""
+Versioned cache of rendered ticket detail payloads.
+
+Each ticket has a version counter in the cache; payloads are stored under
+``(ticket, version, variant)``. Invalidation bumps the version, so a stale
+payload written by a slow rebuild can never be read again. The bump waits
+for the writing transaction to commit: bumped earlier, a concurrent miss
+would rebuild the old row under the new version and serve it until the
+payload expires. Concurrent misses for the same entry are coalesced with a
+short ``cache.add`` lock: one request rebuilds while the others wait
+briefly for its result.
+
+Both rely on a cache every worker shares with atomic ``incr``/``add``,
+which is why settings.py only enables it with Redis; with
+``TICKET_DETAIL_CACHE_TIMEOUT = 0`` every request builds the payload.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+LOCK_TIMEOUT = 10
+WAIT_INTERVAL = 0.05
+
+
+def _version_key(ticket_id):
+    return f"ticket-detail:{ticket_id}:version"
+
+
+def _payload_key(ticket_id, version, variant):
+    return f"ticket-detail:{ticket_id}:{version}:{variant}"
+
+
+def _timeout():
+    return getattr(settings, "TICKET_DETAIL_CACHE_TIMEOUT", 300)
+
+
+def get_version(ticket_id):
+    version = cache.get(_version_key(ticket_id))
+    if version is None:
+        # Seed with a timestamp so a version evicted from the cache cannot
+        # restart at a number that still has payloads stored under it.
+        version = time.time_ns()
+        if not cache.add(_version_key(ticket_id), version, None):
+            version = cache.get(_version_key(ticket_id), version)
+    return version
+
+
+def invalidate_ticket(ticket_id, using="default"):
+    """Drop the ticket's cached payloads once the current transaction commits."""
+    transaction.on_commit(lambda: _bump_version(ticket_id), using=using)
+
+
+def _bump_version(ticket_id):
+    try:
+        cache.incr(_version_key(ticket_id))
+    except ValueError:
+        cache.set(_version_key(ticket_id), time.time_ns(), None)
+
+
+def get_or_build(ticket_id, build, variant="default"):
+    """Return the cached payload for `ticket_id`, calling `build()` on a miss."""
+    if _timeout() <= 0:
+        return build()
+    key = _payload_key(ticket_id, get_version(ticket_id), variant)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + getattr(settings, "TICKET_DETAIL_CACHE_WAIT", 2)
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            payload = cache.get(key)
+            if payload is not None:
+                return payload
+        # The builder is taking too long; build our own copy rather than fail.
+        return build()
+    try:
+        payload = build()
+        cache.set(key, payload, _timeout())
+        return payload
+    finally:
+        cache.delete(lock_key)
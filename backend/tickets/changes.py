@@ -0,0 +1,104 @@
+"""
+Delta sync: which tickets changed since a client last looked.
+
+Ticket saves, deletions and new responses append a row to ``TicketChange``
+(see tickets.signals and ``TicketQuerySet.bulk_create``). The ``changes``
+action returns the tickets behind the rows after an opaque cursor, plus
+tombstones for deleted tickets, and a new cursor to continue from.
+
+Change ids are allocated at insert time but become visible at commit, so a
+slow transaction can commit a lower id after a higher one was read. The
+cursor therefore only advances past rows older than
+``TICKET_CHANGES_SETTLE_SECONDS``; newer rows are returned again on the
+next call, and clients apply changes idempotently. Rows are pruned after
+``TICKET_CHANGES_RETENTION_DAYS`` (``prune_ticket_changes``); older cursors
+are rejected and the client must reload the list.
+"""
+import json
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import TicketChange
+
+BATCH_SIZE = 500
+
+
+class StaleCursor(Exception):
+    """The cursor predates the retained change log."""
+
+
+def settle_seconds():
+    return getattr(settings, "TICKET_CHANGES_SETTLE_SECONDS", 5)
+
+
+def retention():
+    return timedelta(days=getattr(settings, "TICKET_CHANGES_RETENTION_DAYS", 30))
+
+
+def encode_cursor(change_id):
+    raw = json.dumps({"v": change_id, "t": int(time.time())}, separators=(",", ":")).encode()
+    return urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(encoded):
+    """Return the change id in `encoded`; ValueError if malformed, StaleCursor if expired."""
+    try:
+        payload = json.loads(urlsafe_b64decode((encoded + "=" * (-len(encoded) % 4)).encode("ascii")))
+        change_id, issued = int(payload["v"]), int(payload["t"])
+    except (TypeError, ValueError, KeyError):
+        raise ValueError(encoded)
+    if issued < time.time() - retention().total_seconds():
+        raise StaleCursor(encoded)
+    return change_id
+
+
+def visible_changes(user):
+    changes = TicketChange.objects.order_by("id")
+    return changes if user.is_staff else changes.filter(user=user)
+
+
+def current_position(user):
+    """Cursor position to start syncing from after a full reload."""
+    horizon = timezone.now() - timedelta(seconds=settle_seconds())
+    latest = visible_changes(user).filter(created_at__lte=horizon).order_by("-id").values_list("id", flat=True)
+    return latest.first() or 0
+
+
+def read_changes(user, after, limit=None):
+    """
+    Changes after position `after`: `(changed_ids, deleted_ids, position, has_more)`.
+
+    A ticket changed and then deleted within the batch is only a tombstone.
+    """
+    limit = limit or BATCH_SIZE
+    rows = list(
+        visible_changes(user).filter(id__gt=after).values_list("id", "ticket_id", "deleted", "created_at")[
+            : limit + 1
+        ]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    horizon = timezone.now() - timedelta(seconds=settle_seconds())
+    position, settled = after, True
+    touched, deleted = {}, set()
+    for change_id, ticket_id, is_deleted, created_at in rows:
+        if settled and created_at <= horizon:
+            position = change_id
+        else:
+            settled = False
+        if is_deleted:
+            deleted.add(ticket_id)
+        touched.setdefault(ticket_id)
+    changed_ids = [ticket_id for ticket_id in touched if ticket_id not in deleted]
+    return changed_ids, sorted(deleted), position, has_more and settled
+
+
+def prune_changes(older_than=None):
+    """Delete change rows past the retention period; returns how many."""
+    cutoff = timezone.now() - (older_than or retention())
+    deleted, _ = TicketChange.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,62 @@
+"""
+HTTP validators (ETag / Last-Modified) for ticket representations.
+
+Validators are derived from columns the list/detail querysets already load
+(``updated_at`` plus the ``response_count``/``last_response_at``
+annotations), so a conditional request is answered with 304 before any
+serialization happens. Lists only send the ETag: their newest row timestamp
+stays put when a row is deleted or leaves the filter.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def _row_state(ticket):
+    return (
+        f"{ticket.pk}:{ticket.updated_at.isoformat()}:"
+        f"{getattr(ticket, 'response_count', '')}:{getattr(ticket, 'last_response_at', '')}"
+    )
+
+
+def _row_modified(ticket):
+    last_response_at = getattr(ticket, "last_response_at", None)
+    if last_response_at and last_response_at > ticket.updated_at:
+        return last_response_at
+    return ticket.updated_at
+
+
+def compute_validators(request, tickets, extra=""):
+    """Return `(etag, last_modified)` for a sequence of annotated tickets."""
+    digest = hashlib.sha1()
+    renderer = getattr(request, "accepted_renderer", None)
+    digest.update(f"{getattr(renderer, 'format', '')}|{extra}".encode())
+    last_modified = None
+    for ticket in tickets:
+        digest.update(b"|")
+        digest.update(_row_state(ticket).encode())
+        modified = _row_modified(ticket)
+        if last_modified is None or modified > last_modified:
+            last_modified = modified
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return quote_etag(digest.hexdigest()), timestamp
+
+
+def not_modified_response(request, etag, last_modified):
+    """Return a 304 response if the request's preconditions match, else None."""
+    if request.method not in ("GET", "HEAD"):
+        return None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Authorization"])
+    return response
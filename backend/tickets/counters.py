@@ -0,0 +1,89 @@
+"""
+Incrementally maintained ticket counts by (user, status, priority).
+
+``TicketCounter`` has one row per combination per user plus global rows with
+a NULL user. Every ORM write that creates, deletes or re-keys a ticket
+(``Ticket.save``, ``TicketQuerySet.bulk_create``, deletes via the
+``post_delete`` signal) applies +1/-1 deltas with upserts in the same
+transaction, so counts can be read without scanning tickets.
+``QuerySet.update()`` bypasses this: callers changing status, priority or
+owner that way must apply the deltas themselves. ``rebuild_counters``
+recomputes the whole table.
+"""
+from collections import Counter
+
+from django.db import connections, transaction
+
+COUNTED_FIELDS = ("user_id", "status", "priority")
+
+USER_UPSERT_SQL = """
+    INSERT INTO tickets_ticketcounter (user_id, status, priority, count)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (user_id, status, priority) WHERE user_id IS NOT NULL
+    DO UPDATE SET count = tickets_ticketcounter.count + EXCLUDED.count
+"""
+
+GLOBAL_UPSERT_SQL = """
+    INSERT INTO tickets_ticketcounter (user_id, status, priority, count)
+    VALUES (NULL, %s, %s, %s)
+    ON CONFLICT (status, priority) WHERE user_id IS NULL
+    DO UPDATE SET count = tickets_ticketcounter.count + EXCLUDED.count
+"""
+
+REBUILD_SQL = [
+    "DELETE FROM tickets_ticketcounter",
+    """
+    INSERT INTO tickets_ticketcounter (user_id, status, priority, count)
+    SELECT user_id, status, priority, COUNT(*) FROM tickets_ticket
+    GROUP BY user_id, status, priority
+    """,
+    """
+    INSERT INTO tickets_ticketcounter (user_id, status, priority, count)
+    SELECT NULL, status, priority, COUNT(*) FROM tickets_ticket
+    GROUP BY status, priority
+    """,
+]
+
+
+def counter_key(ticket):
+    return tuple(getattr(ticket, field) for field in COUNTED_FIELDS)
+
+
+def key_changes(previous, current):
+    """Deltas for a ticket moving from key `previous` (None: new) to `current` (None: deleted)."""
+    deltas = Counter()
+    if previous != current:
+        if previous is not None:
+            deltas[previous] -= 1
+        if current is not None:
+            deltas[current] += 1
+    return deltas
+
+
+def apply_deltas(deltas, using="default"):
+    """Add `{(user_id, status, priority): delta}` to the per-user and global counters."""
+    user_rows, global_rows = Counter(), Counter()
+    for (user_id, status, priority), delta in deltas.items():
+        user_rows[(user_id, status, priority)] += delta
+        global_rows[(status, priority)] += delta
+    # A fixed order keeps concurrent writers from locking counter rows in opposite orders.
+    global_params = [[*key, delta] for key, delta in sorted(global_rows.items()) if delta]
+    user_params = [[*key, delta] for key, delta in sorted(user_rows.items()) if delta]
+    if not global_params and not user_params:
+        return
+    with connections[using].cursor() as cursor:
+        if global_params:
+            cursor.executemany(GLOBAL_UPSERT_SQL, global_params)
+        if user_params:
+            cursor.executemany(USER_UPSERT_SQL, user_params)
+
+
+def rebuild_counters(using="default"):
+    """Recompute every counter from the tickets table."""
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Hold off ticket writes so the counts match the rows they were taken from.
+            cursor.execute("LOCK TABLE tickets_ticket IN SHARE MODE")
+        for sql in REBUILD_SQL:
+            cursor.execute(sql)
@@ -0,0 +1,211 @@
+"""
+Ticket change events for the Server-Sent Events streams (see tickets.streams).
+
+Write paths call ``publish_ticket_event`` once their transaction commits.
+The broker fans each event out to the subscribers of its channels
+(``ticket:<id>``, ``user:<owner id>`` and ``staff``) in this process:
+
+* ``InProcessBroker`` delivers directly; enough for a single worker.
+* ``PostgresBroker`` sends events with ``pg_notify`` and runs one
+  ``LISTEN`` thread per process, so every worker's subscribers see every
+  event. It is the default on PostgreSQL; ``TICKET_EVENTS_BROKER``
+  overrides the choice.
+
+Events only carry identifiers and the changed state; clients fetch the full
+ticket through the API when they need it.
+"""
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+STAFF_CHANNEL = "staff"
+NOTIFY_CHANNEL = "tickets_events"
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+MAX_NOTIFY_PAYLOAD = 7900
+
+# Put on a subscriber's queue when it fell behind; the stream then closes so
+# the client reconnects and refetches instead of silently missing events.
+OVERFLOW = object()
+
+
+def ticket_channel(ticket_id):
+    return f"ticket:{ticket_id}"
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class Subscription:
+    """An asyncio queue of events for one stream, fed from any thread."""
+
+    def __init__(self, broker, channels, maxsize=100):
+        self.broker = broker
+        self.channels = set(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self, timeout):
+        """Next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, channels, maxsize=100):
+        subscription = Subscription(self, channels, maxsize)
+        self.add(subscription)
+        return subscription
+
+    def add(self, subscriber):
+        """Register anything with `channels` and a thread-safe `deliver(event)`."""
+        with self._lock:
+            for channel in subscriber.channels:
+                self._subscribers.setdefault(channel, set()).add(subscriber)
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            for channel in subscriber.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def publish(self, channels, event):
+        self.dispatch(channels, event)
+
+    def dispatch(self, channels, event):
+        with self._lock:
+            targets = set()
+            for channel in channels:
+                targets.update(self._subscribers.get(channel, ()))
+        for subscriber in targets:
+            try:
+                subscriber.deliver(event)
+            except RuntimeError:
+                # The subscriber's event loop is gone; its stream is already dead.
+                self.unsubscribe(subscriber)
+
+
+class PostgresBroker(InProcessBroker):
+    """Cross-process fan-out through PostgreSQL LISTEN/NOTIFY."""
+
+    poll_timeout = 5
+    reconnect_delay = 2
+
+    def __init__(self, using="default"):
+        super().__init__()
+        self.using = using
+        self._listener = None
+        self._listener_pid = None
+
+    def subscribe(self, channels, maxsize=100):
+        self.ensure_listener()
+        return super().subscribe(channels, maxsize)
+
+    def publish(self, channels, event):
+        payload = json.dumps({"channels": list(channels), "event": event}, ensure_ascii=False)
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            logger.warning("Dropping oversized ticket event: %s", event.get("type"))
+            return
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, payload])
+
+    def ensure_listener(self):
+        with self._lock:
+            if self._listener is not None and self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self._listener = threading.Thread(target=self.listen, name="ticket-events", daemon=True)
+            self._listener.start()
+
+    def listen(self):
+        while True:
+            try:
+                self._listen_once()
+            except Exception:
+                logger.exception("Ticket event listener failed; reconnecting")
+                time.sleep(self.reconnect_delay)
+
+    def _listen_once(self):
+        wrapper = connections[self.using]
+        connection = wrapper.get_new_connection(wrapper.get_connection_params())
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            while True:
+                if select.select([connection], [], [], self.poll_timeout) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    message = json.loads(notify.payload)
+                    self.dispatch(message["channels"], message["event"])
+        finally:
+            connection.close()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            path = getattr(settings, "TICKET_EVENTS_BROKER", "tickets.events.InProcessBroker")
+            _broker = import_string(path)()
+        return _broker
+
+
+def publish_ticket_event(ticket, event_type, **data):
+    """Publish `event_type` for `ticket` to its stream subscribers after the current transaction commits."""
+    event = {
+        "type": event_type,
+        "ticket": ticket.pk,
+        "ticket_number": ticket.ticket_number,
+        "status": ticket.status,
+        **data,
+    }
+    channels = [ticket_channel(ticket.pk), user_channel(ticket.user_id), STAFF_CHANNEL]
+
+    def send():
+        try:
+            get_broker().publish(channels, event)
+        except Exception:
+            # Streams are best effort: a broker failure must not fail the write.
+            logger.exception("Failed to publish %s for ticket %s", event_type, ticket.pk)
+
+    transaction.on_commit(send)
@@ -1,11 +1,18 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
+
 from .models import Ticket
+from .search import get_search_backend
+from .sla import inactive_q, overdue_q
 
 
 class TicketFilter(filters.FilterSet):
     status = filters.CharFilter(lookup_expr="iexact")
     priority = filters.CharFilter(lookup_expr="iexact")
     search = filters.CharFilter(method="filter_search")
+    overdue = filters.BooleanFilter(method="filter_overdue")
+    sla_hours = filters.NumberFilter(method="filter_noop", min_value=0)
+    inactive_hours = filters.NumberFilter(method="filter_inactive", min_value=0)
 
     class Meta:
         model = Ticket
@@ -14,9 +21,25 @@ class TicketFilter(filters.FilterSet):
     def filter_search(self, queryset, name, value):
         if not value:
             return queryset
-        from django.db.models import Q
-        return queryset.filter(
-            Q(title__icontains=value)
-            | Q(description__icontains=value)
-            | Q(ticket_number__icontains=value)
-        )
+        return get_search_backend(queryset).search(queryset, value)
+
+    def filter_overdue(self, queryset, name, value):
+        overdue = overdue_q(self.form.cleaned_data.get("sla_hours"))
+        return queryset.filter(overdue) if value else queryset.exclude(overdue)
+
+    def filter_inactive(self, queryset, name, value):
+        return queryset.filter(inactive_q(value))
+
+    def filter_noop(self, queryset, name, value):
+        # Parameters such as `sla_hours` only modify another filter.
+        return queryset
+
+
+class TicketOrderingFilter(OrderingFilter):
+    """Allows `?ordering=-rank` only when a search annotated the relevance rank."""
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid = super().remove_invalid_fields(queryset, fields, view, request)
+        if "rank" in queryset.query.annotations:
+            return valid
+        return [term for term in valid if term.lstrip("-") != "rank"]
@@ -0,0 +1,140 @@
+"""
+Post-upload image processing.
+
+After the ticket transaction commits, each uploaded image is decoded once in
+a background thread pool, EXIF-stripped (orientation is applied first) and
+written out as resized JPEG/WebP variants. The storage paths are recorded in
+``TicketImage.variants``; the upload request never waits for this work.
+Images backed by the same content blob share a single set of variants.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import cache as ticket_cache
+from .models import Ticket, TicketChange, TicketImage
+from .storage import get_blob_storage
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = {
+    "thumbnail": {"size": (320, 320), "format": "JPEG", "ext": "jpg"},
+    "thumbnail_webp": {"size": (320, 320), "format": "WEBP", "ext": "webp"},
+    "webp": {"size": (1600, 1600), "format": "WEBP", "ext": "webp"},
+}
+LARGEST_VARIANT = max((spec["size"] for spec in VARIANTS.values()), key=lambda size: size[0] * size[1])
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "TICKET_IMAGE_WORKERS", 2),
+                thread_name_prefix="ticket-images",
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def schedule_processing(image_ids):
+    """Queue variant generation for `image_ids` once the current transaction commits."""
+    image_ids = list(image_ids)
+    if not image_ids:
+        return
+
+    def submit():
+        if getattr(settings, "TICKET_IMAGE_PROCESSING_SYNC", False):
+            for image_id in image_ids:
+                process_image(image_id)
+            return
+        executor = get_executor()
+        for image_id in image_ids:
+            executor.submit(_run_in_worker, image_id)
+
+    transaction.on_commit(submit)
+
+
+def _run_in_worker(image_id):
+    try:
+        process_image(image_id)
+    except Exception:
+        logger.exception("Image processing failed for TicketImage %s", image_id)
+    finally:
+        close_old_connections()
+
+
+def variant_path(name, variant):
+    base, _ = os.path.splitext(name)
+    return f"variants/{base}_{variant}.{VARIANTS[variant]['ext']}"
+
+
+def _render(source, spec):
+    image = source.copy()
+    image.thumbnail(spec["size"], Image.LANCZOS)
+    if spec["format"] == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    buffer = BytesIO()
+    # No exif= argument: Pillow writes the variant without any metadata.
+    image.save(buffer, spec["format"], quality=82, optimize=spec["format"] == "JPEG")
+    return buffer.getvalue()
+
+
+def process_image(image_id):
+    """Generate all variants for one TicketImage; returns the variants mapping."""
+    try:
+        ticket_image = TicketImage.objects.get(pk=image_id)
+    except TicketImage.DoesNotExist:
+        return {}
+    if ticket_image.blob_id:
+        # Same content as another upload: its variants are already on disk.
+        shared = (
+            TicketImage.objects.filter(blob_id=ticket_image.blob_id)
+            .exclude(variants={})
+            .values_list("variants", flat=True)
+            .first()
+        )
+        if shared:
+            return _record(ticket_image, shared)
+        storage = get_blob_storage()
+    else:
+        storage = ticket_image.image.storage
+    with ticket_image.image.open("rb") as handle:
+        source = Image.open(handle)
+        # JPEG can decode straight to a reduced scale that still covers the largest variant.
+        source.draft("RGB", LARGEST_VARIANT)
+        source = ImageOps.exif_transpose(source)
+        source.load()
+
+    variants = {}
+    for name, spec in VARIANTS.items():
+        path = variant_path(ticket_image.image.name, name)
+        variants[name] = storage.save(path, ContentFile(_render(source, spec)))
+    return _record(ticket_image, variants)
+
+
+def _record(ticket_image, variants):
+    ticket = Ticket.objects.filter(pk=ticket_image.ticket_id)
+    with transaction.atomic():
+        TicketImage.objects.filter(pk=ticket_image.pk).update(variants=variants)
+        # The variants are part of the ticket's representation: move updated_at so
+        # its ETag/Last-Modified change, and tell delta-sync clients (see tickets.changes).
+        ticket.update(updated_at=timezone.now())
+        TicketChange.objects.record(ticket.only("id", "user_id"))
+    ticket_cache.invalidate_ticket(ticket_image.ticket_id)
+    logger.info("Processed TicketImage %s: %d variants", ticket_image.pk, len(variants))
+    return variants
@@ -0,0 +1,193 @@
+"""
+Bulk ticket import from NDJSON (one ticket per line, responses embedded).
+
+The request body is read line by line and processed in fixed-size chunks,
+each validated with the regular create serializers and written with
+``bulk_create`` inside its own transaction, so memory stays bounded by the
+chunk size whatever the upload size. Invalid lines are reported and skipped.
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+
+from .models import Ticket, TicketResponse
+from .serializers import TicketCreateSerializer, TicketResponseCreateSerializer
+from .sla import backfill_sla_fields
+
+CHUNK_SIZE = 500
+MAX_LINE_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 100
+
+STATUS_VALUES = {value for value, _ in Ticket.STATUS_CHOICES}
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.responses_created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line_no, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "responses_created": self.responses_created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def iter_lines(stream):
+    """Yield `(line_no, bytes)` without ever holding more than one line."""
+    if stream is None:
+        return
+    line_no = 0
+    while True:
+        line = stream.readline(MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        line_no += 1
+        if len(line) > MAX_LINE_BYTES and not line.endswith(b"\n"):
+            # Skip the rest of the oversized line.
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(MAX_LINE_BYTES)
+            yield line_no, None
+            continue
+        yield line_no, line
+
+
+class TicketImporter:
+    def __init__(self, default_user, chunk_size=CHUNK_SIZE):
+        self.default_user = default_user
+        self.chunk_size = chunk_size
+        self.result = ImportResult()
+
+    def run(self, stream):
+        chunk = []
+        for line_no, raw in iter_lines(stream):
+            if raw is None:
+                self.result.add_error(line_no, {"detail": "طول خط بیش از حد مجاز است"})
+                continue
+            if not raw.strip():
+                continue
+            chunk.append((line_no, raw))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self.result
+
+    def import_chunk(self, chunk):
+        rows = []
+        for line_no, raw in chunk:
+            row = self.validate_line(line_no, raw)
+            if row is not None:
+                rows.append(row)
+        usernames = {row["user"] for row in rows if row["user"]}
+        for row in rows:
+            usernames.update(r["user"] for r in row["responses"] if r["user"])
+        users = {u.username: u for u in User.objects.filter(username__in=usernames)}
+
+        resolved = []
+        for row in rows:
+            missing = sorted(
+                name
+                for name in [row["user"], *(r["user"] for r in row["responses"])]
+                if name and name not in users
+            )
+            if missing:
+                self.result.add_error(row["line"], {"user": [f"کاربر یافت نشد: {', '.join(missing)}"]})
+                continue
+            resolved.append(row)
+        if not resolved:
+            return
+        try:
+            with transaction.atomic():
+                self.write(resolved, users)
+        except IntegrityError:
+            # Isolate the offending lines instead of dropping the whole chunk.
+            for row in resolved:
+                try:
+                    with transaction.atomic():
+                        self.write([row], users)
+                except IntegrityError as exc:
+                    self.result.add_error(row["line"], {"detail": str(exc)})
+
+    def validate_line(self, line_no, raw):
+        try:
+            data = json.loads(raw)
+        except (UnicodeDecodeError, ValueError):
+            self.result.add_error(line_no, {"detail": "JSON نامعتبر است"})
+            return None
+        if not isinstance(data, dict):
+            self.result.add_error(line_no, {"detail": "هر خط باید یک شیء JSON باشد"})
+            return None
+
+        errors = {}
+        ticket = TicketCreateSerializer(data=data)
+        if not ticket.is_valid():
+            errors.update(ticket.errors)
+        status_value = data.get("status", Ticket.STATUS_OPEN)
+        if not isinstance(status_value, str) or status_value not in STATUS_VALUES:
+            errors["status"] = [f"وضعیت نامعتبر: {status_value}"]
+        if not isinstance(data.get("user") or "", str):
+            errors["user"] = ["نام کاربری باید رشته باشد"]
+        responses = []
+        raw_responses = data.get("responses") or []
+        if not isinstance(raw_responses, list):
+            errors["responses"] = ["باید لیست باشد"]
+            raw_responses = []
+        for index, item in enumerate(raw_responses):
+            response = TicketResponseCreateSerializer(data=item if isinstance(item, dict) else {})
+            if not response.is_valid():
+                errors.setdefault("responses", {})[index] = response.errors
+                continue
+            if not isinstance(item.get("user") or "", str):
+                errors.setdefault("responses", {})[index] = {"user": ["نام کاربری باید رشته باشد"]}
+                continue
+            responses.append({
+                "message": response.validated_data["message"],
+                "user": item.get("user"),
+            })
+        if errors:
+            self.result.add_error(line_no, errors)
+            return None
+        return {
+            "line": line_no,
+            "fields": dict(ticket.validated_data),
+            "status": status_value,
+            "user": data.get("user"),
+            "responses": responses,
+        }
+
+    def write(self, rows, users):
+        tickets = Ticket.objects.bulk_create([
+            Ticket(
+                **row["fields"],
+                status=row["status"],
+                user=users[row["user"]] if row["user"] else self.default_user,
+            )
+            for row in rows
+        ])
+        responses = [
+            TicketResponse(
+                ticket=ticket,
+                user=users[r["user"]] if r["user"] else ticket.user,
+                message=r["message"],
+            )
+            for ticket, row in zip(tickets, rows)
+            for r in row["responses"]
+        ]
+        TicketResponse.objects.bulk_create(responses)
+        if responses:
+            backfill_sla_fields(Ticket.objects.filter(pk__in=[ticket.pk for ticket in tickets]))
+        self.result.created += len(tickets)
+        self.result.responses_created += len(responses)
@@ -0,0 +1,138 @@
+"""
+Logging off the request path.
+
+``QueueingHandler`` puts records on a bounded in-memory queue; one
+background ``QueueListener`` thread per process formats them and hands them
+to the wrapped handler (file, console). A stalled disk or log pipe, or a
+file rotation, then delays the listener instead of the request.
+
+Records are queued as they are, without the eager ``getMessage()`` that
+``QueueHandler.prepare`` does, so ``%s`` arguments are only formatted on
+the listener thread (log with ``logger.info("... %s", value)``, not
+f-strings). The queue never blocks a worker: above ``high_water`` of its
+capacity only one in ``sample_every`` records below WARNING is kept, and
+when it is full records are dropped. The number dropped is logged once
+there is room again.
+
+``JsonFormatter`` writes one JSON object per line, including any
+``extra=`` fields.
+
+Use the factories below from ``LOGGING`` (``"()": "tickets.logging_handlers.queued_rotating_file"``).
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else came from `extra=`.
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "process": record.process,
+            "thread": record.thread,
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # The queue may be full at shutdown; wait for room rather than fail.
+        self.queue.put(self._sentinel)
+
+
+class QueueingHandler(logging.handlers.QueueHandler):
+    """Queue records for a per-process listener thread writing to `target`."""
+
+    def __init__(self, target, maxsize=10000, high_water=0.8, sample_every=10):
+        super().__init__(queue.Queue(maxsize))
+        self.target = target
+        self.high_water = int(maxsize * high_water)
+        self.sample_every = sample_every
+        self.dropped = 0
+        self.sampled = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self.listener = None
+        self.start()
+
+    def start(self):
+        # A forked worker (e.g. gunicorn --preload) inherits the handler but
+        # not the listener thread, so each process starts its own.
+        self._pid = os.getpid()
+        self.listener = Listener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread, in the target handler.
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.start()
+        if self.queue.qsize() >= self.high_water and record.levelno < logging.WARNING:
+            self.sampled += 1
+            if self.sampled % self.sample_every:
+                self.dropped += 1
+                return
+        try:
+            if self.dropped:
+                self.queue.put_nowait(self.dropped_record(self.dropped))
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    @staticmethod
+    def dropped_record(count):
+        return logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            "Dropped %d log records under backpressure", (count,), None,
+        )
+
+    def flush(self):
+        """Wait until the listener has handed every queued record to the target."""
+        if self.listener is not None and self._pid == os.getpid():
+            self.queue.join()
+        self.target.flush()
+
+    def close(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        super().close()
+
+
+def queued_rotating_file(filename, maxBytes=0, backupCount=0, maxsize=10000, encoding="utf-8"):
+    target = logging.handlers.RotatingFileHandler(
+        filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding
+    )
+    return QueueingHandler(target, maxsize=maxsize)
+
+
+def queued_stream(stream=None, maxsize=10000):
+    return QueueingHandler(logging.StreamHandler(stream or sys.stderr), maxsize=maxsize)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from tickets import cache as ticket_cache
+from tickets.models import Ticket
+from tickets.sla import backfill_sla_fields
+
+
+class Command(BaseCommand):
+    help = "Recompute first_staff_response_at, closed_at and last_activity_at from ticket responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        ids = Ticket.objects.order_by("pk").values_list("pk", flat=True)
+        batch, updated = [], 0
+        for ticket_id in ids.iterator(chunk_size=options["batch_size"]):
+            batch.append(ticket_id)
+            if len(batch) >= options["batch_size"]:
+                updated += self.backfill(batch)
+                batch = []
+        if batch:
+            updated += self.backfill(batch)
+        self.stdout.write(self.style.SUCCESS(f"Backfilled SLA timestamps for {updated} tickets."))
+
+    def backfill(self, ids):
+        updated = backfill_sla_fields(Ticket.objects.filter(pk__in=ids))
+        # QuerySet.update() sends no signals; drop the cached detail payloads by hand.
+        for ticket_id in ids:
+            ticket_cache.invalidate_ticket(ticket_id)
+        return updated
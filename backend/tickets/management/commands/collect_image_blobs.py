@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from tickets.blobs import GC_BATCH_SIZE, GC_GRACE, collect_orphan_files, collect_unreferenced
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete image blobs (and their variants) that no ticket image has referenced for a while, "
+        "and blob files left behind by rolled-back uploads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-minutes",
+            type=int,
+            default=int(GC_GRACE.total_seconds() // 60),
+            help="Only collect blobs unreferenced for at least this long.",
+        )
+        parser.add_argument("--batch-size", type=int, default=GC_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        grace = timedelta(minutes=options["grace_minutes"])
+        collected = collect_unreferenced(grace=grace, batch_size=options["batch_size"])
+        orphans = collect_orphan_files(grace=grace)
+        self.stdout.write(self.style.SUCCESS(
+            f"Collected {collected} unreferenced blobs and {orphans} orphaned files."
+        ))
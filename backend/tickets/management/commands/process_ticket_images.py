@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from tickets.images import process_image
+from tickets.models import TicketImage
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnail/WebP variants for ticket images that have none (or all, with --all)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Reprocess images that already have variants.")
+
+    def handle(self, *args, **options):
+        queryset = TicketImage.objects.order_by("pk")
+        if not options["all"]:
+            queryset = queryset.filter(variants={})
+        processed = failed = 0
+        for image_id in queryset.values_list("pk", flat=True).iterator(chunk_size=500):
+            try:
+                process_image(image_id)
+                processed += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"TicketImage {image_id}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} images ({failed} failed)."))
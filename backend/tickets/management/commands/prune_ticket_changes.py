@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from tickets.changes import prune_changes, retention
+
+
+class Command(BaseCommand):
+    help = "Delete ticket change-log rows older than the delta-sync retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=retention().days,
+            help="Keep changes from the last this many days.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(older_than=timedelta(days=options["days"]))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} ticket changes."))
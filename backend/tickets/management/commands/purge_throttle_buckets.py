@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tickets.throttling import purge_full_buckets
+
+
+class Command(BaseCommand):
+    help = "Delete throttle buckets that have refilled completely (they carry no state)."
+
+    def handle(self, *args, **options):
+        deleted = purge_full_buckets()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} full throttle buckets."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from tickets.counters import rebuild_counters
+from tickets.models import TicketCounter
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-user and global ticket counters from the tickets table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        rebuild_counters(using=options["database"])
+        total = TicketCounter.objects.using(options["database"]).total()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ticket counters ({total} tickets)."))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = "Load synthetic users, tickets, responses and image rows (see tickets.seeding)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=100000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--staff", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0, help="Same seed, same data.")
+        parser.add_argument("--days", type=int, default=365, help="Oldest ticket age.")
+        parser.add_argument("--max-responses", type=int, default=8, help="Per ticket; 0 for none.")
+        parser.add_argument("--image-ratio", type=float, default=0.15, help="Share of tickets with images.")
+        parser.add_argument("--prefix", default="seed", help="Username prefix; must not be in use.")
+        parser.add_argument("--password", default="password", help="Password of every seeded user.")
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+        seeder = Seeder(seed=options["seed"], using=options["database"], batch_size=options["batch_size"])
+        started = time.monotonic()
+        user_ids, staff_ids = seeder.create_users(
+            options["users"], options["staff"], prefix=options["prefix"], password=options["password"]
+        )
+
+        def progress(totals, count):
+            rows = sum(totals.values())
+            rate = rows / max(time.monotonic() - started, 1e-6)
+            self.stdout.write(f"{totals['tickets']}/{count} tickets, {rows} rows ({rate:,.0f} rows/s)")
+
+        totals = seeder.create_tickets(
+            options["tickets"], user_ids, staff_ids,
+            days=options["days"], max_responses=options["max_responses"],
+            image_ratio=options["image_ratio"], progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(user_ids) + len(staff_ids)} users, {totals['tickets']} tickets, "
+            f"{totals['responses']} responses and {totals['images']} images "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,281 @@
+"""
+Per-request performance metrics.
+
+``MetricsMiddleware`` measures every request: total time, the number and
+duration of database queries (through an execute wrapper installed on each
+connection as it opens, which only records while a request is being
+measured) and the time spent rendering the response body
+(``TimedJSONRenderer``). It reports them in a ``Server-Timing`` header and
+adds them to per-route histograms, labelled with the URL name
+(``ticket-list``, ``ticket-respond``, ``auth-token``, ...) and method.
+
+Each worker keeps its histograms in memory and writes a snapshot to
+``TICKET_METRICS_DIR`` (``/dev/shm`` by default, i.e. shared memory) at most
+every ``TICKET_METRICS_FLUSH_SECONDS``. ``/metrics`` sums the snapshots of
+all workers, past and present, into the Prometheus text format; snapshots of
+exited workers are kept (each process writes under its PID plus a random
+suffix, so a reused PID cannot overwrite one) so counters never go
+backwards, and the directory is cleared when the container starts.
+``/metrics`` is not routed by nginx, and outside ``DEBUG`` it also requires
+``Authorization: Bearer <TICKET_METRICS_TOKEN>``; without a token it is
+closed.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework.renderers import JSONRenderer
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+HISTOGRAMS = {
+    "ticket_http_request_duration_seconds": ("Total time to produce the response.", DURATION_BUCKETS),
+    "ticket_http_db_duration_seconds": ("Time spent in database queries.", DURATION_BUCKETS),
+    "ticket_http_db_queries": ("Database queries per request.", QUERY_BUCKETS),
+    "ticket_http_serialization_duration_seconds": ("Time spent rendering the response body.", DURATION_BUCKETS),
+}
+REQUESTS_TOTAL = "ticket_http_requests_total"
+
+_current = ContextVar("ticket_request_metrics", default=None)
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "db_time", "serialization_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+
+    def server_timing(self, total):
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f"ser;dur={self.serialization_time * 1000:.1f}, "
+            f"total;dur={total * 1000:.1f}"
+        )
+
+
+def time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """`connection_created` receiver (see TicketsConfig.ready)."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.serialization_time += time.perf_counter() - started
+
+
+class Registry:
+    """This process's histograms and counters, periodically snapshotted to disk."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot_name = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.flushed_at = 0.0
+
+    def observe(self, route, method, status_code, metrics, total):
+        values = {
+            "ticket_http_request_duration_seconds": total,
+            "ticket_http_db_duration_seconds": metrics.db_time,
+            "ticket_http_db_queries": metrics.queries,
+            "ticket_http_serialization_duration_seconds": metrics.serialization_time,
+        }
+        with self._lock:
+            for name, value in values.items():
+                buckets = HISTOGRAMS[name][1]
+                key = (name, route, method)
+                series = self.histograms.get(key)
+                if series is None:
+                    series = self.histograms[key] = [0] * len(buckets) + [0.0, 0]
+                for index, bound in enumerate(buckets):
+                    if value <= bound:
+                        series[index] += 1
+                series[-2] += value
+                series[-1] += 1
+            key = (route, method, f"{status_code // 100}xx")
+            self.counters[key] = self.counters.get(key, 0) + 1
+        if time.monotonic() - self.flushed_at >= getattr(settings, "TICKET_METRICS_FLUSH_SECONDS", 5):
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "histograms": [[*key, list(series)] for key, series in self.histograms.items()],
+                "counters": [[*key, count] for key, count in self.counters.items()],
+            }
+
+    def snapshot_name(self):
+        # Fixed for the life of the process, and new in a forked child.
+        pid = os.getpid()
+        if self._snapshot_name is None or self._snapshot_name[0] != pid:
+            self._snapshot_name = (pid, f"{pid}-{uuid.uuid4().hex}.json")
+        return self._snapshot_name[1]
+
+    def flush(self):
+        self.flushed_at = time.monotonic()
+        directory = metrics_dir()
+        if directory is None:
+            return
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as handle:
+                json.dump(self.snapshot(), handle)
+            os.replace(temporary, directory / self.snapshot_name())
+        except OSError:
+            # Metrics must never fail a request.
+            pass
+
+
+registry = Registry()
+
+
+def metrics_dir():
+    directory = getattr(settings, "TICKET_METRICS_DIR", None)
+    return Path(directory) if directory else None
+
+
+def route_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.route or "unnamed"
+
+
+def record(request, response, metrics, started):
+    total = time.perf_counter() - started
+    response["Server-Timing"] = metrics.server_timing(total)
+    registry.observe(route_label(request), request.method, response.status_code, metrics, total)
+    return response
+
+
+def MetricsMiddleware(get_response):
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            metrics = RequestMetrics()
+            token = _current.set(metrics)
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                _current.reset(token)
+            return record(request, response, metrics, started)
+
+        return markcoroutinefunction(middleware)
+
+    def middleware(request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = get_response(request)
+        finally:
+            _current.reset(token)
+        return record(request, response, metrics, started)
+
+    return middleware
+
+
+MetricsMiddleware.sync_capable = True
+MetricsMiddleware.async_capable = True
+
+
+def collect():
+    """Sum this process's live data with every worker snapshot on disk."""
+    registry.flush()
+    histograms, counters = {}, {}
+    snapshots = [registry.snapshot()]
+    directory = metrics_dir()
+    if directory is not None and directory.is_dir():
+        own = registry.snapshot_name()
+        for path in directory.glob("*.json"):
+            if path.name == own:
+                continue
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+    for snapshot in snapshots:
+        for name, route, method, series in snapshot["histograms"]:
+            total = histograms.setdefault((name, route, method), [0] * len(series))
+            for index, value in enumerate(series):
+                total[index] += value
+        for route, method, status_class, count in snapshot["counters"]:
+            key = (route, method, status_class)
+            counters[key] = counters.get(key, 0) + count
+    return histograms, counters
+
+
+def _labels(**labels):
+    body = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    return "{" + body + "}"
+
+
+def render_prometheus(histograms, counters):
+    lines = [
+        f"# HELP {REQUESTS_TOTAL} Requests served, by route, method and status class.",
+        f"# TYPE {REQUESTS_TOTAL} counter",
+    ]
+    for (route, method, status_class), count in sorted(counters.items()):
+        lines.append(f"{REQUESTS_TOTAL}{_labels(route=route, method=method, status=status_class)} {count}")
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (series_name, route, method), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            for bound, count in zip(buckets, series):
+                lines.append(f"{name}_bucket{_labels(route=route, method=method, le=bound)} {count}")
+            lines.append(f'{name}_bucket{_labels(route=route, method=method, le="+Inf")} {series[-1]}')
+            lines.append(f"{name}_sum{_labels(route=route, method=method)} {series[-2]}")
+            lines.append(f"{name}_count{_labels(route=route, method=method)} {series[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    token = getattr(settings, "TICKET_METRICS_TOKEN", "")
+    if token:
+        if not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG:
+        # Per-route traffic is not public: fail closed until a token is configured.
+        return HttpResponse(status=401)
+    return HttpResponse(
+        render_prometheus(*collect()), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_ticket_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticketresponse',
+            index=models.Index(fields=['ticket', 'created_at'], name='response_ticket_created_idx'),
+        ),
+    ]
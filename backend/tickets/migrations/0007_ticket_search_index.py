@@ -0,0 +1,105 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:50
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# The SQL is frozen here rather than imported from tickets.search, so later
+# changes to the runtime search code cannot change what this migration does.
+POSTGRES_INSTALL_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION tickets_ticket_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.ticket_number, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS tickets_ticket_search_vector ON tickets_ticket",
+    """
+    CREATE TRIGGER tickets_ticket_search_vector
+    BEFORE INSERT OR UPDATE OF ticket_number, title, description ON tickets_ticket
+    FOR EACH ROW EXECUTE FUNCTION tickets_ticket_search_vector_update()
+    """,
+    "UPDATE tickets_ticket SET title = title",
+    "CREATE INDEX IF NOT EXISTS ticket_search_vector_gin ON tickets_ticket USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ticket_title_trgm ON tickets_ticket USING gin (UPPER(title::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ticket_number_trgm ON tickets_ticket "
+    "USING gin (UPPER(ticket_number::text) gin_trgm_ops)",
+]
+
+POSTGRES_UNINSTALL_SQL = [
+    "DROP INDEX IF EXISTS ticket_number_trgm",
+    "DROP INDEX IF EXISTS ticket_title_trgm",
+    "DROP INDEX IF EXISTS ticket_search_vector_gin",
+    "DROP TRIGGER IF EXISTS tickets_ticket_search_vector ON tickets_ticket",
+    "DROP FUNCTION IF EXISTS tickets_ticket_search_vector_update()",
+]
+
+_SQLITE_FTS_INSERT = (
+    "INSERT INTO tickets_ticket_fts(rowid, ticket_number, title, description) "
+    "VALUES (new.id, new.ticket_number, new.title, new.description);"
+)
+_SQLITE_FTS_DELETE = (
+    "INSERT INTO tickets_ticket_fts(tickets_ticket_fts, rowid, ticket_number, title, description) "
+    "VALUES ('delete', old.id, old.ticket_number, old.title, old.description);"
+)
+
+SQLITE_INSTALL_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tickets_ticket_fts USING fts5("
+    "ticket_number, title, description, "
+    "content='tickets_ticket', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS tickets_ticket_fts_insert "
+    "AFTER INSERT ON tickets_ticket BEGIN " + _SQLITE_FTS_INSERT + " END",
+    "CREATE TRIGGER IF NOT EXISTS tickets_ticket_fts_delete "
+    "AFTER DELETE ON tickets_ticket BEGIN " + _SQLITE_FTS_DELETE + " END",
+    "CREATE TRIGGER IF NOT EXISTS tickets_ticket_fts_update "
+    "AFTER UPDATE OF ticket_number, title, description ON tickets_ticket BEGIN "
+    + _SQLITE_FTS_DELETE + " " + _SQLITE_FTS_INSERT + " END",
+    "INSERT INTO tickets_ticket_fts(tickets_ticket_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL_SQL = [
+    "DROP TRIGGER IF EXISTS tickets_ticket_fts_insert",
+    "DROP TRIGGER IF EXISTS tickets_ticket_fts_delete",
+    "DROP TRIGGER IF EXISTS tickets_ticket_fts_update",
+    "DROP TABLE IF EXISTS tickets_ticket_fts",
+]
+
+
+def install_search_index(apps, schema_editor):
+    statements = {
+        "postgresql": POSTGRES_INSTALL_SQL,
+        "sqlite": SQLITE_INSTALL_SQL,
+    }.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def uninstall_search_index(apps, schema_editor):
+    statements = {
+        "postgresql": POSTGRES_UNINSTALL_SQL,
+        "sqlite": SQLITE_UNINSTALL_SQL,
+    }.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_ticket_response_created_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='ticket',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
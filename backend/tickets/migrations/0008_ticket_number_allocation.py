@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:52
+
+from django.db import migrations, models
+from django.db.models import Max
+
+# Frozen copies of tickets.numbering.SEQUENCE_NAME / COUNTER_NAME.
+SEQUENCE_NAME = "tickets_ticket_number_seq"
+COUNTER_NAME = "ticket_number"
+
+
+def create_number_sequence(apps, schema_editor):
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketSequence = apps.get_model("tickets", "TicketSequence")
+    db_alias = schema_editor.connection.alias
+    # Existing numbers were derived from the primary key (TKT-{id:06d}).
+    last = Ticket.objects.using(db_alias).aggregate(last=Max("id"))["last"] or 0
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE_NAME} AS bigint")
+        if last:
+            schema_editor.execute("SELECT setval(%s, %s)", [SEQUENCE_NAME, last])
+    else:
+        TicketSequence.objects.using(db_alias).update_or_create(
+            name=COUNTER_NAME, defaults={"value": last}
+        )
+
+
+def drop_number_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP SEQUENCE IF EXISTS {SEQUENCE_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0007_ticket_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_number_sequence, drop_number_sequence),
+    ]
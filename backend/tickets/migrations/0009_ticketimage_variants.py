@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_ticket_number_allocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticketimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
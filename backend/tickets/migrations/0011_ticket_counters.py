@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# A frozen copy of tickets.counters.REBUILD_SQL.
+POPULATE_SQL = [
+    """
+    INSERT INTO tickets_ticketcounter (user_id, status, priority, count)
+    SELECT user_id, status, priority, COUNT(*) FROM tickets_ticket
+    GROUP BY user_id, status, priority
+    """,
+    """
+    INSERT INTO tickets_ticketcounter (user_id, status, priority, count)
+    SELECT NULL, status, priority, COUNT(*) FROM tickets_ticket
+    GROUP BY status, priority
+    """,
+]
+
+
+def populate_counters(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        # Hold off ticket writes so the counts match the rows they were taken from.
+        schema_editor.execute("LOCK TABLE tickets_ticket IN SHARE MODE")
+    for sql in POPULATE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tickets', '0010_image_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20)),
+                ('priority', models.CharField(max_length=10)),
+                ('count', models.BigIntegerField(default=0)),
+                ('user', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='ticketcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', False)), fields=('user', 'status', 'priority'), name='ticket_counter_user_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticketcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('status', 'priority'), name='ticket_counter_global_key'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
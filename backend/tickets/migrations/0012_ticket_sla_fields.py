@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:09
+
+from django.db import migrations, models
+from django.db.models import Case, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+import django.utils.timezone
+
+
+def backfill(apps, schema_editor):
+    # A frozen copy of tickets.sla.backfill_sla_fields, on the historical models.
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketResponse = apps.get_model("tickets", "TicketResponse")
+    db_alias = schema_editor.connection.alias
+    responses = TicketResponse.objects.using(db_alias).filter(ticket=OuterRef("pk")).order_by()
+    first_staff = responses.filter(user__is_staff=True).order_by("created_at").values("created_at")[:1]
+    last_response = responses.order_by("-created_at").values("created_at")[:1]
+    Ticket.objects.using(db_alias).update(
+        first_staff_response_at=Subquery(first_staff),
+        last_activity_at=Greatest(F("updated_at"), Coalesce(Subquery(last_response), F("updated_at"))),
+        closed_at=Case(
+            When(status="closed", then=Coalesce(F("closed_at"), F("updated_at"))),
+            default=Value(None),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0011_ticket_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='first_staff_response_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('first_staff_response_at__isnull', True), models.Q(('status', 'closed'), _negated=True)), fields=['created_at'], name='ticket_awaiting_staff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('status', 'closed'), _negated=True), fields=['last_activity_at'], name='ticket_unresolved_activity_idx'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0012_ticket_sla_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('bucket', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('tat', models.FloatField(db_index=True)),
+            ],
+        ),
+    ]
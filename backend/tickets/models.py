@@ -1,5 +1,44 @@
-from django.db import models
+from collections import Counter
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, router, transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .counters import COUNTED_FIELDS, apply_deltas, counter_key, key_changes
+from .numbering import allocate_ticket_numbers
+from .storage import get_blob_storage
+
+
+class TicketQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        unnumbered = [obj for obj in objs if not obj.ticket_number]
+        numbers = allocate_ticket_numbers(len(unnumbered), using=self.db)
+        for obj, number in zip(unnumbered, numbers):
+            obj.ticket_number = number
+        for obj in objs:
+            if obj.status == Ticket.STATUS_CLOSED and obj.closed_at is None:
+                obj.closed_at = timezone.now()
+        # Counting assumes every object is inserted: rebuild the counters
+        # after a bulk_create that ignores or updates conflicting rows.
+        with transaction.atomic(using=self.db, savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            apply_deltas(Counter(counter_key(obj) for obj in created), using=self.db)
+            TicketChange.objects.using(self.db).record([obj for obj in created if obj.pk])
+        return created
+
+    def with_response_stats(self):
+        """Annotate `response_count` and `last_response_at` via per-row subqueries."""
+        responses = TicketResponse.objects.filter(ticket=OuterRef("pk")).order_by()
+        count = responses.values("ticket").annotate(n=Count("id")).values("n")
+        last = responses.order_by("-created_at").values("created_at")[:1]
+        return self.annotate(
+            response_count=Coalesce(Subquery(count, output_field=IntegerField()), 0),
+            last_response_at=Subquery(last),
+        )
 
 
 class Ticket(models.Model):
@@ -26,25 +65,166 @@ class Ticket(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tickets")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # SLA timestamps, denormalized so reports filter one indexed table (see tickets.sla).
+    first_staff_response_at = models.DateTimeField(null=True, blank=True, editable=False)
+    closed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    last_activity_at = models.DateTimeField(default=timezone.now, editable=False)
+    # Maintained by a database trigger on PostgreSQL (see tickets.search); unused on SQLite.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TicketQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination: one composite index per allowed ordering, with id as tiebreak.
+            models.Index(fields=["created_at", "id"], name="ticket_created_id_idx"),
+            models.Index(fields=["user", "created_at", "id"], name="ticket_user_created_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="ticket_updated_id_idx"),
+            models.Index(fields=["status", "id"], name="ticket_status_id_idx"),
+            # SLA queries only ever look at unresolved tickets.
+            models.Index(
+                fields=["created_at"],
+                condition=Q(first_staff_response_at__isnull=True) & ~Q(status="closed"),
+                name="ticket_awaiting_staff_idx",
+            ),
+            models.Index(
+                fields=["last_activity_at"],
+                condition=~Q(status="closed"),
+                name="ticket_unresolved_activity_idx",
+            ),
+        ]
 
     def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(Ticket, instance=self)
         if not self.ticket_number:
-            super().save(*args, **kwargs)
-            self.ticket_number = f"TKT-{self.id:06d}"
-            super().save(update_fields=["ticket_number"])
+            self.ticket_number = allocate_ticket_numbers(1, using=using)[0]
+        update_fields = kwargs.get("update_fields")
+        if self.status == self.STATUS_CLOSED:
+            self.closed_at = self.closed_at or timezone.now()
         else:
+            self.closed_at = None
+        if update_fields is not None and "status" in update_fields:
+            update_fields = kwargs["update_fields"] = {*update_fields, "closed_at"}
+        if update_fields is not None and not {"user", *COUNTED_FIELDS} & set(update_fields):
+            super().save(*args, **kwargs)
+            return
+        with transaction.atomic(using=using, savepoint=False):
+            previous = None
+            if self.pk is not None:
+                # Read the stored key under a row lock: the in-memory copy may be stale.
+                previous = (
+                    Ticket.objects.using(using).select_for_update()
+                    .filter(pk=self.pk).values_list(*COUNTED_FIELDS).first()
+                )
             super().save(*args, **kwargs)
+            current = counter_key(self)
+            if previous is not None and update_fields is not None:
+                saved = {"user_id" if name == "user" else name for name in update_fields}
+                current = tuple(
+                    new if field in saved else old
+                    for field, new, old in zip(COUNTED_FIELDS, current, previous)
+                )
+            apply_deltas(key_changes(previous, current), using=using)
 
     def __str__(self):
         return self.title
 
 
+class TicketSequence(models.Model):
+    """Named counters for databases without native sequences (see tickets.numbering)."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}={self.value}"
+
+
+class TicketCounterQuerySet(models.QuerySet):
+    def total(self, user_id=None, status=None, priority=None):
+        """Number of tickets matching the key; `user_id=None` counts everyone's."""
+        rows = self.filter(user_id=user_id)
+        if status is not None:
+            rows = rows.filter(status=status)
+        if priority is not None:
+            rows = rows.filter(priority=priority)
+        return rows.aggregate(total=Sum("count"))["total"] or 0
+
+    def breakdown(self, user_id=None):
+        by_status = {value: 0 for value, _ in Ticket.STATUS_CHOICES}
+        by_priority = {value: 0 for value, _ in Ticket.PRIORITY_CHOICES}
+        matrix = {status: dict.fromkeys(by_priority, 0) for status in by_status}
+        for status, priority, count in self.filter(user_id=user_id).values_list(
+            "status", "priority", "count"
+        ):
+            by_status[status] = by_status.get(status, 0) + count
+            by_priority[priority] = by_priority.get(priority, 0) + count
+            matrix.setdefault(status, {})[priority] = count
+        return {
+            "total": sum(by_status.values()),
+            "by_status": by_status,
+            "by_priority": by_priority,
+            "by_status_priority": matrix,
+        }
+
+
+class TicketCounter(models.Model):
+    """Ticket counts per (user, status, priority); rows with no user are global (see tickets.counters)."""
+
+    # No FK constraint: deleting a user deletes their tickets first, which
+    # brings their rows to zero rather than cascading them away mid-delete.
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name="+"
+    )
+    status = models.CharField(max_length=20)
+    priority = models.CharField(max_length=10)
+    count = models.BigIntegerField(default=0)
+
+    objects = TicketCounterQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "status", "priority"],
+                condition=Q(user__isnull=False),
+                name="ticket_counter_user_key",
+            ),
+            models.UniqueConstraint(
+                fields=["status", "priority"],
+                condition=Q(user__isnull=True),
+                name="ticket_counter_global_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id or '*'}/{self.status}/{self.priority}={self.count}"
+
+
+class ImageBlob(models.Model):
+    """An uploaded image stored once under its SHA-256 digest (see tickets.blobs)."""
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.FileField(storage=get_blob_storage, max_length=255)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    # When ref_count last dropped to zero; the blob is collected after a grace period.
+    unreferenced_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256} ({self.ref_count} refs)"
+
+
 class TicketImage(models.Model):
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="images")
     image = models.ImageField(upload_to="tickets/%Y/%m/")
+    # Set for uploads stored by content; `image` then points at the blob's file.
+    blob = models.ForeignKey(
+        ImageBlob, on_delete=models.PROTECT, null=True, blank=True, related_name="images"
+    )
+    # Storage paths of the resized, EXIF-free copies written by tickets.images.
+    variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"{self.ticket.title} - image"
@@ -58,6 +238,51 @@ class TicketResponse(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["ticket", "created_at"], name="response_ticket_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.ticket.title} - {self.user.username}"
+
+
+class ThrottleBucket(models.Model):
+    """Rate limit state for one throttle key, shared by every worker (see tickets.throttling)."""
+
+    bucket = models.CharField(max_length=255, primary_key=True)
+    # Theoretical arrival time (epoch seconds) of the next request; the
+    # bucket is full again once it is in the past.
+    tat = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return self.bucket
+
+
+class TicketChangeQuerySet(models.QuerySet):
+    def record(self, tickets, deleted=False):
+        """Append one change row per ticket (see tickets.changes)."""
+        self.bulk_create(
+            [TicketChange(ticket_id=ticket.pk, user_id=ticket.user_id, deleted=deleted) for ticket in tickets]
+        )
+
+
+class TicketChange(models.Model):
+    """Append-only log of ticket changes read by the delta-sync endpoint (see tickets.changes)."""
+
+    # Plain ids, not foreign keys: deletions are logged as tombstones.
+    ticket_id = models.BigIntegerField()
+    user = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = TicketChangeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="ticket_change_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} ticket {self.ticket_id}{' deleted' if self.deleted else ''}"
@@ -0,0 +1,92 @@
+"""
+Ticket number allocation.
+
+Numbers are reserved before the row is inserted, so creating a ticket is a
+single INSERT and ``bulk_create`` can number a whole batch up front.
+
+PostgreSQL reserves blocks from a dedicated sequence (non-transactional, so
+concurrent creators never wait on each other); each process hands out its
+block locally. Other databases bump a row in ``TicketSequence`` with one
+upsert in the caller's transaction.
+"""
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.db import connections
+
+PREFIX = "TKT-"
+MIN_DIGITS = 6
+SEQUENCE_NAME = "tickets_ticket_number_seq"
+COUNTER_NAME = "ticket_number"
+
+NUMBER_RE = re.compile(rf"^{PREFIX}(\d+)$")
+
+
+def format_ticket_number(value):
+    """`TKT-` plus at least six digits: TKT-000042, TKT-999999, TKT-1000000."""
+    return f"{PREFIX}{value:0{MIN_DIGITS}d}"
+
+
+def parse_ticket_number(ticket_number):
+    match = NUMBER_RE.match(ticket_number or "")
+    return int(match.group(1)) if match else None
+
+
+class SequenceBlocks:
+    """Per-process cache of sequence values reserved in blocks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._values = {}
+
+    def take(self, connection, count):
+        block_size = max(getattr(settings, "TICKET_NUMBER_BLOCK_SIZE", 20), 1)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._values = {}
+            cached = self._values.setdefault(connection.alias, [])
+            if len(cached) < count:
+                cached.extend(self._reserve(connection, max(count - len(cached), block_size)))
+            taken, self._values[connection.alias] = cached[:count], cached[count:]
+        return taken
+
+    @staticmethod
+    def _reserve(connection, count):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)", [SEQUENCE_NAME, count]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+_sequence_blocks = SequenceBlocks()
+
+COUNTER_UPSERT_SQL = """
+    INSERT INTO tickets_ticketsequence (name, value)
+    VALUES (%s, (SELECT COALESCE(MAX(id), 0) FROM tickets_ticket) + %s)
+    ON CONFLICT (name) DO UPDATE SET value = tickets_ticketsequence.value + %s
+    RETURNING value
+"""
+
+
+def _reserve_from_counter(connection, count):
+    with connection.cursor() as cursor:
+        cursor.execute(COUNTER_UPSERT_SQL, [COUNTER_NAME, count, count])
+        last = cursor.fetchone()[0]
+    return list(range(last - count + 1, last + 1))
+
+
+def allocate_ticket_numbers(count, using="default"):
+    """Reserve `count` unique ticket numbers on database `using`."""
+    if count <= 0:
+        return []
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        values = _sequence_blocks.take(connection, count)
+    else:
+        values = _reserve_from_counter(connection, count)
+    return [format_ticket_number(value) for value in values]
@@ -0,0 +1,292 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over the queryset ordering plus ``id``.
+
+    Each page is fetched with ``WHERE (ordering..., id) > (last row)`` instead
+    of ``OFFSET``, and no ``COUNT(*)`` is issued, so page N costs the same as
+    page 1 as long as a composite index matches the ordering.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    ordering = ("-created_at",)
+    invalid_cursor_message = "مقدار cursor نامعتبر است"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request)
+        return self.build_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request)
+        return self.build_page([row async for row in page_queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """Return the (lazy) queryset for one page, including one look-ahead row."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_page_size(request)
+        self.keyset_ordering = self.get_ordering(queryset)
+        self.model = queryset.model
+        self.reverse, position = self.decode_cursor(request)
+
+        ordering = self.keyset_ordering
+        if self.reverse:
+            ordering = [self._invert(term) for term in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, position))
+        return queryset[: self.limit + 1]
+
+    def build_page(self, rows):
+        """Trim the look-ahead row and compute the neighbouring cursors."""
+        has_more = len(rows) > self.limit
+        rows = rows[: self.limit]
+        if self.reverse:
+            rows.reverse()
+        cursor_present = self.request.query_params.get(self.cursor_query_param) is not None
+
+        self.next_position = self.previous_position = None
+        if rows:
+            if has_more or self.reverse:
+                self.next_position = self._position(rows[-1])
+            if (has_more and self.reverse) or (cursor_present and not self.reverse):
+                self.previous_position = self._position(rows[0])
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        ordering = [term for term in (queryset.query.order_by or self.ordering) if isinstance(term, str)]
+        ordering = [term for term in ordering if term.lstrip("-") not in ("id", "pk")]
+        if not ordering:
+            ordering = list(self.ordering)
+        tiebreak = "-id" if ordering[-1].startswith("-") else "id"
+        return ordering + [tiebreak]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return False, None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(padded.encode("ascii")))
+            values = payload["v"]
+            reverse = bool(payload.get("r", False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.keyset_ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, [self._load(term, value) for term, value in zip(self.keyset_ordering, values)]
+
+    def encode_cursor(self, position, reverse=False):
+        payload = {"v": position}
+        if reverse:
+            payload["r"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        encoded = urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque keyset cursor taken from `next`/`previous`.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    @staticmethod
+    def _invert(term):
+        return term[1:] if term.startswith("-") else f"-{term}"
+
+    @staticmethod
+    def _seek_filter(ordering, position):
+        """
+        Build the row-value comparison ``(a, b, id) > (x, y, z)`` as
+        ``a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)``,
+        honouring the direction of every ordering term. The extra ``a >= x``
+        bound lets the database turn the leading column into an index range.
+        """
+        condition = Q()
+        equal_prefix = {}
+        for term, value in zip(ordering, position):
+            field = term.lstrip("-")
+            lookup = "lt" if term.startswith("-") else "gt"
+            condition |= Q(**equal_prefix, **{f"{field}__{lookup}": value})
+            equal_prefix[field] = value
+        first = ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{bound}": position[0]}) & condition
+
+    def _position(self, instance):
+        return [self._dump(getattr(instance, term.lstrip("-"))) for term in self.keyset_ordering]
+
+    @staticmethod
+    def _dump(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def _load(self, term, value):
+        """Coerce a cursor value to its field's type; anything else is an invalid cursor."""
+        try:
+            field = self.model._meta.get_field(term.lstrip("-"))
+        except FieldDoesNotExist:
+            # An annotation: only a plain JSON number or string reaches the query.
+            if not isinstance(value, (int, float, str)):
+                raise NotFound(self.invalid_cursor_message)
+            return value
+        try:
+            value = field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        if isinstance(value, datetime) and timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+
+class ResponsePagination(KeysetPagination):
+    """Oldest-first keyset pages over one ticket's responses (`created_at`, `id`)."""
+
+    ordering = ("created_at",)
+    page_size = 50
+
+
+class TicketPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination for existing clients, switching to keyset
+    pagination when ``?cursor=`` or ``?pagination=cursor`` is present.
+    """
+
+    mode_query_param = "pagination"
+    keyset_class = KeysetPagination
+    max_limit = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        self.view = view
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` with the count and page queries awaited."""
+        self.keyset = None
+        self.view = view
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = await self.aget_count(queryset)
+        self.offset = self.get_offset(request)
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [row async for row in queryset[self.offset:self.offset + self.limit]]
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_count(self, queryset):
+        # Views can answer from maintained counters instead of a COUNT(*).
+        get_counter_total = getattr(self.view, "get_counter_total", None)
+        total = get_counter_total() if get_counter_total else None
+        return super().get_count(queryset) if total is None else total
+
+    async def aget_count(self, queryset):
+        get_counter_total = getattr(self.view, "get_counter_total", None)
+        total = await sync_to_async(get_counter_total)() if get_counter_total else None
+        return await queryset.acount() if total is None else total
+
+    def get_page_signature(self):
+        """Page metadata outside the rows themselves (count, links), for HTTP validators."""
+        if self.keyset is not None:
+            return f"{self.keyset.get_next_link()}|{self.keyset.get_previous_link()}"
+        return f"{self.count}|{self.get_next_link()}|{self.get_previous_link()}"
+
+    def get_schema_operation_parameters(self, view):
+        keyset_parameters = self.keyset_class().get_schema_operation_parameters(view)
+        return super().get_schema_operation_parameters(view) + [
+            keyset_parameters[0],
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` to start keyset pagination.",
+                "schema": {"type": "string", "enum": ["offset", "cursor"]},
+            },
+        ]
@@ -0,0 +1,243 @@
+"""
+On-demand sampling profiles of individual requests.
+
+``ProfilingMiddleware`` profiles a request when a staff user sends
+``X-Profile: 1``, or for a random ``TICKET_PROFILE_SAMPLE_RATE`` fraction of
+all requests. The header's sender is authenticated before the sampler
+starts, so other users cannot make the server sample on their behalf. A
+``Sampler`` thread then records the request thread's stack every
+``TICKET_PROFILE_INTERVAL`` seconds (wall clock, so time waiting on the
+database shows up too); nothing is traced, and requests that are not
+profiled pay for a header lookup and one random number.
+
+Samples are written as folded stacks (``outer;inner;leaf count`` per line),
+which ``flamegraph.pl`` and speedscope read directly, to
+``TICKET_PROFILE_DIR`` with a ``.json`` file describing the request. Only
+the newest ``TICKET_PROFILE_MAX_FILES`` profiles are kept. Staff list them
+at ``/api/profiles/`` and download one at ``/api/profiles/<name>/``.
+
+For a request served by an async view the work moves between the event
+loop and worker threads, so every thread running this project's code is
+sampled; on a busy ASGI worker that includes concurrent requests.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+PROFILE_HEADER = "X-Profile"
+
+
+def profile_dir():
+    return Path(getattr(settings, "TICKET_PROFILE_DIR", settings.BASE_DIR / "logs" / "profiles"))
+
+
+@lru_cache(maxsize=None)
+def short_path(filename):
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        return filename[len(base):]
+    head, sep, tail = filename.rpartition("site-packages" + os.sep)
+    return tail if sep else os.path.basename(filename)
+
+
+@lru_cache(maxsize=4096)
+def frame_label(code):
+    # `;` separates the frames of a folded stack. co_qualname is new in Python 3.11.
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({short_path(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def is_project_code(filename):
+    return filename.startswith(str(settings.BASE_DIR)) and filename != __file__
+
+
+class Sampler(threading.Thread):
+    """Count the stacks of `thread_ids` (or of threads running project code) every `interval`."""
+
+    def __init__(self, thread_ids=None, interval=0.005):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self.ident or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            if self.thread_ids is None and not any(is_project_code(code.co_filename) for code in codes):
+                continue
+            self.stacks[";".join(frame_label(code) for code in reversed(codes))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_trigger(request):
+    if request.headers.get(PROFILE_HEADER) == "1":
+        return "header"
+    rate = getattr(settings, "TICKET_PROFILE_SAMPLE_RATE", 0.0)
+    if rate and random.random() < rate:
+        return "sample"
+    return None
+
+
+def is_staff_request(request):
+    """Authenticate `request` the way the API views do and report whether it is staff."""
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    try:
+        user = Request(request, authenticators=authenticators).user
+    except APIException:
+        return False
+    return user is not None and user.is_staff
+
+
+def request_path(request):
+    # SSE clients pass their access token as ?token=; keep it out of the files.
+    query = request.GET.copy()
+    query.pop("token", None)
+    return f"{request.path}?{query.urlencode()}" if query else request.path
+
+
+def save_profile(request, response, sampler, trigger, duration):
+    # The middleware only starts a header-triggered sampler for staff; check the
+    # user the view authenticated again before anything is written.
+    user = getattr(request, "user", None)
+    if trigger == "header" and not (user is not None and user.is_staff):
+        return None
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    now = timezone.now()
+    name = f"{now:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    match = getattr(request, "resolver_match", None)
+    meta = {
+        "name": name,
+        "method": request.method,
+        "path": request_path(request),
+        "route": match.url_name if match else None,
+        "status": response.status_code,
+        "user": user.get_username() if user is not None and user.is_authenticated else None,
+        "trigger": trigger,
+        "duration_ms": round(duration * 1000, 1),
+        "samples": sum(sampler.stacks.values()),
+        "interval_ms": sampler.interval * 1000,
+        "created_at": now.isoformat(),
+    }
+    (directory / f"{name}.folded").write_text(sampler.folded(), encoding="utf-8")
+    (directory / f"{name}.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    prune_profiles(directory, getattr(settings, "TICKET_PROFILE_MAX_FILES", 100))
+    return name
+
+
+def prune_profiles(directory, keep):
+    metas = sorted(directory.glob("*.json"), key=lambda path: path.name, reverse=True)
+    for meta in metas[keep:]:
+        meta.unlink(missing_ok=True)
+        meta.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def ProfilingMiddleware(get_response):
+    interval = getattr(settings, "TICKET_PROFILE_INTERVAL", 0.005)
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            trigger = profile_trigger(request)
+            if trigger == "header" and not await sync_to_async(is_staff_request)(request):
+                trigger = None
+            if trigger is None:
+                return await get_response(request)
+            sampler = Sampler(interval=interval)
+            sampler.start()
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                sampler.stop()
+            await sync_to_async(save_profile)(request, response, sampler, trigger, time.perf_counter() - started)
+            return response
+
+        return markcoroutinefunction(middleware)
+
+    def middleware(request):
+        trigger = profile_trigger(request)
+        if trigger == "header" and not is_staff_request(request):
+            trigger = None
+        if trigger is None:
+            return get_response(request)
+        sampler = Sampler({threading.get_ident()}, interval=interval)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            response = get_response(request)
+        finally:
+            sampler.stop()
+        save_profile(request, response, sampler, trigger, time.perf_counter() - started)
+        return response
+
+    return middleware
+
+
+ProfilingMiddleware.sync_capable = True
+ProfilingMiddleware.async_capable = True
+
+
+class ProfileListView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        profiles = []
+        directory = profile_dir()
+        if directory.is_dir():
+            for path in sorted(directory.glob("*.json"), key=lambda path: path.name, reverse=True):
+                try:
+                    meta = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+                meta["url"] = request.build_absolute_uri(reverse("profile-detail", args=[path.stem]))
+                profiles.append(meta)
+        return Response(profiles)
+
+
+class ProfileDetailView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, name):
+        try:
+            folded = (profile_dir() / f"{name}.folded").read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise NotFound("پروفایل یافت نشد")
+        response = HttpResponse(folded, content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="{name}.folded"'
+        return response
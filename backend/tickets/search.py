@@ -0,0 +1,191 @@
+"""
+Indexed full-text search for tickets.
+
+PostgreSQL uses the trigger-maintained ``Ticket.search_vector`` column (GIN
+index) plus pg_trgm indexes on ``title``/``ticket_number``. SQLite uses an
+FTS5 table kept in sync by triggers, so the test settings run the same
+filter/rank code path. Every backend filters the queryset and annotates a
+``rank`` (higher is more relevant) usable as ``?ordering=-rank``.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+SEARCH_CONFIG = "simple"
+
+FTS_TABLE = "tickets_ticket_fts"
+
+# Minimum term length the FTS5 trigram tokenizer can match.
+TRIGRAM_MIN_LENGTH = 3
+
+POSTGRES_INSTALL_SQL = [
+    f"""
+    CREATE OR REPLACE FUNCTION tickets_ticket_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.ticket_number, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS tickets_ticket_search_vector ON tickets_ticket",
+    """
+    CREATE TRIGGER tickets_ticket_search_vector
+    BEFORE INSERT OR UPDATE OF ticket_number, title, description ON tickets_ticket
+    FOR EACH ROW EXECUTE FUNCTION tickets_ticket_search_vector_update()
+    """,
+    "UPDATE tickets_ticket SET title = title",
+    "CREATE INDEX IF NOT EXISTS ticket_search_vector_gin ON tickets_ticket USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ticket_title_trgm ON tickets_ticket USING gin (UPPER(title::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ticket_number_trgm ON tickets_ticket "
+    "USING gin (UPPER(ticket_number::text) gin_trgm_ops)",
+]
+
+POSTGRES_UNINSTALL_SQL = [
+    "DROP INDEX IF EXISTS ticket_number_trgm",
+    "DROP INDEX IF EXISTS ticket_title_trgm",
+    "DROP INDEX IF EXISTS ticket_search_vector_gin",
+    "DROP TRIGGER IF EXISTS tickets_ticket_search_vector ON tickets_ticket",
+    "DROP FUNCTION IF EXISTS tickets_ticket_search_vector_update()",
+]
+
+SQLITE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "ticket_number, title, description, "
+    "content='tickets_ticket', content_rowid='id', tokenize='trigram')"
+)
+
+_SQLITE_FTS_INSERT = (
+    f"INSERT INTO {FTS_TABLE}(rowid, ticket_number, title, description) "
+    "VALUES (new.id, new.ticket_number, new.title, new.description);"
+)
+_SQLITE_FTS_DELETE = (
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, ticket_number, title, description) "
+    "VALUES ('delete', old.id, old.ticket_number, old.title, old.description);"
+)
+
+SQLITE_TRIGGERS = {
+    "tickets_ticket_fts_insert": (
+        "AFTER INSERT ON tickets_ticket BEGIN " + _SQLITE_FTS_INSERT + " END"
+    ),
+    "tickets_ticket_fts_delete": (
+        "AFTER DELETE ON tickets_ticket BEGIN " + _SQLITE_FTS_DELETE + " END"
+    ),
+    "tickets_ticket_fts_update": (
+        "AFTER UPDATE OF ticket_number, title, description ON tickets_ticket BEGIN "
+        + _SQLITE_FTS_DELETE + " " + _SQLITE_FTS_INSERT + " END"
+    ),
+}
+
+
+def install_sqlite_fts(connection):
+    """
+    Create the FTS5 table and its sync triggers if missing.
+
+    SQLite drops triggers whenever Django rebuilds ``tickets_ticket`` for an
+    ALTER, so this also runs after every ``migrate`` and re-indexes when a
+    trigger had to be recreated.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SQLITE_TABLE_SQL)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in SQLITE_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(f"CREATE TRIGGER {name} {SQLITE_TRIGGERS[name]}")
+        if missing:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall_sqlite_fts(connection):
+    with connection.cursor() as cursor:
+        for name in SQLITE_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def search_terms(value):
+    return TERM_RE.findall(value or "")
+
+
+class SearchBackend:
+    """Plain substring matching; used for databases without a native index."""
+
+    def search(self, queryset, value):
+        terms = search_terms(value)
+        if not terms:
+            return queryset
+        for term in terms:
+            queryset = queryset.filter(self.substring_q(term))
+        return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+
+    @staticmethod
+    def substring_q(term):
+        return (
+            Q(title__icontains=term)
+            | Q(description__icontains=term)
+            | Q(ticket_number__icontains=term)
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector prefix match on all text, trigram-indexed substring match on title and number."""
+
+    def search(self, queryset, value):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+        terms = search_terms(value)
+        if not terms:
+            return queryset
+        query = SearchQuery(
+            " & ".join(f"'{term}':*" for term in terms), config=SEARCH_CONFIG, search_type="raw"
+        )
+        condition = Q(search_vector=query)
+        for field in ("title", "ticket_number"):
+            field_match = Q()
+            for term in terms:
+                field_match &= Q(**{f"{field}__icontains": term})
+            condition |= field_match
+        return queryset.filter(condition).annotate(
+            rank=SearchRank(F("search_vector"), query) + TrigramSimilarity("title", value)
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 trigram index; terms too short for trigrams fall back to substring matching."""
+
+    def search(self, queryset, value):
+        terms = search_terms(value)
+        if not terms:
+            return queryset
+        indexed = [term for term in terms if len(term) >= TRIGRAM_MIN_LENGTH]
+        for term in terms:
+            if term not in indexed:
+                queryset = queryset.filter(self.substring_q(term))
+        if not indexed:
+            return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+        match = " ".join('"{}"'.format(term.replace('"', '""')) for term in indexed)
+        # Join the FTS table once: bm25() then comes from the same MATCH scan
+        # that selects the rows, not from a correlated MATCH per ticket.
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = tickets_ticket.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+        ).annotate(rank=RawSQL(f"-bm25({FTS_TABLE}, 10.0, 10.0, 1.0)", [], output_field=FloatField()))
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend(queryset):
+    vendor = connections[queryset.db].vendor
+    return BACKENDS.get(vendor, SearchBackend)()
@@ -0,0 +1,195 @@
+"""
+Synthetic data at production scale (see the ``seed_tickets`` command).
+
+``Seeder`` generates users, tickets, response threads and image rows from a
+seeded ``random.Random``, so the same seed gives the same dataset (relative
+to the time it is loaded). Tickets are spread over the last ``days`` with
+most of them recent; older tickets are mostly closed, and the first users
+own a disproportionate share of them, as real accounts do.
+
+Rows are written in batches straight to the tables: ``COPY`` on PostgreSQL,
+one ``executemany`` INSERT per batch elsewhere. ``Ticket.save`` and
+``bulk_create`` are bypassed because they would overwrite ``created_at``
+(``auto_now_add``) and log every row to the change log; ticket numbers are
+still reserved per batch, the per-user counters are rebuilt once at the end,
+and database triggers (search index) fire as usual. Ids are assigned here,
+so seed an otherwise idle database. Image rows point at paths with no file
+behind them.
+"""
+import csv
+import io
+import json
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .counters import rebuild_counters
+from .models import Ticket, TicketImage, TicketResponse
+from .numbering import allocate_ticket_numbers
+
+WORDS = [
+    "خطا", "ورود", "پرداخت", "گزارش", "سرور", "ایمیل", "شبکه", "رمز", "فاکتور", "کند",
+    "چاپگر", "حساب", "کاربری", "تمدید", "اشتراک", "پیامک", "اتصال", "قطع", "نصب", "به‌روزرسانی",
+    "درگاه", "بانک", "بازگشت", "وجه", "سفارش", "ارسال", "پنل", "دسترسی", "فایل", "آپلود",
+    "تصویر", "نمایش", "صفحه", "موبایل", "اپلیکیشن", "همگام‌سازی", "پشتیبان", "تنظیمات", "اعلان", "زمان",
+]
+PRIORITIES = ["low", "medium", "high"]
+PRIORITY_WEIGHTS = [3, 5, 2]
+MEAN_AGE_DAYS = 60
+MEAN_REPLY_MINUTES = 240
+RESPONSES_BY_STATUS = {
+    Ticket.STATUS_OPEN: (0, 1),
+    Ticket.STATUS_IN_PROGRESS: (1, 4),
+    Ticket.STATUS_CLOSED: (2, 8),
+}
+
+TICKET_FIELDS = [
+    "id", "ticket_number", "title", "description", "priority", "status", "user_id",
+    "created_at", "updated_at", "first_staff_response_at", "closed_at", "last_activity_at",
+]
+RESPONSE_FIELDS = ["id", "ticket_id", "user_id", "message", "created_at"]
+IMAGE_FIELDS = ["id", "ticket_id", "image", "variants"]
+
+
+def insert_rows(model, fields, rows, using):
+    """Insert `rows` (tuples in `fields` order, datetimes aware) into `model`'s table."""
+    if not rows:
+        return
+    connection = connections[using]
+    columns = [model._meta.get_field(name).column for name in fields]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_list = ", ".join(connection.ops.quote_name(column) for column in columns)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # CSV reads an unquoted empty field as NULL; no generated text is empty.
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            sql = f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)"
+            raw = cursor.cursor
+            if hasattr(raw, "copy_expert"):  # psycopg2
+                buffer.seek(0)
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+            return
+        adapt = connection.ops.adapt_datetimefield_value
+        dates = [index for index, name in enumerate(fields) if name.endswith("_at")]
+        if dates:
+            rows = [
+                tuple(adapt(value) if index in dates else value for index, value in enumerate(row))
+                for row in rows
+            ]
+        placeholders = ", ".join(["%s"] * len(columns))
+        cursor.executemany(f"INSERT INTO {table} ({column_list}) VALUES ({placeholders})", rows)
+
+
+def next_id(model, using):
+    return (model.objects.using(using).aggregate(last=Max("pk"))["last"] or 0) + 1
+
+
+class Seeder:
+    def __init__(self, seed=0, using="default", batch_size=10000, now=None):
+        self.rng = random.Random(seed)
+        self.using = using
+        self.batch_size = batch_size
+        self.now = now or timezone.now()
+
+    def create_users(self, count, staff=0, prefix="seed", password="password"):
+        """Create `count` users and `staff` staff users; return both id lists."""
+        password = make_password(password)
+        users = [User(username=f"{prefix}-user-{n}", password=password) for n in range(count)]
+        users += [User(username=f"{prefix}-staff-{n}", password=password, is_staff=True) for n in range(staff)]
+        for start in range(0, len(users), self.batch_size):
+            User.objects.using(self.using).bulk_create(users[start:start + self.batch_size])
+        rows = User.objects.using(self.using).filter(username__startswith=f"{prefix}-")
+        ids = dict(rows.values_list("username", "pk"))
+        return (
+            [ids[f"{prefix}-user-{n}"] for n in range(count)],
+            [ids[f"{prefix}-staff-{n}"] for n in range(staff)],
+        )
+
+    def create_tickets(self, count, user_ids, staff_ids, days=365, max_responses=8, image_ratio=0.15, progress=None):
+        """Create `count` tickets with their responses and images; return the row counts."""
+        totals = {"tickets": 0, "responses": 0, "images": 0}
+        ids = {model: next_id(model, self.using) for model in (Ticket, TicketResponse, TicketImage)}
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            with transaction.atomic(using=self.using):
+                numbers = allocate_ticket_numbers(size, using=self.using)
+                tickets, responses, images = [], [], []
+                for number in numbers:
+                    self.generate(ids, number, user_ids, staff_ids, days, max_responses, image_ratio,
+                                  tickets, responses, images)
+                insert_rows(Ticket, TICKET_FIELDS, tickets, self.using)
+                insert_rows(TicketResponse, RESPONSE_FIELDS, responses, self.using)
+                insert_rows(TicketImage, IMAGE_FIELDS, images, self.using)
+            totals["tickets"] += len(tickets)
+            totals["responses"] += len(responses)
+            totals["images"] += len(images)
+            if progress is not None:
+                progress(totals, count)
+        self.finish()
+        return totals
+
+    def generate(self, ids, number, user_ids, staff_ids, days, max_responses, image_ratio,
+                 tickets, responses, images):
+        rng = self.rng
+        ticket_id = ids[Ticket]
+        ids[Ticket] += 1
+        age = min(rng.expovariate(1 / MEAN_AGE_DAYS), days)
+        closed_share = min(0.9, age / 30)
+        roll = rng.random()
+        if roll < closed_share:
+            status = Ticket.STATUS_CLOSED
+        elif roll < closed_share + (1 - closed_share) * 0.4:
+            status = Ticket.STATUS_IN_PROGRESS
+        else:
+            status = Ticket.STATUS_OPEN
+        owner = user_ids[int(len(user_ids) * rng.random() ** 2)]
+        created = self.now - timedelta(days=age)
+
+        low, high = RESPONSES_BY_STATUS[status]
+        moment, first_staff = created, None
+        for position in range(min(rng.randint(low, high), max_responses)):
+            # Threads open with a staff reply, except on tickets nobody has picked up yet.
+            by_staff = bool(staff_ids) and status != Ticket.STATUS_OPEN and position % 2 == 0
+            moment = min(moment + timedelta(minutes=rng.expovariate(1 / MEAN_REPLY_MINUTES)), self.now)
+            if by_staff and first_staff is None:
+                first_staff = moment
+            responses.append((
+                ids[TicketResponse], ticket_id, rng.choice(staff_ids) if by_staff else owner,
+                " ".join(rng.choices(WORDS, k=rng.randint(5, 30))), moment,
+            ))
+            ids[TicketResponse] += 1
+        closed = None
+        if status == Ticket.STATUS_CLOSED:
+            closed = min(moment + timedelta(minutes=rng.expovariate(1 / 60)), self.now)
+        tickets.append((
+            ticket_id, number,
+            " ".join(rng.choices(WORDS, k=rng.randint(3, 6))),
+            " ".join(rng.choices(WORDS, k=rng.randint(15, 60))),
+            rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0], status, owner,
+            created, closed or moment, first_staff, closed, moment,
+        ))
+        if rng.random() < image_ratio:
+            for n in range(rng.randint(1, 3)):
+                images.append((ids[TicketImage], ticket_id, f"tickets/seed/{ticket_id}-{n}.jpg", json.dumps({})))
+                ids[TicketImage] += 1
+
+    def finish(self):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), [Ticket, TicketResponse, TicketImage])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+        rebuild_counters(using=self.using)
+        # Fresh planner statistics for the bulk-loaded tables.
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
@@ -20,16 +20,39 @@ class TicketResponseSerializer(serializers.ModelSerializer):
 
 class TicketImageSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         model = TicketImage
-        fields = ["id", "image"]
+        fields = ["id", "image", "variants"]
 
     def get_image(self, obj):
         if obj.image:
             return obj.image.url
         return None
 
+    def get_variants(self, obj):
+        storage = obj.image.storage
+        return {name: storage.url(path) for name, path in (obj.variants or {}).items()}
+
+
+class SparseFieldsetMixin:
+    """Limit output to the comma-separated field names in `?fields=`."""
+
+    fields_query_param = "fields"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None:
+            return
+        requested = request.query_params.get(self.fields_query_param)
+        if not requested:
+            return
+        allowed = {name.strip() for name in requested.split(",") if name.strip()}
+        for name in set(self.fields) - allowed:
+            self.fields.pop(name)
+
 
 class TicketSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
@@ -50,10 +73,41 @@ class TicketSerializer(serializers.ModelSerializer):
             "responses",
             "created_at",
             "updated_at",
+            "first_staff_response_at",
+            "closed_at",
+            "last_activity_at",
         ]
         read_only_fields = ["user", "status"]
 
 
+class TicketListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """List rows: no nested responses/images, counts come from queryset annotations."""
+
+    user = UserSerializer(read_only=True)
+    response_count = serializers.IntegerField(read_only=True)
+    last_response_at = serializers.DateTimeField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = Ticket
+        fields = [
+            "id",
+            "ticket_number",
+            "title",
+            "description",
+            "priority",
+            "status",
+            "user",
+            "response_count",
+            "last_response_at",
+            "created_at",
+            "updated_at",
+            "first_staff_response_at",
+            "closed_at",
+            "last_activity_at",
+        ]
+        read_only_fields = fields
+
+
 class TicketCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
@@ -0,0 +1,57 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache as ticket_cache
+from .authentication import invalidate_user
+from .blobs import delete_files, release_blob
+from .counters import apply_deltas, counter_key, key_changes
+from .models import Ticket, TicketChange, TicketImage, TicketResponse
+
+
+@receiver([post_save, post_delete], sender=Ticket)
+def invalidate_ticket_detail(sender, instance, using, **kwargs):
+    ticket_cache.invalidate_ticket(instance.pk, using=using)
+
+
+@receiver(post_delete, sender=Ticket)
+def decrement_ticket_counters(sender, instance, using, **kwargs):
+    apply_deltas(key_changes(counter_key(instance), None), using=using)
+
+
+@receiver(post_save, sender=Ticket)
+def log_ticket_change(sender, instance, using, **kwargs):
+    TicketChange.objects.using(using).record([instance])
+
+
+@receiver(post_delete, sender=Ticket)
+def log_ticket_deletion(sender, instance, using, **kwargs):
+    TicketChange.objects.using(using).record([instance], deleted=True)
+
+
+@receiver(post_save, sender=TicketResponse)
+def log_ticket_response(sender, instance, created, using, **kwargs):
+    if created:
+        TicketChange.objects.using(using).record([instance.ticket])
+
+
+@receiver([post_save, post_delete], sender=TicketResponse)
+@receiver([post_save, post_delete], sender=TicketImage)
+def invalidate_parent_ticket_detail(sender, instance, using, **kwargs):
+    ticket_cache.invalidate_ticket(instance.ticket_id, using=using)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, using, **kwargs):
+    invalidate_user(instance.pk, using=using)
+
+
+@receiver(post_delete, sender=TicketImage)
+def release_image_file(sender, instance, **kwargs):
+    if instance.blob_id:
+        release_blob(instance.blob_id)
+    elif instance.image:
+        # Uploads from before content-addressed storage own their file outright.
+        name, storage = instance.image.name, instance.image.storage
+        transaction.on_commit(lambda: delete_files(name, storage))
@@ -0,0 +1,55 @@
+"""
+SLA timestamps on tickets.
+
+``first_staff_response_at``, ``closed_at`` and ``last_activity_at`` live on
+``Ticket`` so SLA reports read one table through partial indexes instead of
+aggregating responses joined to users. ``Ticket.save`` keeps ``closed_at`` in
+step with the status; the views record activity and the first staff reply.
+``backfill_sla_fields`` derives all three from the responses table, for
+existing rows and imports.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+CLOSED = "closed"
+
+
+def sla_deadline(hours=None):
+    if hours is None:
+        hours = getattr(settings, "TICKET_SLA_HOURS", 24)
+    return timezone.now() - timedelta(hours=float(hours))
+
+
+def overdue_q(hours=None):
+    """Unresolved tickets older than the SLA with no staff reply; matches ticket_awaiting_staff_idx."""
+    return (
+        Q(first_staff_response_at__isnull=True)
+        & ~Q(status=CLOSED)
+        & Q(created_at__lt=sla_deadline(hours))
+    )
+
+
+def inactive_q(hours):
+    """Unresolved tickets with no activity for `hours`; matches ticket_unresolved_activity_idx."""
+    return ~Q(status=CLOSED) & Q(last_activity_at__lt=sla_deadline(hours))
+
+
+def backfill_sla_fields(queryset):
+    """Recompute the SLA columns of every ticket in `queryset` with one UPDATE."""
+    # Resolved through the model so historical models in migrations work too.
+    response_model = queryset.model._meta.get_field("responses").related_model
+    responses = response_model._default_manager.filter(ticket=OuterRef("pk")).order_by()
+    first_staff = responses.filter(user__is_staff=True).order_by("created_at").values("created_at")[:1]
+    last_response = responses.order_by("-created_at").values("created_at")[:1]
+    return queryset.update(
+        first_staff_response_at=Subquery(first_staff),
+        last_activity_at=Greatest(F("updated_at"), Coalesce(Subquery(last_response), F("updated_at"))),
+        closed_at=Case(
+            When(status=CLOSED, then=Coalesce(F("closed_at"), F("updated_at"))),
+            default=Value(None),
+        ),
+    )
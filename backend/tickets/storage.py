@@ -0,0 +1,32 @@
+from django.core.files.storage import FileSystemStorage
+
+
+class BlobStorage(FileSystemStorage):
+    """
+    Filesystem storage for write-once, content-addressed files.
+
+    A name is derived from the file's content hash, so an existing name
+    already holds the same bytes: saving it again is a no-op rather than a
+    rename to ``name_<random>``.
+    """
+
+    def save(self, name, content, max_length=None):
+        if self.exists(name):
+            return name
+        try:
+            return super().save(name, content, max_length=max_length)
+        except FileExistsError:
+            # Another request stored the same content first.
+            return name
+
+    def get_available_name(self, name, max_length=None):
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+
+blob_storage = BlobStorage()
+
+
+def get_blob_storage():
+    return blob_storage
@@ -0,0 +1,93 @@
+"""
+Server-Sent Events streams of ticket changes (requires serving via ASGI).
+
+``/api/events/`` streams the events for the caller's own tickets (all
+tickets for staff); ``/api/tickets/<id>/events/`` those for one ticket.
+``EventSource`` cannot send headers, so the JWT access token may also be
+passed as ``?token=``. Streams are closed after ``TICKET_EVENTS_MAX_AGE``
+seconds and the browser reconnects on its own, which bounds the life of a
+stream whose client went away unnoticed.
+"""
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import CachedJWTAuthentication
+from .events import OVERFLOW, STAFF_CHANNEL, get_broker, ticket_channel, user_channel
+from .models import Ticket
+
+KEEPALIVE_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+
+
+@sync_to_async
+def authenticate(request):
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    raw_token = raw_token or request.GET.get("token", "").encode() or None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return None
+
+
+def format_event(event):
+    data = json.dumps(event, ensure_ascii=False)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+async def event_stream(subscription):
+    deadline = time.monotonic() + getattr(settings, "TICKET_EVENTS_MAX_AGE", 300)
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while time.monotonic() < deadline:
+            event = await subscription.get(timeout=KEEPALIVE_SECONDS)
+            if event is None:
+                yield ": keepalive\n\n"
+            elif event is OVERFLOW:
+                yield 'event: reset\ndata: {}\n\n'
+                return
+            else:
+                yield format_event(event)
+    finally:
+        subscription.close()
+
+
+def stream_response(channels):
+    response = StreamingHttpResponse(
+        event_stream(get_broker().subscribe(channels)), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def unauthorized():
+    return JsonResponse({"detail": "اطلاعات احراز هویت ارائه نشده است"}, status=401)
+
+
+async def user_events(request):
+    user = await authenticate(request)
+    if user is None:
+        return unauthorized()
+    return stream_response([STAFF_CHANNEL if user.is_staff else user_channel(user.pk)])
+
+
+async def ticket_events(request, pk):
+    user = await authenticate(request)
+    if user is None:
+        return unauthorized()
+    owner_id = await Ticket.objects.filter(pk=pk).values_list("user_id", flat=True).afirst()
+    if owner_id is None:
+        return JsonResponse({"detail": "یافت نشد."}, status=404)
+    if not user.is_staff and owner_id != user.pk:
+        return JsonResponse({"detail": "شما اجازه انجام این کار را ندارید."}, status=403)
+    return stream_response([ticket_channel(pk)])
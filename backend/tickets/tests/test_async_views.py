@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tickets.models import Ticket, TicketResponse
+
+
+def asgi_request(method, url, user=None, headers=None, **kwargs):
+    headers = dict(headers or {})
+    if user is not None:
+        headers["Authorization"] = f"Bearer {AccessToken.for_user(user)}"
+
+    async def send():
+        return await getattr(AsyncClient(), method)(url, headers=headers, **kwargs)
+
+    return async_to_sync(send)()
+
+
+class TestAsyncRouting:
+    def test_hot_actions_are_coroutines(self):
+        assert asyncio.iscoroutinefunction(resolve(reverse("ticket-list")).func)
+        assert asyncio.iscoroutinefunction(resolve(reverse("ticket-detail", args=[1])).func)
+        assert asyncio.iscoroutinefunction(resolve(reverse("ticket-respond", args=[1])).func)
+        assert not asyncio.iscoroutinefunction(resolve(reverse("ticket-stats")).func)
+
+
+@pytest.mark.django_db
+class TestAsyncTicketViews:
+    def test_list_matches_sync_path(self, user):
+        for n in range(3):
+            Ticket.objects.create(title=f"تیکت {n}", description="تست", user=user)
+        resp = asgi_request("get", reverse("ticket-list"), user, data={"limit": 2})
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json()["count"] == 3
+        client = APIClient()
+        client.force_authenticate(user=user)
+        assert resp.json() == client.get(reverse("ticket-list"), {"limit": 2}).json()
+
+    def test_keyset_list(self, user):
+        for n in range(3):
+            Ticket.objects.create(title=f"تیکت {n}", description="تست", user=user)
+        resp = asgi_request("get", reverse("ticket-list"), user, data={"pagination": "cursor", "limit": 2})
+        body = resp.json()
+        assert len(body["results"]) == 2
+        assert body["next"]
+
+    def test_retrieve_and_conditional_get(self, user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        url = reverse("ticket-detail", args=[ticket.pk])
+        resp = asgi_request("get", url, user)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json()["ticket_number"] == ticket.ticket_number
+        again = asgi_request("get", url, user, headers={"If-None-Match": resp["ETag"]})
+        assert again.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_retrieve_other_users_ticket_is_hidden(self, user, admin_user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=admin_user)
+        resp = asgi_request("get", reverse("ticket-detail", args=[ticket.pk]), user)
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_respond(self, user, admin_user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        resp = asgi_request(
+            "post", reverse("ticket-respond", args=[ticket.pk]), admin_user,
+            data={"message": "پاسخ"}, content_type="application/json",
+        )
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert TicketResponse.objects.filter(ticket=ticket).count() == 1
+        ticket.refresh_from_db()
+        assert ticket.status == Ticket.STATUS_IN_PROGRESS
+
+    def test_unauthenticated(self):
+        assert asgi_request("get", reverse("ticket-list")).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_browsable_api_uses_sync_path(self, user):
+        Ticket.objects.create(title="تست", description="تست", user=user)
+        resp = asgi_request("get", reverse("ticket-list"), user, data={"format": "api"})
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["Content-Type"].startswith("text/html")
+
+    def test_sync_actions_still_served(self, user):
+        resp = asgi_request(
+            "post", reverse("ticket-list"), user,
+            data={"title": "جدید", "description": "تست", "priority": "low"},
+        )
+        assert resp.status_code == status.HTTP_201_CREATED
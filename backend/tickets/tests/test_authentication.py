@@ -0,0 +1,129 @@
+import pytest
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tickets.authentication import CachedJWTAuthentication, invalidate_user
+from tickets.models import Ticket
+
+
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    return client
+
+
+def auth_user_queries(queries):
+    return [q["sql"] for q in queries if '"auth_user"' in q["sql"]]
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def test_repeat_requests_skip_user_lookup(self, user):
+        client = jwt_client(user)
+        assert client.get("/api/auth/me/").status_code == status.HTTP_200_OK
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get("/api/auth/me/")
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["username"] == "testuser"
+        assert auth_user_queries(ctx.captured_queries) == []
+
+    def test_permissions_work_with_cached_user(self, user, admin_user):
+        own = Ticket.objects.create(title="تست", description="تست", user=user)
+        other = Ticket.objects.create(title="تست", description="تست", user=admin_user)
+        client = jwt_client(user)
+        client.get(reverse("ticket-list"))
+        assert client.get(reverse("ticket-detail", args=[own.pk])).status_code == status.HTTP_200_OK
+        assert client.get(reverse("ticket-detail", args=[other.pk])).status_code == status.HTTP_404_NOT_FOUND
+        resp = client.patch(reverse("ticket-detail", args=[own.pk]), {"title": "جدید"}, format="json")
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_staff_change_is_seen_immediately(self, user, django_capture_on_commit_callbacks):
+        client = jwt_client(user)
+        assert client.get("/api/auth/me/").data["is_staff"] is False
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_staff = True
+            user.save()
+        assert client.get("/api/auth/me/").data["is_staff"] is True
+
+    def test_deactivated_user_is_rejected(self, user, django_capture_on_commit_callbacks):
+        client = jwt_client(user)
+        client.get("/api/auth/me/")
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+        assert client.get("/api/auth/me/").status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_password_change_and_delete_drop_the_entry(self, user, django_capture_on_commit_callbacks):
+        client = jwt_client(user)
+        client.get("/api/auth/me/")
+        with django_capture_on_commit_callbacks(execute=True):
+            user.set_password("another-pass-123")
+            user.save()
+        with CaptureQueriesContext(connection) as ctx:
+            client.get("/api/auth/me/")
+        assert len(auth_user_queries(ctx.captured_queries)) == 1
+        with django_capture_on_commit_callbacks(execute=True):
+            user.delete()
+        assert client.get("/api/auth/me/").status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_queryset_update_needs_explicit_invalidation(self, user, django_capture_on_commit_callbacks):
+        client = jwt_client(user)
+        client.get("/api/auth/me/")
+        type(user).objects.filter(pk=user.pk).update(is_active=False)
+        assert client.get("/api/auth/me/").status_code == status.HTTP_200_OK
+        with django_capture_on_commit_callbacks(execute=True):
+            invalidate_user(user.pk)
+        assert client.get("/api/auth/me/").status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_recache_before_commit_is_dropped(self, user, django_capture_on_commit_callbacks):
+        client = jwt_client(user)
+        client.get("/api/auth/me/")
+        stale = cache.get(f"auth-user:{user.pk}")
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+            # A concurrent request still reads the committed (active) row and caches it.
+            cache.set(f"auth-user:{user.pk}", stale)
+        assert client.get("/api/auth/me/").status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_zero_timeout_disables_the_cache(self, user, settings):
+        settings.TICKET_AUTH_USER_CACHE_TIMEOUT = 0
+        client = jwt_client(user)
+        client.get("/api/auth/me/")
+        with CaptureQueriesContext(connection) as ctx:
+            client.get("/api/auth/me/")
+        assert len(auth_user_queries(ctx.captured_queries)) == 1
+        assert cache.get(f"auth-user:{user.pk}") is None
+
+    def test_cache_timeout_is_bounded_by_token_and_setting(self, user, settings):
+        token = AccessToken.for_user(user)
+        settings.TICKET_AUTH_USER_CACHE_TIMEOUT = 30
+        assert CachedJWTAuthentication().get_cache_timeout(token) == 30
+        settings.TICKET_AUTH_USER_CACHE_TIMEOUT = 10**6
+        assert 3500 < CachedJWTAuthentication().get_cache_timeout(token) <= 3600
+
+
+@pytest.mark.django_db
+def test_demotion_reaches_other_workers(settings, tmp_path, admin_user, django_capture_on_commit_callbacks):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "cache"),
+        }
+    }
+    # Another worker process: its own connection to the same cache backend.
+    other = caches.create_connection("default")
+    client = jwt_client(admin_user)
+    assert client.get(reverse("ticket-export")).status_code == status.HTTP_200_OK
+    assert other.get(f"auth-user:{admin_user.pk}").is_staff
+
+    with django_capture_on_commit_callbacks(execute=True):
+        admin_user.is_staff = False
+        admin_user.save()
+    assert other.get(f"auth-user:{admin_user.pk}") is None
+    assert client.get(reverse("ticket-export")).status_code == status.HTTP_403_FORBIDDEN
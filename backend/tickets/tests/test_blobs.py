@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tickets.blobs import acquire_blob, collect_orphan_files, collect_unreferenced
+from tickets.images import process_image
+from tickets.models import ImageBlob, Ticket, TicketImage
+from tickets.storage import get_blob_storage
+from tickets.tests.test_ticket_views import create_test_image
+
+
+def create_ticket(user, images):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    data = {"title": "تست", "description": "تست", "priority": "low", "images": images}
+    resp = client.post(reverse("ticket-list"), data, format="multipart")
+    assert resp.status_code == status.HTTP_201_CREATED
+    return Ticket.objects.get(pk=resp.data["id"])
+
+
+@pytest.mark.django_db
+class TestImageBlobs:
+    def test_identical_uploads_share_one_blob(self, user):
+        first = create_ticket(user, [create_test_image("a.jpg")])
+        second = create_ticket(user, [create_test_image("screenshot.JPEG")])
+        assert ImageBlob.objects.count() == 1
+        blob = ImageBlob.objects.get()
+        assert blob.ref_count == 2
+        assert blob.file.name.startswith(f"blobs/{blob.sha256[:2]}/{blob.sha256[2:4]}/{blob.sha256}")
+        names = {image.image.name for image in TicketImage.objects.filter(ticket__in=[first, second])}
+        assert names == {blob.file.name}
+        assert get_blob_storage().exists(blob.file.name)
+
+    def test_distinct_content_gets_distinct_blobs(self, user):
+        create_ticket(user, [create_test_image("a.jpg"), create_test_image("b.png", format="PNG")])
+        assert ImageBlob.objects.count() == 2
+        assert set(ImageBlob.objects.values_list("ref_count", flat=True)) == {1}
+
+    def test_deleting_tickets_releases_references(self, user):
+        first = create_ticket(user, [create_test_image()])
+        second = create_ticket(user, [create_test_image()])
+        first.delete()
+        blob = ImageBlob.objects.get()
+        assert blob.ref_count == 1
+        assert blob.unreferenced_at is None
+        second.delete()
+        blob.refresh_from_db()
+        assert blob.ref_count == 0
+        assert blob.unreferenced_at is not None
+
+    def test_collect_deletes_blob_and_variants_after_grace(self, user):
+        ticket = create_ticket(user, [create_test_image()])
+        variants = process_image(ticket.images.get().pk)
+        ticket.delete()
+        blob = ImageBlob.objects.get()
+        storage = get_blob_storage()
+
+        assert collect_unreferenced() == 0
+        assert storage.exists(blob.file.name)
+
+        ImageBlob.objects.update(unreferenced_at=timezone.now() - timedelta(days=1))
+        call_command("collect_image_blobs", "--batch-size", "1")
+        assert not ImageBlob.objects.exists()
+        assert not storage.exists(blob.file.name)
+        assert not any(storage.exists(path) for path in variants.values())
+
+    def test_reupload_after_release_revives_blob(self, user):
+        create_ticket(user, [create_test_image()]).delete()
+        create_ticket(user, [create_test_image()])
+        blob = ImageBlob.objects.get()
+        assert blob.ref_count == 1
+        assert blob.unreferenced_at is None
+        assert collect_unreferenced(grace=timedelta(0)) == 0
+
+    def test_shared_blob_reuses_variants(self, user):
+        first = create_ticket(user, [create_test_image()])
+        second = create_ticket(user, [create_test_image()])
+        variants = process_image(first.images.get().pk)
+        assert process_image(second.images.get().pk) == variants
+
+    def test_legacy_image_file_deleted_with_ticket(self, user, django_capture_on_commit_callbacks):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        image = TicketImage.objects.create(ticket=ticket, image=create_test_image())
+        storage, name = image.image.storage, image.image.name
+        assert storage.exists(name)
+        with django_capture_on_commit_callbacks(execute=True):
+            ticket.delete()
+        assert not storage.exists(name)
+
+    def test_acquire_is_one_query(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            blob = acquire_blob(create_test_image())
+        assert blob.ref_count == 1
+        with django_assert_num_queries(1):
+            again = acquire_blob(create_test_image())
+        assert again.ref_count == 2
+        assert again.file.name == blob.file.name
+        assert ImageBlob.objects.get().ref_count == 2
+
+    def test_sweep_deletes_files_of_rolled_back_uploads(self, user):
+        kept = create_ticket(user, [create_test_image()]).images.get().image.name
+        with pytest.raises(RuntimeError), transaction.atomic():
+            orphan = acquire_blob(create_test_image("b.png", format="PNG")).file.name
+            raise RuntimeError
+        storage = get_blob_storage()
+        assert storage.exists(orphan)
+        assert not ImageBlob.objects.filter(file=orphan).exists()
+
+        assert collect_orphan_files() == 0
+        assert collect_orphan_files(grace=timedelta(0)) == 1
+        assert not storage.exists(orphan)
+        assert storage.exists(kept)
@@ -0,0 +1,146 @@
+import importlib.util
+import threading
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from tickets import cache as ticket_cache
+from tickets.models import Ticket, TicketResponse
+
+
+@pytest.mark.django_db
+class TestTicketDetailCache:
+    def test_second_retrieve_skips_serialization_queries(self, user, django_assert_num_queries):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        TicketResponse.objects.create(ticket=ticket, user=user, message="پیام")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        first = client.get(url)
+        # The ticket lookup, plus the throttle bucket update.
+        with django_assert_num_queries(2):
+            second = client.get(url)
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data == first.data
+
+    def test_new_response_invalidates_entry(self, user, django_capture_on_commit_callbacks):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        assert client.get(url).data["responses"] == []
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(reverse("ticket-respond", kwargs={"pk": ticket.pk}), {"message": "جدید"}, format="json")
+        assert [r["message"] for r in client.get(url).data["responses"]] == ["جدید"]
+
+    def test_update_invalidates_entry(self, user, django_capture_on_commit_callbacks):
+        ticket = Ticket.objects.create(title="قدیم", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        client.get(url)
+        with django_capture_on_commit_callbacks(execute=True):
+            client.patch(url, {"title": "جدید"}, format="json")
+        assert client.get(url).data["title"] == "جدید"
+
+    def test_read_before_commit_is_not_kept(self, user, django_capture_on_commit_callbacks):
+        ticket = Ticket.objects.create(title="قدیم", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        stale = client.get(url).data
+        with django_capture_on_commit_callbacks(execute=True):
+            ticket.title = "جدید"
+            ticket.save()
+            # A concurrent request still sees the committed (old) row and caches it.
+            ticket_cache.get_or_build(ticket.pk, lambda: stale)
+        assert client.get(url).data["title"] == "جدید"
+
+    def test_cached_payload_still_checks_permissions(self, user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        owner = APIClient()
+        owner.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        owner.get(url)
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(username="other", password="pass123"))
+        assert other.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestCacheCoalescing:
+    def test_concurrent_miss_waits_for_builder(self):
+        key = ticket_cache._payload_key(99, ticket_cache.get_version(99), "default")
+        cache.add(f"{key}:lock", 1, 10)
+
+        def finish_build():
+            cache.set(key, {"id": 99}, 60)
+
+        timer = threading.Timer(0.1, finish_build)
+        timer.start()
+        try:
+            payload = ticket_cache.get_or_build(99, lambda: pytest.fail("should not rebuild"))
+        finally:
+            timer.join()
+        assert payload == {"id": 99}
+
+    def test_invalidation_bumps_version(self, django_capture_on_commit_callbacks):
+        calls = []
+        ticket_cache.get_or_build(7, lambda: calls.append(1) or {"v": 1})
+        ticket_cache.get_or_build(7, lambda: calls.append(1) or {"v": 1})
+        with django_capture_on_commit_callbacks(execute=True):
+            ticket_cache.invalidate_ticket(7)
+        assert ticket_cache.get_or_build(7, lambda: calls.append(1) or {"v": 2}) == {"v": 2}
+        assert len(calls) == 2
+
+
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+
+
+def load_settings():
+    """A fresh copy of config.settings for the current environment."""
+    spec = importlib.util.find_spec("config.settings")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.django_db
+class TestSharedCache:
+    def test_caches_need_redis(self, monkeypatch):
+        monkeypatch.setenv("REDIS_URL", "redis://cache:6379/0")
+        shared = load_settings()
+        assert shared.CACHES["default"] == {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://cache:6379/0",
+        }
+        assert shared.TICKET_DETAIL_CACHE_TIMEOUT > 0
+        assert shared.TICKET_AUTH_USER_CACHE_TIMEOUT > 0
+
+        monkeypatch.delenv("REDIS_URL")
+        local = load_settings()
+        assert local.TICKET_DETAIL_CACHE_TIMEOUT == 0
+        assert local.TICKET_AUTH_USER_CACHE_TIMEOUT == 0
+
+    def test_disabled_cache_always_builds(self, settings):
+        settings.TICKET_DETAIL_CACHE_TIMEOUT = 0
+        calls = []
+        ticket_cache.get_or_build(7, lambda: calls.append(1) or {"v": 1})
+        ticket_cache.get_or_build(7, lambda: calls.append(1) or {"v": 1})
+        assert len(calls) == 2
+
+    def test_invalidation_reaches_other_workers(self, settings, tmp_path, django_capture_on_commit_callbacks):
+        settings.CACHES = {"default": {"BACKEND": FILE_CACHE, "LOCATION": str(tmp_path / "cache")}}
+        # What another worker process sees: its own connection to the same store
+        # (a file cache standing in for Redis).
+        other = caches.create_connection("default")
+        assert ticket_cache.get_or_build(7, lambda: {"v": 1}) == {"v": 1}
+        version = ticket_cache.get_version(7)
+        assert other.get(ticket_cache._payload_key(7, version, "default")) == {"v": 1}
+        with django_capture_on_commit_callbacks(execute=True):
+            ticket_cache.invalidate_ticket(7)
+        assert other.get(ticket_cache._version_key(7)) != version
@@ -0,0 +1,122 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tickets.changes import encode_cursor
+from tickets.models import Ticket, TicketChange, TicketResponse
+
+
+@pytest.fixture(autouse=True)
+def no_settle_time(settings):
+    settings.TICKET_CHANGES_SETTLE_SECONDS = 0
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def sync(client, cursor):
+    resp = client.get(reverse("ticket-changes"), {"cursor": cursor})
+    assert resp.status_code == status.HTTP_200_OK
+    return resp.data
+
+
+def start(client):
+    return client.get(reverse("ticket-changes")).data["cursor"]
+
+
+@pytest.mark.django_db
+class TestTicketChanges:
+    def test_without_cursor_returns_starting_point(self, user):
+        Ticket.objects.create(title="قدیمی", description="تست", user=user)
+        data = client_for(user).get(reverse("ticket-changes")).data
+        assert data["changed"] == [] and data["deleted"] == []
+        assert data["cursor"]
+
+    def test_reports_created_updated_responded_and_deleted(self, user):
+        client = client_for(user)
+        kept = Ticket.objects.create(title="یک", description="تست", user=user)
+        gone = Ticket.objects.create(title="دو", description="تست", user=user)
+        cursor = start(client)
+        assert sync(client, cursor)["changed"] == []
+
+        created = Ticket.objects.create(title="سه", description="تست", user=user)
+        TicketResponse.objects.create(ticket=kept, user=user, message="پاسخ")
+        gone_id = gone.pk
+        gone.delete()
+        data = sync(client, cursor)
+        assert sorted(row["id"] for row in data["changed"]) == sorted([kept.pk, created.pk])
+        assert data["deleted"] == [{"id": gone_id}]
+        assert next(row for row in data["changed"] if row["id"] == kept.pk)["response_count"] == 1
+
+        assert sync(client, data["cursor"])["changed"] == []
+        kept.title = "ویرایش"
+        kept.save()
+        data = sync(client, data["cursor"])
+        assert [row["title"] for row in data["changed"]] == ["ویرایش"]
+
+    def test_only_own_tickets_for_users(self, user, admin_user):
+        other = User.objects.create_user(username="other", password="pass123")
+        cursor = start(client_for(user))
+        mine = Ticket.objects.create(title="من", description="تست", user=user)
+        Ticket.objects.create(title="دیگری", description="تست", user=other)
+        assert [row["id"] for row in sync(client_for(user), cursor)["changed"]] == [mine.pk]
+        assert len(sync(client_for(admin_user), encode_cursor(0))["changed"]) == 2
+
+    def test_batches_continue_with_has_more(self, user):
+        client = client_for(user)
+        cursor = start(client)
+        for n in range(5):
+            Ticket.objects.create(title=f"تیکت {n}", description="تست", user=user)
+        with mock.patch("tickets.changes.BATCH_SIZE", 2):
+            seen = []
+            while True:
+                data = sync(client, cursor)
+                seen += [row["id"] for row in data["changed"]]
+                cursor = data["cursor"]
+                if not data["has_more"]:
+                    break
+        assert len(seen) == 5
+
+    def test_unsettled_changes_are_sent_again(self, user, settings):
+        settings.TICKET_CHANGES_SETTLE_SECONDS = 60
+        client = client_for(user)
+        cursor = encode_cursor(0)
+        ticket = Ticket.objects.create(title="تازه", description="تست", user=user)
+        first = sync(client, cursor)
+        assert [row["id"] for row in first["changed"]] == [ticket.pk]
+        # Too recent to rule out an earlier id still committing: the cursor stays put.
+        assert [row["id"] for row in sync(client, first["cursor"])["changed"]] == [ticket.pk]
+        TicketChange.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        settled = sync(client, first["cursor"])
+        assert sync(client, settled["cursor"])["changed"] == []
+
+    def test_invalid_and_expired_cursor(self, user, settings):
+        client = client_for(user)
+        assert client.get(reverse("ticket-changes"), {"cursor": "!!"}).status_code == status.HTTP_400_BAD_REQUEST
+        cursor = start(client)
+        with mock.patch("tickets.changes.time.time", return_value=time.time() + 31 * 86400):
+            resp = client.get(reverse("ticket-changes"), {"cursor": cursor})
+        assert resp.status_code == status.HTTP_410_GONE
+
+    def test_bulk_created_tickets_are_logged(self, user):
+        cursor = start(client_for(user))
+        Ticket.objects.bulk_create([Ticket(title=f"{n}", description="تست", user=user) for n in range(3)])
+        assert len(sync(client_for(user), cursor)["changed"]) == 3
+
+    def test_prune_command(self, user):
+        Ticket.objects.create(title="تست", description="تست", user=user)
+        TicketChange.objects.update(created_at=timezone.now() - timedelta(days=40))
+        Ticket.objects.create(title="تست", description="تست", user=user)
+        call_command("prune_ticket_changes")
+        assert TicketChange.objects.count() == 1
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth.models import User
+
+from tickets.models import Ticket, TicketResponse
+
+
+@pytest.mark.django_db
+class TestTicketDetailConditionalGet:
+    def test_detail_emits_validators(self, user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-detail", kwargs={"pk": ticket.pk}))
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["ETag"].startswith('"')
+        assert "Last-Modified" in resp
+        assert "private" in resp["Cache-Control"]
+
+    def test_matching_etag_returns_304_with_one_query(self, user, django_assert_num_queries):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        etag = client.get(url)["ETag"]
+        # The ticket lookup, plus the throttle bucket update.
+        with django_assert_num_queries(2):
+            resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+        assert resp.content == b""
+
+    def test_new_response_changes_etag(self, user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        etag = client.get(url)["ETag"]
+        TicketResponse.objects.create(ticket=ticket, user=user, message="جدید")
+        resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["ETag"] != etag
+
+    def test_if_modified_since_returns_304(self, user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        last_modified = client.get(url)["Last-Modified"]
+        resp = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_other_user_gets_404_not_304(self, user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        owner = APIClient()
+        owner.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        etag = owner.get(url)["ETag"]
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(username="other", password="pass123"))
+        assert other.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestTicketListConditionalGet:
+    def test_unchanged_list_returns_304(self, user):
+        Ticket.objects.create(title="تست", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-list")
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_status_change_and_delete_change_list_etag(self, user):
+        first = Ticket.objects.create(title="۱", description="د", user=user)
+        second = Ticket.objects.create(title="۲", description="د", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-list")
+        etag = client.get(url)["ETag"]
+        first.status = "closed"
+        first.save()
+        changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == status.HTTP_200_OK
+        second.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=changed["ETag"]).status_code == status.HTTP_200_OK
+
+    def test_list_is_validated_by_etag_only(self, user):
+        Ticket.objects.create(title="۱", description="د", user=user)
+        second = Ticket.objects.create(title="۲", description="د", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-list")
+        first = client.get(url)
+        assert "Last-Modified" not in first
+        second.delete()
+        # What a client would send had the list carried the newest row's timestamp.
+        resp = client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time()))
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.data["results"]) == 1
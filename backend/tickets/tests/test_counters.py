@@ -0,0 +1,131 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tickets.models import Ticket, TicketCounter
+
+
+def make_ticket(user, **kwargs):
+    return Ticket.objects.create(title="تست", description="تست", user=user, **kwargs)
+
+
+def stored_counts():
+    return {
+        (row.user_id, row.status, row.priority): row.count
+        for row in TicketCounter.objects.exclude(count=0)
+    }
+
+
+def recomputed_counts():
+    call_command("rebuild_ticket_counters", stdout=StringIO())
+    return stored_counts()
+
+
+@pytest.mark.django_db
+class TestTicketCounters:
+    def test_create_increments_user_and_global_rows(self, user):
+        make_ticket(user, priority="high")
+        make_ticket(user, priority="high")
+        assert stored_counts() == {
+            (user.pk, "open", "high"): 2,
+            (None, "open", "high"): 2,
+        }
+
+    def test_status_change_moves_count(self, user):
+        ticket = make_ticket(user)
+        ticket.status = Ticket.STATUS_CLOSED
+        ticket.save()
+        assert TicketCounter.objects.total(status="open") == 0
+        assert TicketCounter.objects.total(user_id=user.pk, status="closed") == 1
+
+    def test_update_fields_uses_stored_values(self, user):
+        ticket = make_ticket(user, priority="low")
+        stale = Ticket.objects.get(pk=ticket.pk)
+        stale.priority = "medium"  # not saved below
+        stale.status = Ticket.STATUS_IN_PROGRESS
+        stale.save(update_fields=["status"])
+        assert stored_counts() == recomputed_counts()
+
+    def test_admin_reply_uses_stored_key(self, user, admin_user):
+        ticket = make_ticket(user, priority="low")
+        stale = Ticket.objects.get(pk=ticket.pk)
+        ticket.priority = "high"  # saved after the view has loaded its copy
+        ticket.save()
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+        with mock.patch("tickets.views.TicketViewSet.get_object", return_value=stale), \
+                mock.patch("tickets.views.TicketViewSet.aget_object", return_value=stale):
+            resp = client.post(reverse("ticket-respond", args=[ticket.pk]), {"message": "م"}, format="json")
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert stored_counts() == recomputed_counts()
+
+    def test_delete_and_bulk_create(self, user, admin_user):
+        Ticket.objects.bulk_create(
+            [Ticket(title="۱", description="د", user=user), Ticket(title="۲", description="د", user=admin_user)]
+        )
+        make_ticket(user).delete()
+        assert TicketCounter.objects.total() == 2
+        assert stored_counts() == recomputed_counts()
+
+    def test_deleting_user_zeroes_their_counters(self, user):
+        make_ticket(user)
+        user.delete()
+        assert TicketCounter.objects.total() == 0
+        assert TicketCounter.objects.total(user_id=user.pk) == 0
+
+
+@pytest.mark.django_db
+class TestTicketStats:
+    def test_user_sees_own_counts(self, user, admin_user):
+        make_ticket(user, priority="high")
+        make_ticket(admin_user, priority="low")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-stats"))
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["total"] == 1
+        assert resp.data["by_status"] == {"open": 1, "in_progress": 0, "closed": 0}
+        assert resp.data["by_priority"] == {"low": 0, "medium": 0, "high": 1}
+        assert resp.data["by_status_priority"]["open"]["high"] == 1
+
+    def test_staff_sees_global_or_chosen_user(self, user, admin_user):
+        make_ticket(user)
+        make_ticket(admin_user)
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+        assert client.get(reverse("ticket-stats")).data["total"] == 2
+        assert client.get(reverse("ticket-stats"), {"user": user.pk}).data["total"] == 1
+        assert client.get(reverse("ticket-stats"), {"user": "x"}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_requires_authentication(self):
+        assert APIClient().get(reverse("ticket-stats")).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestListCountFromCounters:
+    def test_status_filter_count_comes_from_counters(self, user):
+        for _ in range(3):
+            make_ticket(user)
+        other = User.objects.create_user(username="other", password="pass12345")
+        make_ticket(other)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        # Proves the count is read from the counter rather than COUNT(*).
+        TicketCounter.objects.filter(user=user, status="open").update(count=42)
+        resp = client.get(reverse("ticket-list"), {"status": "OPEN", "limit": 2})
+        assert resp.data["count"] == 42
+        assert len(resp.data["results"]) == 2
+
+    def test_other_filters_fall_back_to_count_query(self, user):
+        make_ticket(user)
+        TicketCounter.objects.update(count=42)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-list"), {"search": "تست"})
+        assert resp.data["count"] == 1
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tickets.events import (
+    OVERFLOW,
+    STAFF_CHANNEL,
+    InProcessBroker,
+    get_broker,
+    ticket_channel,
+    user_channel,
+)
+from tickets.models import Ticket
+
+
+class Recorder:
+    def __init__(self, channels):
+        self.channels = set(channels)
+        self.events = []
+
+    def deliver(self, event):
+        self.events.append(event)
+
+
+@pytest.fixture
+def recorder():
+    recorder = Recorder([STAFF_CHANNEL])
+    get_broker().add(recorder)
+    yield recorder
+    get_broker().unsubscribe(recorder)
+
+
+class TestInProcessBroker:
+    def test_fan_out_by_channel(self):
+        async def scenario():
+            broker = InProcessBroker()
+            mine = broker.subscribe([ticket_channel(1)])
+            other = broker.subscribe([ticket_channel(2)])
+            broker.publish([ticket_channel(1), STAFF_CHANNEL], {"type": "ticket.updated", "ticket": 1})
+            assert (await mine.get(timeout=1))["ticket"] == 1
+            assert await other.get(timeout=0.05) is None
+            mine.close()
+            broker.publish([ticket_channel(1)], {"type": "ticket.updated", "ticket": 1})
+            assert broker._subscribers.keys() == {ticket_channel(2)}
+
+        async_to_sync(scenario)()
+
+    def test_slow_subscriber_gets_overflow_marker(self):
+        async def scenario():
+            broker = InProcessBroker()
+            subscription = broker.subscribe([STAFF_CHANNEL], maxsize=2)
+            for n in range(3):
+                broker.publish([STAFF_CHANNEL], {"type": "ticket.updated", "ticket": n})
+            await asyncio.sleep(0)
+            assert await subscription.get(timeout=1) is OVERFLOW
+
+        async_to_sync(scenario)()
+
+
+@pytest.mark.django_db
+class TestPublishing:
+    def test_respond_publishes_after_commit(self, user, admin_user, recorder, django_capture_on_commit_callbacks):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(reverse("ticket-respond", args=[ticket.pk]), {"message": "پاسخ"})
+        [event] = recorder.events
+        assert event["type"] == "ticket.response"
+        assert event["ticket"] == ticket.pk
+        assert event["status"] == Ticket.STATUS_IN_PROGRESS
+        assert event["staff"] is True
+
+    def test_update_and_delete_publish(self, user, recorder, django_capture_on_commit_callbacks):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with django_capture_on_commit_callbacks(execute=True):
+            client.patch(reverse("ticket-detail", args=[ticket.pk]), {"title": "جدید"})
+            client.delete(reverse("ticket-detail", args=[ticket.pk]))
+        assert [event["type"] for event in recorder.events] == ["ticket.updated", "ticket.deleted"]
+        assert recorder.events[1]["ticket"] == ticket.pk
+
+
+@pytest.mark.django_db
+class TestEventStreams:
+    def open_stream(self, url, token=None):
+        async def scenario():
+            client = AsyncClient()
+            response = await client.get(url, {"token": token} if token else {})
+            if not response.streaming:
+                return response, None
+            chunks = aiter(response.streaming_content)
+            first = await anext(chunks)
+            user_id = int(AccessToken(token)["user_id"])
+            get_broker().publish([user_channel(user_id), STAFF_CHANNEL], {"type": "ticket.updated", "ticket": 7})
+            second = await anext(chunks)
+            await chunks.aclose()
+            return response, [first, second]
+
+        return async_to_sync(scenario)()
+
+    def test_requires_token(self):
+        response, _ = self.open_stream(reverse("events"))
+        assert response.status_code == 401
+
+    def test_user_stream_receives_own_events(self, user):
+        response, chunks = self.open_stream(reverse("events"), str(AccessToken.for_user(user)))
+        assert response["Content-Type"] == "text/event-stream"
+        assert chunks[0].startswith(b"retry:")
+        assert chunks[1].startswith(b"event: ticket.updated\ndata: ")
+
+    def test_ticket_stream_checks_ownership(self, user, admin_user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=admin_user)
+        response, _ = self.open_stream(
+            reverse("ticket-events", args=[ticket.pk]), str(AccessToken.for_user(user))
+        )
+        assert response.status_code == 403
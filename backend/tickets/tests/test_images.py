@@ -0,0 +1,83 @@
+import io
+
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from tickets.images import process_image
+from tickets.models import Ticket, TicketChange, TicketImage
+
+ORIENTATION = 0x0112
+
+
+def photo_with_exif(name="photo.jpg", size=(2000, 1000)):
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6  # rotated 90° clockwise
+    exif[0x010F] = "Camera Maker"
+    file = io.BytesIO()
+    Image.new("RGB", size, color="blue").save(file, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, file.getvalue(), content_type="image/jpeg")
+
+
+@pytest.mark.django_db
+class TestImageProcessing:
+    def test_variants_are_resized_and_exif_free(self, user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        image = TicketImage.objects.create(ticket=ticket, image=photo_with_exif())
+        variants = process_image(image.pk)
+        assert set(variants) == {"thumbnail", "thumbnail_webp", "webp"}
+        image.refresh_from_db()
+        assert image.variants == variants
+        with image.image.storage.open(variants["thumbnail"]) as f:
+            thumb = Image.open(f)
+            assert thumb.format == "JPEG"
+            assert max(thumb.size) <= 320
+            # EXIF orientation was applied, then dropped.
+            assert thumb.size[1] > thumb.size[0]
+            assert not thumb.getexif()
+        with image.image.storage.open(variants["webp"]) as f:
+            assert Image.open(f).format == "WEBP"
+
+    def test_upload_schedules_processing_after_commit(
+        self, user, settings, django_capture_on_commit_callbacks
+    ):
+        settings.TICKET_IMAGE_PROCESSING_SYNC = True
+        client = APIClient()
+        client.force_authenticate(user=user)
+        data = {"title": "تست", "description": "تست", "priority": "low", "images": [photo_with_exif()]}
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            resp = client.post(reverse("ticket-list"), data, format="multipart")
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert resp.data["images"][0]["variants"] == {}
+        for callback in callbacks:
+            callback()
+        detail = client.get(reverse("ticket-detail", kwargs={"pk": resp.data["id"]}))
+        variants = detail.data["images"][0]["variants"]
+        assert set(variants) == {"thumbnail", "thumbnail_webp", "webp"}
+        assert variants["thumbnail"].startswith("/media/variants/")
+
+    def test_processing_changes_the_detail_etag(self, user, django_capture_on_commit_callbacks):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        image = TicketImage.objects.create(ticket=ticket, image=photo_with_exif())
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-detail", kwargs={"pk": ticket.pk})
+        before = client.get(url)
+        assert before.data["images"][0]["variants"] == {}
+        with django_capture_on_commit_callbacks(execute=True):
+            process_image(image.pk)
+        after = client.get(url, headers={"If-None-Match": before["ETag"]})
+        assert after.status_code == status.HTTP_200_OK
+        assert set(after.data["images"][0]["variants"]) == {"thumbnail", "thumbnail_webp", "webp"}
+        assert TicketChange.objects.filter(ticket_id=ticket.pk).count() == 2
+
+    def test_backfill_command_processes_missing_variants(self, user):
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        image = TicketImage.objects.create(ticket=ticket, image=photo_with_exif())
+        call_command("process_ticket_images", stdout=io.StringIO())
+        image.refresh_from_db()
+        assert image.variants
@@ -0,0 +1,111 @@
+import json
+import logging
+import threading
+import time
+
+from tickets.logging_handlers import JsonFormatter, QueueingHandler
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, gate=None):
+        super().__init__()
+        self.records = []
+        self.lines = []
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.records.append(record)
+        self.lines.append(self.format(record))
+
+
+def make_logger(handler):
+    logger = logging.getLogger(f"tickets.tests.{id(handler)}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+class TestJsonFormatter:
+    def test_structured_fields(self):
+        record = logging.LogRecord("tickets.views", logging.INFO, __file__, 1, "Ticket %s by %s", ("TKT-1", "علی"), None)
+        record.ticket = "TKT-1"
+        payload = json.loads(JsonFormatter().format(record))
+        assert payload["message"] == "Ticket TKT-1 by علی"
+        assert payload["level"] == "INFO"
+        assert payload["logger"] == "tickets.views"
+        assert payload["ticket"] == "TKT-1"
+        assert "args" not in payload and "msg" not in payload
+
+    def test_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            import sys
+
+            record = logging.LogRecord("x", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+        assert "ValueError: boom" in json.loads(JsonFormatter().format(record))["exception"]
+
+
+class TestQueueingHandler:
+    def test_formats_on_listener_thread(self):
+        target = ListHandler()
+        handler = QueueingHandler(target)
+        handler.setFormatter(JsonFormatter())
+        threads = []
+
+        class Arg:
+            def __str__(self):
+                threads.append(threading.current_thread())
+                return "arg"
+
+        try:
+            make_logger(handler).info("value %s", Arg())
+            handler.flush()
+        finally:
+            handler.close()
+        assert json.loads(target.lines[0])["message"] == "value arg"
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_never_blocks_and_reports_drops(self):
+        gate = threading.Event()
+        target = ListHandler(gate)
+        handler = QueueingHandler(target, maxsize=10, high_water=0.5, sample_every=2)
+        logger = make_logger(handler)
+        try:
+            started = time.monotonic()
+            for n in range(100):
+                logger.info("record %d", n)
+            logger.warning("important")
+            assert time.monotonic() - started < 1
+            gate.set()
+            handler.flush()
+            logger.info("after")
+            handler.flush()
+        finally:
+            gate.set()
+            handler.close()
+        messages = [record.getMessage() for record in target.records]
+        assert len(messages) < 100
+        assert messages[-1] == "after"
+        assert any(message.startswith("Dropped") for message in messages)
+
+    def test_respects_level(self):
+        target = ListHandler()
+        handler = QueueingHandler(target)
+        handler.setLevel(logging.WARNING)
+        logger = make_logger(handler)
+        try:
+            logger.info("skipped")
+            logger.warning("kept")
+            handler.flush()
+        finally:
+            handler.close()
+        assert [record.getMessage() for record in target.records] == ["kept"]
+
+
+def test_ticket_logger_is_queued():
+    queued = [h for h in logging.getLogger("tickets").handlers if isinstance(h, QueueingHandler)]
+    assert len(queued) == 2
@@ -0,0 +1,120 @@
+import json
+import os
+import re
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tickets.metrics import registry
+from tickets.models import Ticket
+from tickets.tests.test_async_views import asgi_request
+
+SERVER_TIMING = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries", ser;dur=[\d.]+, total;dur=[\d.]+')
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.TICKET_METRICS_DIR = str(tmp_path / "metrics")
+    settings.TICKET_METRICS_TOKEN = "s3cret"
+    registry.reset()
+    yield tmp_path / "metrics"
+    registry.reset()
+
+
+def scrape(client=None, **headers):
+    headers.setdefault("Authorization", "Bearer s3cret")
+    resp = (client or APIClient()).get("/metrics", headers=headers)
+    return resp, resp.content.decode()
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+    def test_sync_view_reports_queries(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-stats"))
+        match = SERVER_TIMING.fullmatch(resp["Server-Timing"])
+        assert match
+        assert int(match.group(1)) >= 1
+
+    def test_async_view_reports_queries(self, user):
+        Ticket.objects.create(title="تست", description="تست", user=user)
+        resp = asgi_request("get", reverse("ticket-list"), user)
+        assert resp.status_code == status.HTTP_200_OK
+        match = SERVER_TIMING.fullmatch(resp["Server-Timing"])
+        assert match
+        # The count query and the page, at least, ran in worker threads.
+        assert int(match.group(1)) >= 2
+
+    def test_unmatched_request(self):
+        resp = APIClient().get("/no-such-page/")
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+        assert "Server-Timing" in resp
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    def test_per_route_histograms(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.get(reverse("ticket-list"))
+        client.get(reverse("ticket-list"))
+        client.post(reverse("auth-token"), {"username": "testuser", "password": "wrong"})
+        resp, body = scrape()
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert 'ticket_http_requests_total{route="ticket-list",method="GET",status="2xx"} 2' in body
+        assert 'ticket_http_requests_total{route="auth-token",method="POST",status="4xx"} 1' in body
+        assert 'ticket_http_request_duration_seconds_count{route="ticket-list",method="GET"} 2' in body
+        assert 'ticket_http_db_queries_bucket{route="ticket-list",method="GET",le="+Inf"} 2' in body
+        assert "# TYPE ticket_http_serialization_duration_seconds histogram" in body
+
+    def test_sums_snapshots_of_other_workers(self, user, metrics_dir):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.get(reverse("ticket-list"))
+        scrape()
+        [own] = metrics_dir.glob("*.json")
+        other = json.loads(own.read_text())
+        (metrics_dir / "1-exited.json").write_text(json.dumps(other))
+        _, body = scrape()
+        assert 'ticket_http_requests_total{route="ticket-list",method="GET",status="2xx"} 2' in body
+        assert 'ticket_http_request_duration_seconds_count{route="ticket-list",method="GET"} 2' in body
+
+    def test_ignores_unreadable_snapshots(self, metrics_dir):
+        metrics_dir.mkdir()
+        (metrics_dir / "2.json").write_text("{")
+        resp, _ = scrape()
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_token(self):
+        resp, _ = scrape(Authorization="")
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+        resp, _ = scrape(Authorization="Bearer wrong")
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+        resp, _ = scrape(Authorization="Bearer s3cret")
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_closed_without_token_outside_debug(self, settings):
+        settings.TICKET_METRICS_TOKEN = ""
+        resp, _ = scrape(Authorization="")
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+        settings.DEBUG = True
+        resp, _ = scrape(Authorization="")
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_snapshot_name_survives_pid_reuse(self, user, metrics_dir):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        client.get(reverse("ticket-list"))
+        scrape()
+        [own] = metrics_dir.glob("*.json")
+        pid, suffix = own.stem.split("-")
+        assert pid == str(os.getpid())
+        assert len(suffix) == 32
+        # An exited worker that had the same PID keeps its snapshot.
+        (metrics_dir / f"{pid}-{'0' * 32}.json").write_text(own.read_text())
+        scrape()
+        assert len(list(metrics_dir.glob("*.json"))) == 2
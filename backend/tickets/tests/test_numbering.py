@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tickets.models import Ticket
+from tickets.numbering import format_ticket_number, parse_ticket_number
+
+
+def ticket_writes(queries):
+    return [
+        q["sql"].split()[0].upper()
+        for q in queries
+        if '"tickets_ticket"' in q["sql"] and not q["sql"].upper().startswith("SELECT")
+    ]
+
+
+@pytest.mark.django_db
+class TestTicketNumbering:
+    def test_create_is_a_single_insert(self, user):
+        with CaptureQueriesContext(connection) as ctx:
+            ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        assert ticket_writes(ctx.captured_queries) == ["INSERT"]
+        assert parse_ticket_number(ticket.ticket_number) is not None
+        ticket.refresh_from_db()
+        assert ticket.ticket_number.startswith("TKT-")
+
+    def test_numbers_increase(self, user):
+        first = Ticket.objects.create(title="۱", description="د", user=user)
+        second = Ticket.objects.create(title="۲", description="د", user=user)
+        assert parse_ticket_number(second.ticket_number) > parse_ticket_number(first.ticket_number)
+
+    def test_bulk_create_numbers_every_ticket(self, user):
+        tickets = Ticket.objects.bulk_create(
+            [Ticket(title=f"تیکت {i}", description="د", user=user) for i in range(25)]
+        )
+        numbers = [t.ticket_number for t in tickets]
+        assert all(numbers)
+        assert len(set(numbers)) == 25
+        stored = set(Ticket.objects.values_list("ticket_number", flat=True))
+        assert stored == set(numbers)
+
+    def test_explicit_number_is_kept(self, user):
+        ticket = Ticket.objects.create(title="تست", description="د", user=user, ticket_number="TKT-LEGACY-1")
+        assert ticket.ticket_number == "TKT-LEGACY-1"
+
+
+class TestTicketNumberFormat:
+    def test_six_digit_minimum_and_growth(self):
+        assert format_ticket_number(42) == "TKT-000042"
+        assert format_ticket_number(999_999) == "TKT-999999"
+        assert format_ticket_number(1_000_000) == "TKT-1000000"
+
+    def test_parse_round_trips(self):
+        for value in (1, 999_999, 1_000_000, 123_456_789):
+            assert parse_ticket_number(format_ticket_number(value)) == value
+        assert parse_ticket_number("INVALID") is None
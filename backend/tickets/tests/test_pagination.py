@@ -0,0 +1,101 @@
+import json
+from base64 import urlsafe_b64encode
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from tickets.models import Ticket
+
+
+def create_tickets(user, count):
+    statuses = ["open", "in_progress", "closed"]
+    return [
+        Ticket.objects.create(
+            title=f"تیکت {i}", description="د", priority="medium", user=user, status=statuses[i % 3]
+        )
+        for i in range(count)
+    ]
+
+
+def walk_pages(client, url, params):
+    """Follow `next` links from the first page and return the collected ids."""
+    resp = client.get(url, params)
+    assert resp.status_code == status.HTTP_200_OK
+    ids = [row["id"] for row in resp.data["results"]]
+    pages = 1
+    while resp.data["next"]:
+        resp = client.get(resp.data["next"])
+        assert resp.status_code == status.HTTP_200_OK
+        ids.extend(row["id"] for row in resp.data["results"])
+        pages += 1
+    return ids, pages
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+    def test_cursor_mode_walks_all_tickets_in_order(self, user):
+        create_tickets(user, 7)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        ids, pages = walk_pages(client, reverse("ticket-list"), {"pagination": "cursor", "limit": 3})
+        expected = list(Ticket.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        assert ids == expected
+        assert pages == 3
+
+    def test_cursor_mode_has_no_count(self, user):
+        create_tickets(user, 2)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-list"), {"pagination": "cursor"})
+        assert resp.status_code == status.HTTP_200_OK
+        assert "count" not in resp.data
+        assert resp.data["next"] is None
+        assert resp.data["previous"] is None
+
+    def test_cursor_mode_respects_ordering_param(self, admin_user):
+        create_tickets(admin_user, 6)
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+        ids, _ = walk_pages(
+            client, reverse("ticket-list"), {"pagination": "cursor", "limit": 2, "ordering": "status"}
+        )
+        expected = list(Ticket.objects.order_by("status", "id").values_list("id", flat=True))
+        assert ids == expected
+
+    def test_previous_link_returns_preceding_page(self, user):
+        create_tickets(user, 5)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("ticket-list")
+        first = client.get(url, {"pagination": "cursor", "limit": 2})
+        second = client.get(first.data["next"])
+        back = client.get(second.data["previous"])
+        assert [r["id"] for r in back.data["results"]] == [r["id"] for r in first.data["results"]]
+        assert back.data["previous"] is None
+
+    @pytest.mark.parametrize("cursor", [
+        "not-a-cursor",
+        {"v": ["2024-01-01T00:00:00", ["x"]]},
+        {"v": ["2024-01-01T00:00:00", "abc"]},
+        {"v": ["2024-13-01T00:00:00", 1]},
+        {"v": [None, 1]},
+        {"v": [{"a": 1}, 1]},
+    ])
+    def test_invalid_cursor_returns_404(self, user, cursor):
+        if isinstance(cursor, dict):
+            cursor = urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-list"), {"cursor": cursor})
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_offset_mode_is_still_default(self, user):
+        create_tickets(user, 3)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-list"), {"limit": 2, "offset": 2})
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["count"] == 3
+        assert len(resp.data["results"]) == 1
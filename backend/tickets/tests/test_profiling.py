@@ -0,0 +1,122 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tickets.models import Ticket
+from tickets.profiling import Sampler
+from tickets.tests.test_async_views import asgi_request
+
+PROFILE = {"X-Profile": "1"}
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(settings, tmp_path):
+    settings.TICKET_PROFILE_DIR = tmp_path / "profiles"
+    settings.TICKET_PROFILE_INTERVAL = 0.001
+    settings.TICKET_PROFILE_SAMPLE_RATE = 0
+    return settings.TICKET_PROFILE_DIR
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestSampler:
+    def test_counts_stacks_of_the_given_thread(self):
+        worker = threading.Thread(target=busy_wait, args=(0.1,))
+        worker.start()
+        sampler = Sampler({worker.ident}, interval=0.001)
+        sampler.start()
+        worker.join()
+        sampler.stop()
+        lines = sampler.folded().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert stack.split(";")[-1].startswith("busy_wait (tickets/tests/test_profiling.py:")
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    def test_staff_header_stores_a_profile(self, admin_user, profile_dir):
+        client = client_for(admin_user)
+        resp = client.get(reverse("ticket-stats"), {"token": "secret"}, headers=PROFILE)
+        assert resp.status_code == status.HTTP_200_OK
+        [meta] = client.get(reverse("profile-list")).json()
+        assert meta["route"] == "ticket-stats"
+        assert meta["path"] == reverse("ticket-stats")
+        assert meta["user"] == "admin"
+        assert meta["trigger"] == "header"
+        assert (profile_dir / f"{meta['name']}.folded").exists()
+
+        download = client.get(meta["url"])
+        assert download.status_code == status.HTTP_200_OK
+        assert download["Content-Type"].startswith("text/plain")
+
+    def test_header_ignored_for_non_staff(self, user, profile_dir):
+        client_for(user).get(reverse("ticket-list"), headers=PROFILE)
+        assert not profile_dir.exists()
+
+    def test_non_staff_header_starts_no_sampler(self, user, profile_dir):
+        with mock.patch("tickets.profiling.Sampler") as sampler:
+            client_for(user).get(reverse("ticket-list"), headers=PROFILE)
+            APIClient().get(reverse("ticket-list"), headers=PROFILE)
+            asgi_request("get", reverse("ticket-list"), user, headers=PROFILE)
+        sampler.assert_not_called()
+
+    def test_staff_token_header_stores_a_profile(self, admin_user, profile_dir):
+        token = AccessToken.for_user(admin_user)
+        client = APIClient()
+        client.get(reverse("ticket-stats"), headers={**PROFILE, "Authorization": f"Bearer {token}"})
+        assert len(list(profile_dir.glob("*.folded"))) == 1
+
+    def test_not_profiled_without_header(self, admin_user, profile_dir):
+        client_for(admin_user).get(reverse("ticket-list"))
+        assert not profile_dir.exists()
+
+    def test_sample_rate_profiles_any_user(self, settings, user, profile_dir):
+        settings.TICKET_PROFILE_SAMPLE_RATE = 1
+        client_for(user).get(reverse("ticket-list"))
+        [meta] = profile_dir.glob("*.json")
+        assert '"trigger": "sample"' in meta.read_text()
+
+    def test_async_view(self, admin_user, profile_dir):
+        Ticket.objects.create(title="تست", description="تست", user=admin_user)
+        resp = asgi_request("get", reverse("ticket-list"), admin_user, headers=PROFILE)
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(list(profile_dir.glob("*.folded"))) == 1
+
+    def test_keeps_the_newest_profiles(self, settings, admin_user, profile_dir):
+        settings.TICKET_PROFILE_MAX_FILES = 2
+        client = client_for(admin_user)
+        for _ in range(3):
+            client.get(reverse("ticket-stats"), headers=PROFILE)
+        profiles = client.get(reverse("profile-list")).json()
+        assert len(profiles) == 2
+        assert len(list(profile_dir.glob("*.folded"))) == 2
+
+
+@pytest.mark.django_db
+class TestProfileViews:
+    def test_staff_only(self, user):
+        client = client_for(user)
+        assert client.get(reverse("profile-list")).status_code == status.HTTP_403_FORBIDDEN
+        assert client.get(reverse("profile-detail", args=["x"])).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_missing_profile(self, admin_user):
+        resp = client_for(admin_user).get(reverse("profile-detail", args=["missing"]))
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tickets.models import Ticket, TicketResponse
+
+
+@pytest.fixture
+def conversation(user):
+    ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+    start = timezone.now() - timedelta(hours=1)
+    for n in range(7):
+        response = TicketResponse.objects.create(ticket=ticket, user=user, message=f"پیام {n}")
+        TicketResponse.objects.filter(pk=response.pk).update(created_at=start + timedelta(minutes=n))
+    return ticket
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def messages(resp):
+    return [row["message"] for row in resp.data["results"]]
+
+
+@pytest.mark.django_db
+class TestResponsesEndpoint:
+    def test_pages_oldest_first(self, user, conversation):
+        client = client_for(user)
+        url = reverse("ticket-responses", args=[conversation.pk])
+        first = client.get(url, {"limit": 3})
+        assert first.status_code == status.HTTP_200_OK
+        assert messages(first) == ["پیام 0", "پیام 1", "پیام 2"]
+        second = client.get(first.data["next"])
+        assert messages(second) == ["پیام 3", "پیام 4", "پیام 5"]
+        last = client.get(second.data["next"])
+        assert messages(last) == ["پیام 6"]
+        assert last.data["next"] is None
+
+    def test_since_returns_only_newer(self, user, conversation):
+        client = client_for(user)
+        url = reverse("ticket-responses", args=[conversation.pk])
+        everything = client.get(url).data["results"]
+        resp = client.get(url, {"since": everything[4]["created_at"]})
+        assert messages(resp) == ["پیام 5", "پیام 6"]
+        assert client.get(url, {"since": everything[-1]["created_at"]}).data["results"] == []
+
+    @pytest.mark.parametrize("since", ["دیروز", "2024-13-01T00:00:00", "2024-01-01T25:00:00"])
+    def test_invalid_since(self, user, conversation, since):
+        resp = client_for(user).get(reverse("ticket-responses", args=[conversation.pk]), {"since": since})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_other_users_ticket_is_hidden(self, conversation):
+        from django.contrib.auth.models import User
+
+        other = User.objects.create_user(username="other", password="pass123")
+        resp = client_for(other).get(reverse("ticket-responses", args=[conversation.pk]))
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_unauthenticated(self, conversation):
+        resp = APIClient().get(reverse("ticket-responses", args=[conversation.pk]))
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_query_count_does_not_grow_with_conversation(self, user, conversation, django_assert_num_queries):
+        client = client_for(user)
+        # throttle, ticket, one page of responses with their authors
+        with django_assert_num_queries(3):
+            client.get(reverse("ticket-responses", args=[conversation.pk]), {"limit": 2})
+
+
+@pytest.mark.django_db
+class TestDetailResponsesLimit:
+    def test_embeds_last_n_oldest_first(self, user, conversation):
+        resp = client_for(user).get(reverse("ticket-detail", args=[conversation.pk]), {"responses_limit": 2})
+        assert [row["message"] for row in resp.data["responses"]] == ["پیام 5", "پیام 6"]
+        assert resp.data["response_count"] == 7
+
+    def test_default_embeds_everything(self, user, conversation):
+        resp = client_for(user).get(reverse("ticket-detail", args=[conversation.pk]))
+        assert len(resp.data["responses"]) == 7
+        assert resp.data["response_count"] == 7
+
+    def test_limits_are_cached_and_validated_separately(self, user, conversation):
+        client = client_for(user)
+        url = reverse("ticket-detail", args=[conversation.pk])
+        full = client.get(url)
+        short = client.get(url, {"responses_limit": 1})
+        assert len(short.data["responses"]) == 1
+        assert short["ETag"] != full["ETag"]
+        assert len(client.get(url).data["responses"]) == 7
+
+    def test_new_response_invalidates_limited_payload(self, user, conversation, django_capture_on_commit_callbacks):
+        client = client_for(user)
+        url = reverse("ticket-detail", args=[conversation.pk])
+        client.get(url, {"responses_limit": 1})
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(reverse("ticket-respond", args=[conversation.pk]), {"message": "تازه"}, format="json")
+        resp = client.get(url, {"responses_limit": 1})
+        assert [row["message"] for row in resp.data["responses"]] == ["تازه"]
+
+    def test_invalid_limit(self, user, conversation):
+        resp = client_for(user).get(reverse("ticket-detail", args=[conversation.pk]), {"responses_limit": "x"})
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_limited_detail_query_count(self, user, conversation, django_assert_num_queries):
+        client = client_for(user)
+        # throttle, ticket with stats, ticket with owner, images, last N responses
+        with django_assert_num_queries(5):
+            client.get(reverse("ticket-detail", args=[conversation.pk]), {"responses_limit": 3})
@@ -0,0 +1,85 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth.models import User
+
+from tickets.models import Ticket
+
+
+def search(client, value, **params):
+    resp = client.get(reverse("ticket-list"), {"search": value, **params})
+    assert resp.status_code == status.HTTP_200_OK
+    return [row["id"] for row in resp.data["results"]]
+
+
+@pytest.mark.django_db
+class TestTicketSearch:
+    def test_matches_title_description_and_number(self, user):
+        login = Ticket.objects.create(title="مشکل لاگین", description="وارد نمیشم", user=user)
+        invoice = Ticket.objects.create(title="فاکتور", description="مبلغ فاکتور اشتباه است", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        assert search(client, "لاگین") == [login.id]
+        assert search(client, "اشتباه") == [invoice.id]
+        assert search(client, invoice.ticket_number) == [invoice.id]
+
+    def test_all_terms_must_match(self, user):
+        Ticket.objects.create(title="printer offline", description="office", user=user)
+        both = Ticket.objects.create(title="printer jam", description="office second floor", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        assert search(client, "printer floor") == [both.id]
+
+    def test_search_index_follows_updates_and_deletes(self, user):
+        ticket = Ticket.objects.create(title="old title", description="text", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        ticket.title = "renamed subject"
+        ticket.save()
+        assert search(client, "old") == []
+        assert search(client, "renamed") == [ticket.id]
+        ticket.delete()
+        assert search(client, "renamed") == []
+
+    def test_short_terms_use_substring_fallback(self, user):
+        ticket = Ticket.objects.create(title="VPN is down", description="x", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        assert search(client, "is") == [ticket.id]
+
+    def test_rank_ordering_prefers_title_matches(self, user):
+        in_description = Ticket.objects.create(title="other", description="network issue", user=user)
+        in_title = Ticket.objects.create(title="network down", description="help", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        assert search(client, "network", ordering="-rank") == [in_title.id, in_description.id]
+
+    def test_rank_ordering_without_search_is_ignored(self, user):
+        Ticket.objects.create(title="تست", description="تست", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-list"), {"ordering": "-rank"})
+        assert resp.status_code == status.HTTP_200_OK
+        assert len(resp.data["results"]) == 1
+
+    def test_search_respects_ownership(self, user):
+        other = User.objects.create_user(username="other", password="pass123")
+        Ticket.objects.create(title="shared keyword", description="x", user=other)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        assert search(client, "keyword") == []
+
+    def test_rank_ordering_supports_cursor_pagination(self, user):
+        for i in range(3):
+            Ticket.objects.create(title=f"network {i}", description="network " * i, user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        first = client.get(
+            reverse("ticket-list"), {"search": "network", "ordering": "-rank", "pagination": "cursor", "limit": 2}
+        )
+        assert first.status_code == status.HTTP_200_OK
+        second = client.get(first.data["next"])
+        ids = [row["id"] for row in first.data["results"] + second.data["results"]]
+        assert sorted(ids) == sorted(Ticket.objects.values_list("id", flat=True))
+        assert second.data["next"] is None
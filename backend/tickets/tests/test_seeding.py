@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+
+from tickets.models import Ticket, TicketCounter, TicketImage, TicketResponse
+from tickets.seeding import Seeder
+
+
+@pytest.mark.django_db
+class TestSeedTickets:
+    def test_command_loads_consistent_rows(self):
+        call_command(
+            "seed_tickets", tickets=250, users=10, staff=2, batch_size=100, image_ratio=0.5, verbosity=0
+        )
+        assert User.objects.filter(username__startswith="seed-user-").count() == 10
+        assert User.objects.filter(username__startswith="seed-staff-", is_staff=True).count() == 2
+        assert Ticket.objects.count() == 250
+        assert TicketResponse.objects.exists()
+        assert TicketImage.objects.exists()
+        assert TicketCounter.objects.total() == 250
+        assert Ticket.objects.values("ticket_number").distinct().count() == 250
+
+        now = timezone.now()
+        for ticket in Ticket.objects.all():
+            assert ticket.created_at <= ticket.last_activity_at <= now
+            assert now - ticket.created_at <= timedelta(days=366)
+            assert (ticket.closed_at is not None) == (ticket.status == Ticket.STATUS_CLOSED)
+        assert not Ticket.objects.filter(status=Ticket.STATUS_OPEN, first_staff_response_at__isnull=False).exists()
+        assert set(Ticket.objects.values_list("status", flat=True)) == {"open", "in_progress", "closed"}
+
+    def test_regular_writes_continue_after_seeding(self, user):
+        call_command("seed_tickets", tickets=20, users=2, staff=1, verbosity=0)
+        ticket = Ticket.objects.create(title="تست", description="تست", user=user)
+        assert ticket.pk > Ticket.objects.exclude(pk=ticket.pk).order_by("-pk").first().pk
+        assert Ticket.objects.filter(ticket_number=ticket.ticket_number).count() == 1
+        assert TicketCounter.objects.total() == 21
+
+    def test_same_seed_same_data(self):
+        now = timezone.now()
+
+        def load(prefix):
+            seeder = Seeder(seed=7, now=now)
+            user_ids, staff_ids = seeder.create_users(3, 1, prefix=prefix)
+            first = Ticket.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+            seeder.create_tickets(40, user_ids, staff_ids)
+            return list(
+                Ticket.objects.filter(pk__gt=first).order_by("pk")
+                .values_list("title", "status", "priority", "created_at")
+            )
+
+        assert load("a") == load("b")
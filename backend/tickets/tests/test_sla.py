@@ -0,0 +1,106 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tickets.models import Ticket, TicketResponse
+from tickets.sla import overdue_q
+
+
+def make_ticket(user, age_hours=0, **kwargs):
+    ticket = Ticket.objects.create(title="تست", description="تست", user=user, **kwargs)
+    if age_hours:
+        past = timezone.now() - timedelta(hours=age_hours)
+        Ticket.objects.filter(pk=ticket.pk).update(created_at=past, updated_at=past, last_activity_at=past)
+    return ticket
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+class TestSlaTimestamps:
+    def test_first_staff_response_is_recorded_once(self, user, admin_user):
+        ticket = make_ticket(user)
+        url = reverse("ticket-respond", args=[ticket.pk])
+        client_for(user).post(url, {"message": "سلام"})
+        ticket.refresh_from_db()
+        assert ticket.first_staff_response_at is None
+
+        client_for(admin_user).post(url, {"message": "در حال بررسی"})
+        ticket.refresh_from_db()
+        first = TicketResponse.objects.filter(user=admin_user).get().created_at
+        assert ticket.first_staff_response_at == first
+        assert ticket.last_activity_at == first
+        assert ticket.status == Ticket.STATUS_IN_PROGRESS
+
+        client_for(admin_user).post(url, {"message": "دوباره"})
+        ticket.refresh_from_db()
+        assert ticket.first_staff_response_at == first
+        assert ticket.last_activity_at > first
+
+    def test_closed_at_follows_status(self, user, admin_user):
+        ticket = make_ticket(user)
+        url = reverse("ticket-detail", args=[ticket.pk])
+        client_for(admin_user).patch(url, {"status": "closed"})
+        ticket.refresh_from_db()
+        assert ticket.closed_at is not None
+        assert ticket.last_activity_at > ticket.created_at
+
+        client_for(admin_user).patch(url, {"status": "open"})
+        ticket.refresh_from_db()
+        assert ticket.closed_at is None
+
+    def test_backfill_command(self, user, admin_user):
+        ticket = make_ticket(user, status=Ticket.STATUS_CLOSED)
+        TicketResponse.objects.create(ticket=ticket, user=user, message="۱")
+        staff = TicketResponse.objects.create(ticket=ticket, user=admin_user, message="۲")
+        Ticket.objects.filter(pk=ticket.pk).update(closed_at=None, first_staff_response_at=None)
+
+        call_command("backfill_ticket_sla", stdout=StringIO())
+        ticket.refresh_from_db()
+        assert ticket.first_staff_response_at == staff.created_at
+        assert ticket.closed_at == ticket.updated_at
+        assert ticket.last_activity_at >= staff.created_at
+
+
+@pytest.mark.django_db
+class TestSlaFilters:
+    def test_overdue_filter(self, user, admin_user, settings):
+        settings.TICKET_SLA_HOURS = 24
+        late = make_ticket(user, age_hours=30)
+        make_ticket(user, age_hours=2)
+        answered = make_ticket(user, age_hours=30)
+        Ticket.objects.filter(pk=answered.pk).update(first_staff_response_at=timezone.now())
+        make_ticket(user, age_hours=30, status=Ticket.STATUS_CLOSED)
+
+        client = client_for(admin_user)
+        resp = client.get(reverse("ticket-list"), {"overdue": "true"})
+        assert [row["id"] for row in resp.data["results"]] == [late.pk]
+        resp = client.get(reverse("ticket-list"), {"overdue": "true", "sla_hours": 1})
+        assert resp.data["count"] == 2
+        resp = client.get(reverse("ticket-list"), {"overdue": "false"})
+        assert late.pk not in [row["id"] for row in resp.data["results"]]
+
+    def test_inactive_filter(self, user):
+        stale = make_ticket(user, age_hours=72)
+        make_ticket(user)
+        resp = client_for(user).get(reverse("ticket-list"), {"inactive_hours": 48})
+        assert [row["id"] for row in resp.data["results"]] == [stale.pk]
+
+    def test_overdue_query_uses_partial_index(self, user):
+        if connection.vendor != "sqlite":
+            pytest.skip("query plan assertion is SQLite specific")
+        sql, params = Ticket.objects.filter(overdue_q(24)).values("id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        assert "ticket_awaiting_staff_idx" in plan
@@ -0,0 +1,75 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tickets.models import ThrottleBucket
+from tickets.throttling import purge_full_buckets, seconds_until_token, take_token
+
+
+@pytest.mark.django_db
+class TestTokenBucket:
+    def test_burst_then_refill(self):
+        # 3 requests per 60s: a burst of 3, then one more every 20s.
+        assert [take_token("k", 20, 60, now=1000) for _ in range(4)] == [True, True, True, False]
+        assert take_token("k", 20, 60, now=1010) is False
+        assert take_token("k", 20, 60, now=1020) is True
+        assert take_token("k", 20, 60, now=1020) is False
+
+    def test_denied_requests_do_not_drain_the_bucket(self):
+        for _ in range(3):
+            take_token("k", 20, 60, now=1000)
+        for _ in range(10):
+            assert take_token("k", 20, 60, now=1000) is False
+        assert take_token("k", 20, 60, now=1020) is True
+
+    def test_buckets_are_independent(self):
+        for _ in range(3):
+            take_token("a", 20, 60, now=1000)
+        assert take_token("a", 20, 60, now=1000) is False
+        assert take_token("b", 20, 60, now=1000) is True
+
+    def test_one_row_and_one_query_per_check(self, django_assert_num_queries):
+        take_token("k", 20, 60, now=1000)
+        with django_assert_num_queries(1):
+            take_token("k", 20, 60, now=1001)
+        assert ThrottleBucket.objects.count() == 1
+
+    def test_seconds_until_token(self):
+        assert seconds_until_token("k", 20, 60, now=1000) == 0.0
+        for _ in range(3):
+            take_token("k", 20, 60, now=1000)
+        assert seconds_until_token("k", 20, 60, now=1005) == pytest.approx(15)
+
+    def test_purge_full_buckets(self):
+        take_token("old", 20, 60, now=1000)
+        take_token("new", 20, 60, now=5000)
+        assert purge_full_buckets(now=1100) == 1
+        assert list(ThrottleBucket.objects.values_list("bucket", flat=True)) == ["new"]
+
+    def test_purge_command(self):
+        take_token("old", 20, 60, now=1000)
+        call_command("purge_throttle_buckets")
+        assert not ThrottleBucket.objects.exists()
+
+
+@pytest.mark.django_db
+class TestAuthThrottle:
+    def test_login_is_throttled_across_cache_resets(self, user):
+        client = APIClient()
+        payload = {"username": "testuser", "password": "wrong"}
+        for _ in range(10):
+            assert client.post("/api/auth/token/", payload, format="json").status_code == 401
+        # State is in the database, not the per-process cache.
+        cache.clear()
+        resp = client.post("/api/auth/token/", payload, format="json")
+        assert resp.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert 0 < int(resp["Retry-After"]) <= 6
+        assert ThrottleBucket.objects.filter(bucket="throttle_auth_127.0.0.1").exists()
+
+    def test_authenticated_requests_use_user_bucket(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        assert client.get("/api/tickets/").status_code == status.HTTP_200_OK
+        assert ThrottleBucket.objects.filter(bucket=f"throttle_user_{user.pk}").exists()
@@ -1,13 +1,21 @@
 import pytest
+import csv
 import io
+import json
+from unittest import mock
+from asgiref.sync import async_to_sync
 from PIL import Image
+from django.test import AsyncClient
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils.dateparse import parse_datetime
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework import status
 from django.contrib.auth.models import User
 
-from tickets.models import Ticket, TicketResponse, TicketImage
+from tickets.models import Ticket, TicketCounter, TicketResponse, TicketImage
+from tickets.uploads import UploadLimitMiddleware, max_body_size
 
 
 def create_test_image(name="test.jpg", size=(100, 100), format="JPEG"):
@@ -78,6 +86,86 @@ class TestTicketResponse:
         assert resp.status_code in (status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND)
 
 
+@pytest.mark.django_db
+class TestRespondStatusUpdate:
+    def test_admin_response_starts_open_ticket(self, user, admin_user):
+        ticket = Ticket.objects.create(title="تست", description="تست", priority="low", user=user)
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+        client.post(reverse("ticket-respond", args=[ticket.pk]), {"message": "پاسخ"}, format="json")
+        ticket.refresh_from_db()
+        assert ticket.status == Ticket.STATUS_IN_PROGRESS
+        assert ticket.first_staff_response_at is not None
+        assert TicketCounter.objects.total(status="open") == 0
+        assert TicketCounter.objects.total(user_id=user.pk, status="in_progress") == 1
+
+    def test_admin_response_keeps_closed_ticket_closed(self, user, admin_user):
+        ticket = Ticket.objects.create(
+            title="تست", description="تست", priority="low", user=user, status="closed"
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+        client.post(reverse("ticket-respond", args=[ticket.pk]), {"message": "پاسخ"}, format="json")
+        first_response_at = Ticket.objects.get(pk=ticket.pk).first_staff_response_at
+        client.post(reverse("ticket-respond", args=[ticket.pk]), {"message": "دوباره"}, format="json")
+        ticket.refresh_from_db()
+        assert ticket.status == Ticket.STATUS_CLOSED
+        assert ticket.first_staff_response_at == first_response_at
+        assert TicketCounter.objects.total(status="closed") == 1
+
+
+@pytest.mark.django_db
+class TestWriteQueryCounts:
+    """Write actions fetch only the ticket row; none load its responses or images.
+
+    Every count includes the throttle bucket update, and the savepoint pair
+    that `transaction.atomic()` issues inside the test transaction.
+    """
+
+    @pytest.fixture
+    def ticket(self, user):
+        ticket = Ticket.objects.create(title="تست", description="تست", priority="low", user=user)
+        for n in range(3):
+            TicketResponse.objects.create(ticket=ticket, user=user, message=str(n))
+        return ticket
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def test_owner_respond(self, user, ticket, django_assert_num_queries):
+        client = self.client_for(user)
+        # throttle, ticket, savepoint, insert response, change log row, update ticket, release
+        with django_assert_num_queries(7):
+            resp = client.post(reverse("ticket-respond", args=[ticket.pk]), {"message": "م"}, format="json")
+        assert resp.status_code == status.HTTP_201_CREATED
+
+    def test_admin_respond_starting_ticket(self, admin_user, ticket, django_assert_num_queries):
+        client = self.client_for(admin_user)
+        # ... plus the locked counter key and the global and per-user counter
+        # upserts for the status change.
+        with django_assert_num_queries(10):
+            resp = client.post(reverse("ticket-respond", args=[ticket.pk]), {"message": "م"}, format="json")
+        assert resp.status_code == status.HTTP_201_CREATED
+
+    def test_partial_update(self, user, ticket, django_assert_num_queries):
+        client = self.client_for(user)
+        # throttle, ticket, locked counter key, update, change log row
+        with django_assert_num_queries(5):
+            resp = client.patch(reverse("ticket-detail", args=[ticket.pk]), {"title": "جدید"}, format="json")
+        assert resp.status_code == status.HTTP_200_OK
+
+    def test_forbidden_destroy(self, user, ticket, django_assert_num_queries):
+        ticket.status = Ticket.STATUS_CLOSED
+        ticket.save()
+        client = self.client_for(user)
+        # throttle, ticket; the permission check needs nothing else.
+        with django_assert_num_queries(2):
+            resp = client.delete(reverse("ticket-detail", args=[ticket.pk]))
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
 @pytest.mark.django_db
 class TestStatusChange:
     def test_user_cannot_change_status(self, user):
@@ -284,3 +372,276 @@ class TestTicketImageUpload:
         assert resp.status_code == status.HTTP_201_CREATED
         ticket = Ticket.objects.get(pk=resp.data["id"])
         assert ticket.images.count() == 0
+
+
+@pytest.mark.django_db
+class TestTicketListRepresentation:
+    def test_list_rows_carry_counts_instead_of_nested_responses(self, user, admin_user):
+        ticket = Ticket.objects.create(title="تست", description="تست", priority="medium", user=user)
+        TicketResponse.objects.create(ticket=ticket, user=user, message="۱")
+        last = TicketResponse.objects.create(ticket=ticket, user=admin_user, message="۲")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-list"))
+        assert resp.status_code == status.HTTP_200_OK
+        row = resp.data["results"][0]
+        assert "responses" not in row
+        assert "images" not in row
+        assert row["response_count"] == 2
+        assert parse_datetime(row["last_response_at"]) == last.created_at
+
+    def test_ticket_without_responses_has_zero_count(self, user):
+        Ticket.objects.create(title="تست", description="تست", priority="medium", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        row = client.get(reverse("ticket-list")).data["results"][0]
+        assert row["response_count"] == 0
+        assert row["last_response_at"] is None
+
+    def test_fields_param_limits_output(self, user):
+        Ticket.objects.create(title="تست", description="تست", priority="medium", user=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = client.get(reverse("ticket-list"), {"fields": "id,title,status"})
+        assert set(resp.data["results"][0]) == {"id", "title", "status"}
+
+    def test_list_query_count_does_not_grow_with_responses(self, user, django_assert_num_queries):
+        for i in range(5):
+            ticket = Ticket.objects.create(title=f"تست {i}", description="د", priority="low", user=user)
+            for j in range(3):
+                TicketResponse.objects.create(ticket=ticket, user=user, message=str(j))
+        client = APIClient()
+        client.force_authenticate(user=user)
+        # Count and page, plus the throttle bucket update.
+        with django_assert_num_queries(3):
+            resp = client.get(reverse("ticket-list"))
+        assert resp.status_code == status.HTTP_200_OK
+        assert [row["response_count"] for row in resp.data["results"]] == [3] * 5
+
+
+def ndjson(*rows):
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows).encode("utf-8")
+
+
+@pytest.mark.django_db
+class TestTicketBulkImport:
+    url = "/api/tickets/import/"
+
+    def post(self, client, body):
+        return client.generic("POST", self.url, body, content_type="application/x-ndjson")
+
+    def test_admin_imports_tickets_with_responses(self, user, admin_user):
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+        body = ndjson(
+            {
+                "title": "قدیمی ۱",
+                "description": "از سیستم قبلی",
+                "priority": "high",
+                "status": "closed",
+                "user": "testuser",
+                "responses": [{"message": "سلام"}, {"message": "حل شد", "user": "admin"}],
+            },
+            {"title": "قدیمی ۲", "description": "بدون پاسخ"},
+        )
+        resp = self.post(client, body)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["created"] == 2
+        assert resp.data["responses_created"] == 2
+        assert resp.data["failed"] == 0
+        imported = Ticket.objects.get(title="قدیمی ۱")
+        assert imported.user == user
+        assert imported.status == "closed"
+        assert imported.ticket_number
+        assert list(imported.responses.values_list("user__username", flat=True)) == ["testuser", "admin"]
+        assert Ticket.objects.get(title="قدیمی ۲").user == admin_user
+
+    def test_bad_lines_are_reported_without_aborting(self, admin_user):
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+        body = ndjson(
+            {"title": "درست", "description": "د"},
+            "{not json",
+            {"title": "", "description": "د"},
+            {"title": "کاربر ناشناس", "description": "د", "user": "ghost"},
+            {"title": "وضعیت بد", "description": "د", "status": "archived"},
+            {"title": "درست ۲", "description": "د"},
+        )
+        resp = self.post(client, body)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.data["created"] == 2
+        assert resp.data["failed"] == 4
+        assert sorted(e["line"] for e in resp.data["errors"]) == [2, 3, 4, 5]
+        assert set(Ticket.objects.values_list("title", flat=True)) == {"درست", "درست ۲"}
+
+    def test_import_writes_in_chunks(self, admin_user):
+        client = APIClient()
+        client.force_authenticate(user=admin_user)
+        body = ndjson(*({"title": f"تیکت {i}", "description": "د"} for i in range(1205)))
+        resp = self.post(client, body)
+        assert resp.data["created"] == 1205
+        assert Ticket.objects.count() == 1205
+        assert len(set(Ticket.objects.values_list("ticket_number", flat=True))) == 1205
+
+    def test_non_admin_cannot_import(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        resp = self.post(client, ndjson({"title": "x", "description": "y"}))
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+        assert Ticket.objects.count() == 0
+
+
+@pytest.mark.django_db
+class TestStreamingUploadValidation:
+    def post_images(self, user, images):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        data = {"title": "تست", "description": "تست", "priority": "low", "images": images}
+        return client.post(reverse("ticket-list"), data, format="multipart")
+
+    def test_oversized_image_rejected(self, user):
+        image = create_test_image()
+        padded = SimpleUploadedFile("big.jpg", image.read() + b"\0" * (3 * 1024 * 1024), "image/jpeg")
+        resp = self.post_images(user, [padded])
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "حجم هر تصویر" in resp.data["detail"]
+        assert Ticket.objects.count() == 0
+
+    def test_non_image_rejected(self, user):
+        fake = SimpleUploadedFile("fake.jpg", b"MZ" + b"\x90" * 4096, content_type="image/jpeg")
+        resp = self.post_images(user, [fake])
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "تصویر معتبر نیست" in resp.data["detail"]
+        assert Ticket.objects.count() == 0
+
+    def test_total_size_rejected_before_reading_body(self, user):
+        def padded(i):
+            return SimpleUploadedFile(
+                f"p{i}.jpg", create_test_image().read() + b"\0" * (1900 * 1024), "image/jpeg"
+            )
+
+        resp = self.post_images(user, [padded(i) for i in range(5)])
+        assert resp.status_code == status.HTTP_400_BAD_REQUEST
+        assert "مجموع حجم" in resp.data["detail"]
+
+    def test_png_and_gif_accepted(self, user):
+        images = [create_test_image("a.png", format="PNG"), create_test_image("b.gif", format="GIF")]
+        resp = self.post_images(user, images)
+        assert resp.status_code == status.HTTP_201_CREATED
+        assert len(resp.data["images"]) == 2
+
+
+class TestUploadLimitMiddleware:
+    def run(self, messages, headers=(), path=None):
+        """Drive UploadLimitMiddleware around a stub app that reads the whole body."""
+        seen, sent = [], []
+
+        async def app(scope, receive, send):
+            while True:
+                message = await receive()
+                seen.append(message["type"])
+                if message["type"] == "http.disconnect" or not message.get("more_body"):
+                    break
+            if seen[-1] != "http.disconnect":
+                await send({"type": "http.response.start", "status": 201, "headers": []})
+                await send({"type": "http.response.body", "body": b""})
+
+        queue = list(messages)
+
+        async def receive():
+            return queue.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        path = path or reverse("ticket-list")
+        scope = {"type": "http", "method": "POST", "path": path, "headers": list(headers)}
+        async_to_sync(UploadLimitMiddleware(app))(scope, receive, send)
+        return seen, sent
+
+    def test_large_content_length_rejected_unread(self):
+        length = str(max_body_size() + 1).encode()
+        seen, sent = self.run([{"type": "http.request", "body": b"x"}], headers=[(b"content-length", length)])
+        assert seen == []
+        assert sent[0]["status"] == status.HTTP_400_BAD_REQUEST
+        assert "مجموع حجم" in json.loads(sent[1]["body"])["detail"]
+
+    def test_body_without_length_stops_at_the_limit(self):
+        chunk = b"x" * (1024 * 1024)
+        messages = [{"type": "http.request", "body": chunk, "more_body": True} for _ in range(20)]
+        seen, sent = self.run(messages)
+        assert seen[-1] == "http.disconnect"
+        assert len(seen) < 20
+        assert [message.get("status") for message in sent[:1]] == [status.HTTP_400_BAD_REQUEST]
+        assert len(sent) == 2
+
+    def test_small_bodies_and_other_routes_pass(self):
+        small = [{"type": "http.request", "body": b"x" * 1024}]
+        assert self.run(small, headers=[(b"content-length", b"1024")])[1][0]["status"] == 201
+        big = [{"type": "http.request", "body": b"x" * (max_body_size() + 1)}]
+        assert self.run(big, path=reverse("ticket-bulk-import"))[1][0]["status"] == 201
+
+    def test_deployed_asgi_application_is_wrapped(self):
+        from config.asgi import application
+
+        assert isinstance(application, UploadLimitMiddleware)
+
+
+@pytest.mark.django_db
+class TestTicketExport:
+    def export(self, user, **params):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client.get(reverse("ticket-export"), params)
+
+    def test_admin_only(self, user):
+        assert self.export(user).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_csv_honors_filters(self, user, admin_user):
+        Ticket.objects.create(title="=SUM(A1)", description="شرح", user=user, priority="high")
+        Ticket.objects.create(title="کم", description="شرح", user=user, priority="low")
+        resp = self.export(admin_user, priority="high")
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.streaming
+        assert resp["Content-Type"].startswith("text/csv")
+        assert "attachment" in resp["Content-Disposition"]
+        body = b"".join(resp.streaming_content).decode("utf-8-sig")
+        rows = list(csv.reader(io.StringIO(body)))
+        assert rows[0][:3] == ["id", "ticket_number", "title"]
+        assert len(rows) == 2
+        # Formula-like cells are neutralized for spreadsheet apps.
+        assert rows[1][2] == "'=SUM(A1)"
+        assert rows[1][rows[0].index("user")] == "testuser"
+
+    def test_ndjson(self, user, admin_user):
+        ticket = Ticket.objects.create(title="تست", description="شرح", user=user)
+        TicketResponse.objects.create(ticket=ticket, user=admin_user, message="پاسخ")
+        resp = self.export(admin_user, output="ndjson")
+        assert resp["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        row = json.loads(lines[0])
+        assert row["ticket_number"] == ticket.ticket_number
+        assert row["response_count"] == 1
+        assert parse_datetime(row["created_at"]) == ticket.created_at
+
+    def test_unknown_output_rejected(self, admin_user):
+        assert self.export(admin_user, output="xlsx").status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_streams_chunk_by_chunk_under_asgi(self, user, admin_user):
+        for n in range(5):
+            Ticket.objects.create(title=f"تیکت {n}", description="شرح", user=user)
+        token = AccessToken.for_user(admin_user)
+
+        async def export():
+            resp = await AsyncClient().get(reverse("ticket-export"), headers={"Authorization": f"Bearer {token}"})
+            return resp, [chunk async for chunk in resp.streaming_content]
+
+        with mock.patch("tickets.exporting.CHUNK_SIZE", 8):
+            resp, chunks = async_to_sync(export)()
+        assert resp.status_code == status.HTTP_200_OK
+        # An async iterator: Django would otherwise read the whole export into a list first.
+        assert resp.is_async
+        # Header, then rows two at a time.
+        assert len(chunks) == 4
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8-sig"))))
+        assert len(rows) == 6
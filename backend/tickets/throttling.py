@@ -1,4 +1,99 @@
-from rest_framework.throttling import AnonRateThrottle
+"""
+Throttles whose state lives in the database, shared by every worker and host.
+
+DRF's ``SimpleRateThrottle`` keeps a list of request timestamps per client
+in the default cache and rewrites it on every request. These throttles
+keep one row per client and scope in ``ThrottleBucket`` instead and check
+it with a single upsert.
+
+Each row is a token bucket in its GCRA form ("virtual scheduling"): a rate
+of ``N/period`` lets a burst of ``N`` requests through and refills one
+token every ``period / N`` seconds. The row stores only the theoretical
+arrival time (``tat``) of the next request. A request is allowed when
+advancing ``tat`` by one interval keeps it within ``period`` of now; the
+upsert only updates (and only returns) the row in that case, so the check
+and the update are one atomic statement on PostgreSQL and SQLite alike.
+
+Rows whose ``tat`` has passed are full buckets and carry no information;
+``purge_throttle_buckets`` deletes them.
+"""
+import time
+
+from django.db import connections, router
+from rest_framework import throttling
+
+from .models import ThrottleBucket
+
+# Absorbs float rounding when a burst lands exactly on the limit.
+SLACK_SECONDS = 0.001
+
+TAKE_SQL = """
+    INSERT INTO tickets_throttlebucket (bucket, tat) VALUES (%s, %s)
+    ON CONFLICT (bucket) DO UPDATE
+    SET tat = {greatest}(tickets_throttlebucket.tat, %s) + %s
+    WHERE {greatest}(tickets_throttlebucket.tat, %s) + %s <= %s
+    RETURNING tat
+"""
+
+TAT_SQL = "SELECT tat FROM tickets_throttlebucket WHERE bucket = %s"
+
+
+def greatest_function(connection):
+    return "GREATEST" if connection.vendor == "postgresql" else "MAX"
+
+
+def take_token(key, interval, period, now=None):
+    """Take one token from bucket `key`; False if it is empty."""
+    now = time.time() if now is None else now
+    connection = connections[router.db_for_write(ThrottleBucket)]
+    sql = TAKE_SQL.format(greatest=greatest_function(connection))
+    params = [key, now + interval, now, interval, now, interval, now + period + SLACK_SECONDS]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone() is not None
+
+
+def seconds_until_token(key, interval, period, now=None):
+    """Seconds until bucket `key` has a token again."""
+    now = time.time() if now is None else now
+    connection = connections[router.db_for_read(ThrottleBucket)]
+    with connection.cursor() as cursor:
+        cursor.execute(TAT_SQL, [key])
+        row = cursor.fetchone()
+    if row is None:
+        return 0.0
+    return max(0.0, row[0] + interval - period - now)
+
+
+def purge_full_buckets(now=None):
+    """Delete the buckets that have refilled completely; returns how many."""
+    now = time.time() if now is None else now
+    deleted, _ = ThrottleBucket.objects.filter(tat__lt=now).delete()
+    return deleted
+
+
+class BucketThrottleMixin:
+    """Replaces `SimpleRateThrottle`'s cached history with a `ThrottleBucket` row."""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.interval = self.duration / self.num_requests
+        return take_token(self.key, self.interval, self.duration)
+
+    def wait(self):
+        return seconds_until_token(self.key, self.interval, self.duration)
+
+
+class AnonRateThrottle(BucketThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(BucketThrottleMixin, throttling.UserRateThrottle):
+    pass
 
 
 class AuthRateThrottle(AnonRateThrottle):
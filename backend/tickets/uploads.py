@@ -0,0 +1,195 @@
+"""
+Streaming validation of ticket image uploads.
+
+``TicketImageUploadHandler`` is put in front of Django's default upload
+handlers for ticket creation. It enforces the count, per-file and total
+size limits while the multipart body is still being read, and sniffs each
+file's header with Pillow (no pixel decode). The first violation stops the
+upload: the rest of the body is drained without being buffered or written
+to disk, and the view turns ``handler.error`` into a 400 response.
+
+The SHA-256 of each accepted file is computed on the same pass and exposed
+in upload order as ``handler.digests`` for content-addressed storage.
+
+That only bounds what is received under WSGI. Django's ASGI handler spools
+the whole body to a temporary file before any upload handler runs, so under
+ASGI (the deployed default) these checks decide the response but not how
+much is read. There the body size is bounded first: nginx caps the ticket
+route with ``client_max_body_size``, and ``UploadLimitMiddleware`` (wrapped
+around the application in config.asgi) rejects a larger ``Content-Length``
+without reading the body and stops reading a body without one once it
+passes the limit.
+"""
+import hashlib
+import json
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils.datastructures import MultiValueDict
+from PIL import Image
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
+
+# Enough to reach the JPEG frame header past a maximal (64 KB) EXIF segment.
+SNIFF_BYTES = 128 * 1024
+
+# Allowance for the text fields and multipart framing around the files.
+FORM_OVERHEAD = 256 * 1024
+
+MAX_PIXELS = 50_000_000
+
+PERSIAN_DIGITS = str.maketrans("0123456789.", "۰۱۲۳۴۵۶۷۸۹٫")
+
+
+class TicketImageUploadHandler(FileUploadHandler):
+    field_name = "images"
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_count = getattr(settings, "TICKET_IMAGE_MAX_COUNT", 5)
+        self.max_file_size = getattr(settings, "TICKET_IMAGE_MAX_SIZE", 2 * 1024 * 1024)
+        self.max_total_size = getattr(settings, "TICKET_IMAGE_MAX_TOTAL_SIZE", 8 * 1024 * 1024)
+        self.error = None
+        self.count = 0
+        self.total_size = 0
+        self.active = False
+        self.digests = []
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > max_body_size():
+            self.error = self.total_size_message()
+            # Claim the request with empty data so nothing is read at all.
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name == self.field_name
+        if not self.active:
+            return
+        self.count += 1
+        if self.count > self.max_count:
+            self.fail(f"حداکثر {self.max_count} تصویر قابل آپلود است")
+        self.file_size = 0
+        self.head = bytearray()
+        self.sniffed = False
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        self.file_size += len(raw_data)
+        self.total_size += len(raw_data)
+        if self.file_size > self.max_file_size:
+            self.fail(f"حداکثر حجم هر تصویر {_megabytes(self.max_file_size)} مگابایت است")
+        if self.total_size > self.max_total_size:
+            self.fail(self.total_size_message())
+        self.hasher.update(raw_data)
+        if not self.sniffed:
+            self.head += raw_data[: SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self.sniff()
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        if not self.sniffed:
+            self.sniff()
+        self.digests.append(self.hasher.hexdigest())
+        return None
+
+    def sniff(self):
+        self.sniffed = True
+        try:
+            with Image.open(BytesIO(bytes(self.head))) as image:
+                image_format = image.format
+                width, height = image.size
+        except Exception:
+            image_format, width, height = None, 0, 0
+        self.head = bytearray()
+        if image_format not in ALLOWED_FORMATS:
+            self.fail("فایل ارسالی تصویر معتبر نیست (فرمت‌های مجاز: JPEG, PNG, GIF, WebP)")
+        if width * height > MAX_PIXELS:
+            self.fail("ابعاد تصویر بیش از حد مجاز است")
+
+    def fail(self, message):
+        self.error = message
+        raise StopUpload(connection_reset=False)
+
+    def total_size_message(self):
+        return total_size_message(self.max_total_size)
+
+
+def _megabytes(size):
+    return f"{size / (1024 * 1024):g}".translate(PERSIAN_DIGITS)
+
+
+def total_size_message(max_total_size):
+    return f"مجموع حجم تصاویر نباید از {_megabytes(max_total_size)} مگابایت بیشتر باشد"
+
+
+def max_body_size():
+    """Largest ticket-creation body accepted: the image total plus the form around it."""
+    return getattr(settings, "TICKET_IMAGE_MAX_TOTAL_SIZE", 8 * 1024 * 1024) + FORM_OVERHEAD
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware bounding the body of ticket-creating requests before Django spools it."""
+
+    def __init__(self, app):
+        self.app = app
+        self.paths = None
+
+    async def __call__(self, scope, receive, send):
+        upload = scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in self.upload_paths()
+        if not upload:
+            return await self.app(scope, receive, send)
+        limit = max_body_size()
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit:
+            return await self.reject(send)
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit and not rejected:
+                    rejected = True
+                    await self.reject(send)
+                    # Django gives up on a disconnected request without responding.
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+    def upload_paths(self):
+        if self.paths is None:
+            self.paths = {reverse("ticket-list")}
+        return self.paths
+
+    @staticmethod
+    async def reject(send):
+        max_total_size = getattr(settings, "TICKET_IMAGE_MAX_TOTAL_SIZE", 8 * 1024 * 1024)
+        body = json.dumps({"detail": total_size_message(max_total_size)}, ensure_ascii=False).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 400,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
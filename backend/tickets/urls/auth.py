@@ -27,8 +27,8 @@ class ThrottledRegisterView(RegisterViewSet):
 
 
 urlpatterns = [
-    path("token/", ThrottledTokenObtainPairView.as_view(permission_classes=[AllowAny])),
-    path("token/refresh/", TokenRefreshView.as_view(permission_classes=[AllowAny])),
+    path("token/", ThrottledTokenObtainPairView.as_view(permission_classes=[AllowAny]), name="auth-token"),
+    path("token/refresh/", TokenRefreshView.as_view(permission_classes=[AllowAny]), name="auth-token-refresh"),
     path("register/", ThrottledRegisterView.as_view({"post": "create"}), name="auth-register"),
-    path("me/", CurrentUserView.as_view()),
+    path("me/", CurrentUserView.as_view(), name="auth-me"),
 ]
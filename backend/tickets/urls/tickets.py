@@ -1,10 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from ..profiling import ProfileDetailView, ProfileListView
+from ..streams import ticket_events, user_events
 from ..views import TicketViewSet
 
 router = DefaultRouter()
 router.register("tickets", TicketViewSet, basename="ticket")
 
 urlpatterns = [
+    path("events/", user_events, name="events"),
+    path("tickets/<int:pk>/events/", ticket_events, name="ticket-events"),
+    path("profiles/", ProfileListView.as_view(), name="profile-list"),
+    path("profiles/<slug:name>/", ProfileDetailView.as_view(), name="profile-detail"),
     path("", include(router.urls)),
 ]
@@ -1,16 +1,26 @@
 import logging
+from itertools import zip_longest
 
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ParseError
 
-from .models import Ticket, TicketResponse, TicketImage
+from .models import Ticket, TicketCounter, TicketResponse, TicketImage
 from .serializers import (
     TicketSerializer,
+    TicketListSerializer,
     TicketCreateSerializer,
     TicketUpdateSerializer,
     TicketResponseSerializer,
@@ -18,7 +28,19 @@ from .serializers import (
     UserSerializer,
 )
 from .permissions import IsOwnerOrAdmin, IsOwnerAndOpen, IsOwnerAndOpenOrAdmin
-from .filters import TicketFilter
+from .filters import TicketFilter, TicketOrderingFilter
+from .pagination import ResponsePagination, TicketPagination
+from .importing import TicketImporter
+from . import cache as ticket_cache
+from . import changes as change_log
+from . import exporting
+from .images import schedule_processing
+from .events import publish_ticket_event
+from .blobs import acquire_blob
+from .counters import COUNTED_FIELDS, apply_deltas, key_changes
+from .uploads import TicketImageUploadHandler
+from .async_views import AsyncViewSetMixin
+from .conditional import compute_validators, not_modified_response, set_validators
 
 logger = logging.getLogger(__name__)
 
@@ -50,21 +72,36 @@ class RegisterViewSet(viewsets.GenericViewSet):
             first_name=first_name,
             last_name=last_name,
         )
-        logger.info(f"New user registered: {username} (id={user.id})")
+        logger.info("New user registered: %s (id=%s)", username, user.id)
         serializer = self.get_serializer(user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class TicketViewSet(viewsets.ModelViewSet):
+# List query parameters that never narrow the rows, so a list filtered only by
+# status/priority can take its count from TicketCounter.
+COUNT_NEUTRAL_PARAMS = {"limit", "offset", "pagination", "ordering", "fields", "format"}
+COUNTER_FILTER_PARAMS = {"status", "priority"}
+
+
+class TicketViewSet(AsyncViewSetMixin, viewsets.ModelViewSet):
     queryset = Ticket.objects.all()
     filterset_class = TicketFilter
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
-    ordering_fields = ["created_at", "updated_at", "status"]
+    filter_backends = [DjangoFilterBackend, TicketOrderingFilter]
+    ordering_fields = ["created_at", "updated_at", "status", "rank"]
     ordering = ["-created_at"]
+    pagination_class = TicketPagination
     permission_classes = [IsAuthenticated]
+    # Served from the a<action> coroutines below (see tickets.async_views).
+    async_actions = ("list", "retrieve", "respond")
 
     def get_queryset(self):
-        qs = Ticket.objects.select_related("user").prefetch_related("responses__user", "images")
+        if self.action in ["list", "retrieve", "changes"]:
+            qs = Ticket.objects.select_related("user").with_response_stats()
+        elif self.action == "export":
+            qs = Ticket.objects.select_related("user")
+        else:
+            # Writes and their permission checks only need the ticket row itself.
+            qs = Ticket.objects.all()
         if self.request.user.is_staff:
             return qs
         return qs.filter(user=self.request.user)
@@ -72,51 +109,160 @@ class TicketViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == "create":
             return TicketCreateSerializer
+        if self.action in ["list", "changes"]:
+            return TicketListSerializer
         if self.action in ["update", "partial_update"]:
             return TicketUpdateSerializer
         return TicketSerializer
 
     def get_permissions(self):
-        if self.action in ["list", "create"]:
+        if self.action in ["list", "create", "stats", "changes"]:
             return [IsAuthenticated()]
+        if self.action in ["bulk_import", "export"]:
+            return [IsAuthenticated(), IsAdminUser()]
         if self.action == "destroy":
             return [IsAuthenticated(), IsOwnerAndOpen()]
         if self.action in ["update", "partial_update"]:
             return [IsAuthenticated(), IsOwnerAndOpenOrAdmin()]
-        return [IsOwnerOrAdmin()]
+        return [IsAuthenticated(), IsOwnerOrAdmin()]
+
+    def get_counter_total(self):
+        """List row count from TicketCounter, or None when the filters don't map onto a counter key."""
+        params = {key: value for key, value in self.request.query_params.items() if value}
+        if not set(params) <= COUNTER_FILTER_PARAMS | COUNT_NEUTRAL_PARAMS:
+            return None
+        user = self.request.user
+        return TicketCounter.objects.total(
+            user_id=None if user.is_staff else user.pk,
+            status=params["status"].lower() if "status" in params else None,
+            priority=params["priority"].lower() if "priority" in params else None,
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        return self.list_response(request, page, page if page is not None else list(queryset))
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = None
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        rows = page if page is not None else [ticket async for ticket in queryset]
+        return self.list_response(request, page, rows)
+
+    def list_response(self, request, page, rows):
+        signature = self.paginator.get_page_signature() if page is not None else ""
+        # The newest row timestamp does not move when a row is deleted or leaves
+        # the filter, so lists are only validated by their ETag.
+        etag, _ = compute_validators(request, rows, extra=signature)
+        not_modified = not_modified_response(request, etag, None)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(rows, many=True)
+        if page is not None:
+            response = self.get_paginated_response(serializer.data)
+        else:
+            response = Response(serializer.data)
+        return set_validators(response, etag, None)
+
+    def retrieve(self, request, *args, **kwargs):
+        ticket = self.get_object()
+        limit = self.get_responses_limit()
+        etag, last_modified = compute_validators(request, [ticket], extra=f"responses={limit}")
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = Response(self.get_detail_payload(ticket, limit))
+        return set_validators(response, etag, last_modified)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        ticket = await self.aget_object()
+        limit = self.get_responses_limit()
+        etag, last_modified = compute_validators(request, [ticket], extra=f"responses={limit}")
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = Response(await sync_to_async(self.get_detail_payload)(ticket, limit))
+        return set_validators(response, etag, last_modified)
+
+    def get_responses_limit(self):
+        """`?responses_limit=N`: embed only the last N responses in the detail (None: all)."""
+        value = self.request.query_params.get("responses_limit")
+        if value is None:
+            return None
+        if not value.isdigit():
+            raise ParseError("مقدار responses_limit نامعتبر است")
+        return min(int(value), ResponsePagination.max_page_size)
+
+    def get_detail_payload(self, ticket, responses_limit=None):
+        def build():
+            if responses_limit is None:
+                full = Ticket.objects.select_related("user").prefetch_related(
+                    "responses__user", "images"
+                ).get(pk=ticket.pk)
+                payload = self.get_serializer(full).data
+            else:
+                full = Ticket.objects.select_related("user").prefetch_related("images").get(pk=ticket.pk)
+                serializer = self.get_serializer(full)
+                del serializer.fields["responses"]
+                payload = serializer.data
+                recent = list(
+                    TicketResponse.objects.filter(ticket=full).select_related("user")
+                    .order_by("-created_at", "-id")[:responses_limit]
+                )
+                payload["responses"] = TicketResponseSerializer(recent[::-1], many=True).data
+            payload["response_count"] = ticket.response_count
+            return payload
+
+        variant = "default" if responses_limit is None else f"responses-{responses_limit}"
+        return ticket_cache.get_or_build(ticket.pk, build, variant=variant)
+
+    @action(detail=True, methods=["get"])
+    def responses(self, request, pk=None):
+        """
+        The ticket's responses oldest first, in keyset pages (`next` links).
+        `?since=<ISO datetime>` returns only responses created after it.
+        """
+        ticket = self.get_object()
+        queryset = TicketResponse.objects.filter(ticket=ticket).select_related("user")
+        since = request.query_params.get("since")
+        if since:
+            try:
+                since = parse_datetime(since)
+            except ValueError:  # well-formed but out of range, e.g. month 13
+                since = None
+            if since is None:
+                raise ParseError("مقدار since نامعتبر است")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(created_at__gt=since)
+        paginator = ResponsePagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(TicketResponseSerializer(page, many=True).data)
 
     def create(self, request, *args, **kwargs):
+        upload_handler = TicketImageUploadHandler(request)
+        request.upload_handlers.insert(0, upload_handler)
         images = request.FILES.getlist("images") or []
-        max_per_image = 2 * 1024 * 1024  # 2MB per image
-        max_total = 8 * 1024 * 1024  # 8MB total
-        max_count = 5
-        if len(images) > max_count:
-            return Response(
-                {"detail": f"حداکثر {max_count} تصویر قابل آپلود است"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        total_size = 0
-        for img in images:
-            if img.size > max_per_image:
-                return Response(
-                    {"detail": "حداکثر حجم هر تصویر ۲ مگابایت است"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            total_size += img.size
-        if total_size > max_total:
-            return Response(
-                {"detail": "مجموع حجم تصاویر نباید از ۸ مگابایت بیشتر باشد"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        if upload_handler.error:
+            return Response({"detail": upload_handler.error}, status=status.HTTP_400_BAD_REQUEST)
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        ticket = serializer.save(user=request.user)
-        for img in images:
-            TicketImage.objects.create(ticket=ticket, image=img)
+        with transaction.atomic():
+            ticket = serializer.save(user=request.user)
+            created_images = []
+            for img, digest in zip_longest(images, upload_handler.digests):
+                blob = acquire_blob(img, digest)
+                created_images.append(
+                    TicketImage.objects.create(ticket=ticket, image=blob.file.name, blob=blob)
+                )
+            schedule_processing(image.pk for image in created_images)
+            publish_ticket_event(ticket, "ticket.created")
         ticket.refresh_from_db()
         logger.info(
-            f"Ticket created: {ticket.ticket_number} by user {request.user.username} "
-            f"(priority={ticket.priority}, images={len(images)})"
+            "Ticket created: %s by user %s (priority=%s, images=%d)",
+            ticket.ticket_number, request.user.username, ticket.priority, len(images),
         )
         return Response(
             TicketSerializer(ticket, context={"request": request}).data,
@@ -130,44 +276,171 @@ class TicketViewSet(viewsets.ModelViewSet):
         old_status = serializer.instance.status
         if not self.request.user.is_staff:
             serializer.validated_data.pop("status", None)
-        instance = serializer.save()
+        instance = serializer.save(last_activity_at=timezone.now())
         new_status = instance.status
         if old_status != new_status:
             logger.info(
-                f"Ticket {instance.ticket_number} status changed: {old_status} -> {new_status} "
-                f"by {self.request.user.username}"
+                "Ticket %s status changed: %s -> %s by %s",
+                instance.ticket_number, old_status, new_status, self.request.user.username,
             )
         else:
-            logger.info(f"Ticket {instance.ticket_number} updated by {self.request.user.username}")
+            logger.info("Ticket %s updated by %s", instance.ticket_number, self.request.user.username)
+        publish_ticket_event(instance, "ticket.updated", previous_status=old_status)
 
     def perform_destroy(self, instance):
         ticket_number = instance.ticket_number
         username = self.request.user.username
+        publish_ticket_event(instance, "ticket.deleted")
         instance.delete()
-        logger.info(f"Ticket {ticket_number} deleted by owner {username}")
+        logger.info("Ticket %s deleted by owner %s", ticket_number, username)
 
     @action(detail=True, methods=["post"])
     def respond(self, request, pk=None):
-        ticket = self.get_object()
-        if not request.user.is_staff and ticket.user != request.user:
+        return self.respond_to(request, self.get_object())
+
+    async def arespond(self, request, pk=None):
+        ticket = await self.aget_object()
+        return await sync_to_async(self.respond_to)(request, ticket)
+
+    def respond_to(self, request, ticket):
+        if not request.user.is_staff and ticket.user_id != request.user.pk:
             return Response(
                 {"detail": "شما اجازه پاسخ به این تیکت را ندارید"},
                 status=status.HTTP_403_FORBIDDEN,
             )
         ser = TicketResponseCreateSerializer(data=request.data)
-        if ser.is_valid():
-            TicketResponse.objects.create(
+        if not ser.is_valid():
+            return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            response = TicketResponse.objects.create(
                 ticket=ticket, user=request.user, message=ser.validated_data["message"]
             )
-            role = "admin" if request.user.is_staff else "user"
-            logger.info(
-                f"Response added to ticket {ticket.ticket_number} by {role} {request.user.username}"
+            activity = {"last_activity_at": response.created_at}
+            if request.user.is_staff:
+                activity["first_staff_response_at"] = Coalesce(
+                    "first_staff_response_at", Value(response.created_at)
+                )
+            # An admin's reply moves an open ticket to in_progress; the WHERE
+            # clause keeps a concurrent status change from being overwritten.
+            started = (
+                request.user.is_staff
+                and ticket.status == Ticket.STATUS_OPEN
+                and Ticket.objects.filter(pk=ticket.pk, status=Ticket.STATUS_OPEN).update(
+                    status=Ticket.STATUS_IN_PROGRESS, **activity
+                )
             )
-            if request.user.is_staff and ticket.status == "open":
-                ticket.status = "in_progress"
-                ticket.save(update_fields=["status"])
-                logger.info(
-                    f"Ticket {ticket.ticket_number} auto-changed to in_progress after admin response"
+            if started:
+                # QuerySet.update() skips Ticket.save, which keeps the counters. The
+                # in-memory ticket may be stale (a concurrent priority change), so
+                # read the key back from the row the UPDATE has just locked.
+                current = Ticket.objects.filter(pk=ticket.pk).values_list(*COUNTED_FIELDS).get()
+                previous = tuple(
+                    Ticket.STATUS_OPEN if field == "status" else value
+                    for field, value in zip(COUNTED_FIELDS, current)
                 )
-            return Response({"detail": "پاسخ ثبت شد"}, status=status.HTTP_201_CREATED)
-        return Response(ser.errors, status=status.HTTP_400_BAD_REQUEST)
+                apply_deltas(key_changes(previous, current))
+                ticket.status = Ticket.STATUS_IN_PROGRESS
+            else:
+                Ticket.objects.filter(pk=ticket.pk).update(**activity)
+            ticket_cache.invalidate_ticket(ticket.pk)
+            publish_ticket_event(
+                ticket,
+                "ticket.response",
+                response=response.pk,
+                author=request.user.username,
+                staff=request.user.is_staff,
+            )
+        role = "admin" if request.user.is_staff else "user"
+        logger.info(
+            "Response added to ticket %s by %s %s", ticket.ticket_number, role, request.user.username
+        )
+        if started:
+            logger.info("Ticket %s auto-changed to in_progress after admin response", ticket.ticket_number)
+        return Response({"detail": "پاسخ ثبت شد"}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        user_id = request.user.pk
+        if request.user.is_staff:
+            user_id = request.query_params.get("user") or None
+            if user_id is not None and not user_id.isdigit():
+                return Response({"detail": "شناسه کاربر نامعتبر است"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(TicketCounter.objects.breakdown(user_id=user_id))
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        """
+        Tickets created, updated, responded to or deleted since `?cursor=`.
+
+        Without a cursor only a starting `cursor` is returned: fetch it before
+        loading the list, then pass the latest `cursor` back on every sync.
+        `changed` holds list rows, `deleted` tombstones; call again at once
+        while `has_more` is true. A cursor past the retention period gets 410
+        and the client reloads the list.
+        """
+        encoded = request.query_params.get("cursor")
+        if not encoded:
+            position = change_log.current_position(request.user)
+            return Response({
+                "cursor": change_log.encode_cursor(position),
+                "has_more": False,
+                "changed": [],
+                "deleted": [],
+            })
+        try:
+            after = change_log.decode_cursor(encoded)
+        except ValueError:
+            raise ParseError("مقدار cursor نامعتبر است")
+        except change_log.StaleCursor:
+            return Response(
+                {"detail": "cursor منقضی شده است؛ لیست را دوباره بارگذاری کنید"},
+                status=status.HTTP_410_GONE,
+            )
+        changed_ids, deleted_ids, position, has_more = change_log.read_changes(request.user, after)
+        tickets = self.get_queryset().filter(pk__in=changed_ids).order_by("id") if changed_ids else []
+        return Response({
+            "cursor": change_log.encode_cursor(position),
+            "has_more": has_more,
+            "changed": self.get_serializer(tickets, many=True).data,
+            "deleted": [{"id": ticket_id} for ticket_id in deleted_ids],
+        })
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream every ticket matching the list filters as CSV (default) or
+        NDJSON (`?output=ndjson`); `format` is taken by DRF's renderer override.
+        """
+        output = request.query_params.get("output", "csv")
+        if output not in exporting.STREAMS:
+            return Response(
+                {"detail": "فرمت خروجی نامعتبر است (csv یا ndjson)"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        stream = exporting.STREAMS[output](exporting.export_rows(queryset))
+        if isinstance(request._request, ASGIRequest):
+            stream = exporting.aiterate(stream)
+        response = StreamingHttpResponse(stream, content_type=exporting.FORMATS[output])
+        filename = f"tickets-{timezone.now():%Y%m%d-%H%M%S}.{output}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Cache-Control"] = "no-store"
+        # Let nginx pass chunks through as they are produced.
+        response["X-Accel-Buffering"] = "no"
+        logger.info("Ticket export (%s) started by %s", output, request.user.username)
+        return response
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def bulk_import(self, request):
+        """
+        Import tickets from an NDJSON body (`application/x-ndjson`), one ticket
+        per line: `{"title", "description", "priority", "status", "user",
+        "responses": [{"message", "user"}]}`. `user` is a username and defaults
+        to the importing admin (or the ticket owner for responses).
+        """
+        result = TicketImporter(default_user=request.user).run(request.stream)
+        logger.info(
+            "Bulk import by %s: created=%d responses=%d failed=%d",
+            request.user.username, result.created, result.responses_created, result.failed,
+        )
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
@@ -1,6 +1,6 @@
 import axios, { AxiosError } from 'axios';
 
-const baseURL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
+export const baseURL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
 
 function getRefreshUrl(): string {
   const base = baseURL.endsWith('/') ? baseURL.slice(0, -1) : baseURL;
@@ -0,0 +1,54 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { baseURL } from '../api/client';
+import { ticketKeys } from '../api/tickets';
+
+const EVENT_TYPES = ['ticket.created', 'ticket.updated', 'ticket.response', 'ticket.deleted', 'reset'];
+const RECONNECT_DELAY_MS = 5000;
+
+/**
+ * Subscribe to the server's ticket event stream (all own tickets, or one
+ * ticket when `ticketId` is given) and refetch affected queries on change.
+ */
+export function useTicketEvents(ticketId?: string) {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return;
+    const base = baseURL.endsWith('/') ? baseURL.slice(0, -1) : baseURL;
+    const path = ticketId ? `/tickets/${ticketId}/events/` : '/events/';
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const onEvent = (e: MessageEvent) => {
+      const event = JSON.parse(e.data || '{}') as { ticket?: number };
+      queryClient.invalidateQueries({ queryKey: ticketKeys.lists() });
+      if (event.ticket !== undefined) {
+        queryClient.invalidateQueries({ queryKey: ticketKeys.detail(String(event.ticket)) });
+      } else {
+        queryClient.invalidateQueries({ queryKey: ticketKeys.details() });
+      }
+    };
+
+    const connect = () => {
+      const token = localStorage.getItem('access');
+      if (!token) return;
+      source = new EventSource(`${base}${path}?token=${encodeURIComponent(token)}`);
+      EVENT_TYPES.forEach((type) => source!.addEventListener(type, onEvent as EventListener));
+      source.onerror = () => {
+        // The browser retries dropped streams itself, but not rejected ones
+        // (e.g. an expired token); reconnect with whatever token is current.
+        if (source?.readyState === EventSource.CLOSED) {
+          source.close();
+          retryTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+        }
+      };
+    };
+
+    connect();
+    return () => {
+      clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, [ticketId, queryClient]);
+}
@@ -10,6 +10,11 @@ import {
   deleteTicket,
 } from '../api/tickets';
 import { Ticket } from '../types';
+import { useTicketEvents } from './useTicketEvents';
+
+// Server-Sent Events drive refetches; polling is only a slow safety net, except
+// in browsers without EventSource, which keep the old 5s poll.
+const FALLBACK_REFETCH_MS = typeof EventSource === 'undefined' ? 5000 : 60000;
 
 export function useTickets(params: {
   status: string;
@@ -19,19 +24,21 @@ export function useTickets(params: {
   offset?: number;
   ordering?: string;
 }) {
+  useTicketEvents();
   return useQuery({
     queryKey: ticketKeys.list(params),
     queryFn: () => fetchTickets(params),
-    refetchInterval: 5000,
+    refetchInterval: FALLBACK_REFETCH_MS,
   });
 }
 
 export function useTicket(id: string | undefined) {
+  useTicketEvents(id);
   return useQuery({
     queryKey: ticketKeys.detail(id ?? ''),
     queryFn: () => fetchTicket(id!),
     enabled: !!id,
-    refetchInterval: 5000,
+    refetchInterval: FALLBACK_REFETCH_MS,
   });
 }
 
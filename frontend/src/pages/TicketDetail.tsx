@@ -238,7 +238,7 @@ export default function TicketDetail() {
           {ticket.images && ticket.images.length > 0 && (
             <div className="mt-4 flex flex-wrap gap-3">
               {ticket.images.map((img) => {
-                const url = getImageUrl(img.image);
+                const url = getImageUrl(img.variants?.thumbnail_webp ?? img.image);
                 return url ? (
                   <div key={img.id} className="h-24 w-24 shrink-0">
                     <img
@@ -26,6 +26,7 @@ import type { TicketStatus, TicketPriority } from '../constants/enums';
 export interface TicketImage {
   id: number;
   image: string;
+  variants?: Record<string, string>;
 }
 
 export interface Ticket {
@@ -38,8 +39,13 @@ export interface Ticket {
   status: TicketStatus;
   user: User;
   responses?: TicketResponse[];
+  response_count?: number;
+  last_response_at?: string | null;
   created_at: string;
   updated_at: string;
+  first_staff_response_at?: string | null;
+  closed_at?: string | null;
+  last_activity_at?: string;
 }
 
 export interface PaginatedResponse<T> {